@@ -0,0 +1,94 @@
+using System;
+using System.Linq;
+using System.Reflection;
+using AwesomeAssertions;
+using Microsoft.Data.Sqlite;
+using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.DependencyInjection;
+using Rnwood.Smtp4dev.Data;
+using Rnwood.Smtp4dev.DbModel;
+using Rnwood.Smtp4dev.Server.Settings;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.DBMigrations
+{
+    public class FastStartDatabaseTests : IDisposable
+    {
+        private readonly string connectionString = $"Data Source=file:cachedb{Guid.NewGuid()}?mode=memory&cache=shared";
+        private readonly SqliteConnection keepAliveConnection;
+
+        public FastStartDatabaseTests()
+        {
+            keepAliveConnection = new SqliteConnection(connectionString);
+            keepAliveConnection.Open();
+        }
+
+        [Fact]
+        public void CreateFastStartDatabase_CalledTwice_SeedsImapStateOnce()
+        {
+            // Arrange
+            var createMethod = typeof(Rnwood.Smtp4dev.Startup).GetMethod(
+                "CreateFastStartDatabase",
+                BindingFlags.NonPublic | BindingFlags.Static);
+            createMethod.Should().NotBeNull();
+
+            var services = new ServiceCollection();
+            services.AddDbContext<Smtp4devDbContext>(opt => opt.UseSqlite(connectionString));
+            using var serviceProvider = services.BuildServiceProvider();
+
+            // The second call finds the schema already created and must not add another IMAP state.
+            for (int i = 0; i < 2; i++)
+            {
+                using var scope = serviceProvider.CreateScope();
+                createMethod.Invoke(null, new object[] { scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>() });
+            }
+
+            // Act - deliver a message in each of two scopes
+            Guid mailboxId;
+            using (var scope = serviceProvider.CreateScope())
+            {
+                var dbContext = scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>();
+                var mailbox = new Mailbox { Name = MailboxOptions.DEFAULTNAME };
+                dbContext.Add(mailbox);
+                dbContext.SaveChanges();
+                mailboxId = mailbox.Id;
+
+                DeliverMessage(dbContext, mailbox, "Message 1");
+            }
+
+            using (var scope = serviceProvider.CreateScope())
+            {
+                var dbContext = scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>();
+                DeliverMessage(dbContext, dbContext.Mailboxes.Find(mailboxId), "Message 2");
+            }
+
+            // Assert
+            using (var scope = serviceProvider.CreateScope())
+            {
+                var dbContext = scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>();
+                dbContext.ImapState.Should().ContainSingle().Which.LastUid.Should().Be(2);
+                dbContext.Messages.OrderBy(m => m.ImapUid).Select(m => m.ImapUid).ToList()
+                    .Should().Equal(1, 2);
+            }
+        }
+
+        private static void DeliverMessage(Smtp4devDbContext dbContext, Mailbox mailbox, string subject)
+        {
+            ImapState imapState = CompiledQueries.ImapState(dbContext);
+            imapState.LastUid = Math.Max(0, imapState.LastUid + 1);
+
+            dbContext.Add(new Message
+            {
+                Id = Guid.NewGuid(),
+                ImapUid = imapState.LastUid,
+                Subject = subject,
+                ReceivedDate = DateTime.Now,
+                Data = Array.Empty<byte>(),
+                Mailbox = mailbox
+            });
+            dbContext.SaveChanges();
+        }
+
+        public void Dispose() => keepAliveConnection.Dispose();
+    }
+}
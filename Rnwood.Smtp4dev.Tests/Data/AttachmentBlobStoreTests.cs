@@ -0,0 +1,206 @@
+using System;
+using System.IO;
+using System.Linq;
+using Microsoft.EntityFrameworkCore;
+using MimeKit;
+using Rnwood.Smtp4dev.Data;
+using Rnwood.Smtp4dev.DbModel;
+using Rnwood.Smtp4dev.Tests.DBMigrations.Helpers;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Data
+{
+    public class AttachmentBlobStoreTests
+    {
+        private static readonly byte[] SharedAttachment = Enumerable.Range(0, 50_000).Select(i => (byte)(i * 7)).ToArray();
+
+        [Fact]
+        public void SplitAttachments_RepeatedAttachment_StoredOnceAndReassembled()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            byte[] first = CreateMessageData("First", ("report.pdf", SharedAttachment), ("log.txt", new byte[20_000]));
+            byte[] second = CreateMessageData("Second", ("report.pdf", SharedAttachment));
+
+            Guid firstId, secondId;
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                var firstMessage = new Message { Data = first };
+                var secondMessage = new Message { Data = second };
+
+                Assert.Equal(2, AttachmentBlobStore.SplitAttachments(context, firstMessage));
+                Assert.Equal(1, AttachmentBlobStore.SplitAttachments(context, secondMessage));
+                Assert.Equal(first, firstMessage.Data);
+                Assert.True(firstMessage.StoredData.Length < first.Length - SharedAttachment.Length);
+
+                context.Messages.AddRange(firstMessage, secondMessage);
+                context.SaveChanges();
+                firstId = firstMessage.Id;
+                secondId = secondMessage.Id;
+            }
+
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                Assert.Equal(2, context.AttachmentBlobs.Count());
+                Assert.Equal(first, context.Messages.AsNoTracking().IncludeAttachmentBlobs().Single(m => m.Id == firstId).Data);
+                Assert.Equal(second, context.Messages.AsNoTracking().IncludeAttachmentBlobs().Single(m => m.Id == secondId).Data);
+            }
+        }
+
+        [Fact]
+        public void SplitAttachments_ExistingBlob_IsReusedAcrossContexts()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+
+            for (int i = 0; i < 2; i++)
+            {
+                using var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions);
+                byte[] data = CreateMessageData("Message " + i, ("report.pdf", SharedAttachment));
+                var message = new Message { Data = data };
+                AttachmentBlobStore.SplitAttachments(context, message);
+                context.Messages.Add(message);
+                context.SaveChanges();
+
+                Assert.Equal(data, message.Data);
+            }
+
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                Assert.Equal(1, context.AttachmentBlobs.Count());
+                Assert.Equal(2, context.AttachmentBlobReferences.Count());
+            }
+        }
+
+        [Fact]
+        public void SplitAttachments_SmallAttachment_IsNotSplit()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            using var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions);
+            byte[] data = CreateMessageData("Small", ("small.txt", new byte[100]));
+            var message = new Message { Data = data };
+
+            Assert.Equal(0, AttachmentBlobStore.SplitAttachments(context, message));
+            Assert.Same(data, message.StoredData);
+            Assert.Empty(message.AttachmentBlobReferences);
+        }
+
+        [Fact]
+        public void GetDataSizes_IncludesBlobContent()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            byte[] split = CreateMessageData("Split", ("report.pdf", SharedAttachment));
+            byte[] notSplit = CreateMessageData("Not split");
+
+            Guid splitId, notSplitId;
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                var splitMessage = new Message { Data = split };
+                var notSplitMessage = new Message { Data = notSplit };
+                AttachmentBlobStore.SplitAttachments(context, splitMessage);
+                context.Messages.AddRange(splitMessage, notSplitMessage);
+                context.SaveChanges();
+                splitId = splitMessage.Id;
+                notSplitId = notSplitMessage.Id;
+            }
+
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                var sizes = AttachmentBlobStore.GetDataSizes(context.Messages);
+
+                Assert.Equal(split.LongLength, sizes[splitId]);
+                Assert.Equal(notSplit.LongLength, sizes[notSplitId]);
+            }
+        }
+
+        [Fact]
+        public void DeleteUnreferencedBlobs_RemovesBlobOnlyAfterLastMessageDeleted()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            Guid[] ids;
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                var messages = Enumerable.Range(0, 2)
+                    .Select(i => new Message { Data = CreateMessageData("Message " + i, ("report.pdf", SharedAttachment)) })
+                    .ToArray();
+                foreach (var message in messages)
+                {
+                    AttachmentBlobStore.SplitAttachments(context, message);
+                }
+
+                context.Messages.AddRange(messages);
+                context.SaveChanges();
+                ids = messages.Select(m => m.Id).ToArray();
+            }
+
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                context.Messages.Where(m => m.Id == ids[0]).ExecuteDelete();
+                Assert.Equal(0, AttachmentBlobStore.DeleteUnreferencedBlobs(context));
+                Assert.Equal(1, context.AttachmentBlobs.Count());
+
+                context.Messages.Where(m => m.Id == ids[1]).ExecuteDelete();
+                Assert.Equal(1, AttachmentBlobStore.DeleteUnreferencedBlobs(context));
+                Assert.Equal(0, context.AttachmentBlobs.Count());
+            }
+        }
+
+        [Fact]
+        public void Data_SplitMessageWithoutLoadedReferences_Throws()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            var split = new Message { Data = CreateMessageData("Split", ("report.pdf", SharedAttachment)) };
+            byte[] notSplitData = CreateMessageData("Not split");
+            var notSplit = new Message { Data = notSplitData };
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                AttachmentBlobStore.SplitAttachments(context, split);
+                context.Messages.AddRange(split, notSplit);
+                context.SaveChanges();
+            }
+
+            using (var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions))
+            {
+                Message loaded = context.Messages.AsNoTracking().Single(m => m.Id == split.Id);
+                Assert.Equal(1, loaded.AttachmentBlobCount);
+                Assert.Throws<InvalidOperationException>(() => loaded.Data);
+
+                Assert.Equal(notSplitData, context.Messages.AsNoTracking().Single(m => m.Id == notSplit.Id).Data);
+            }
+        }
+
+        [Fact]
+        public void SettingData_RemovesBlobReferences()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            using var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions);
+            var message = new Message { Data = CreateMessageData("Replace", ("report.pdf", SharedAttachment)) };
+            AttachmentBlobStore.SplitAttachments(context, message);
+            byte[] replacement = CreateMessageData("Replacement");
+
+            message.Data = replacement;
+
+            Assert.Empty(message.AttachmentBlobReferences);
+            Assert.Same(replacement, message.Data);
+        }
+
+        private static byte[] CreateMessageData(string subject, params (string FileName, byte[] Content)[] attachments)
+        {
+            var builder = new BodyBuilder { TextBody = "Body of " + subject };
+            foreach (var (fileName, content) in attachments)
+            {
+                builder.Attachments.Add(fileName, content);
+            }
+
+            var message = new MimeMessage();
+            message.From.Add(new MailboxAddress("From", "from@example.com"));
+            message.To.Add(new MailboxAddress("To", "to@example.com"));
+            message.Subject = subject;
+            message.Body = builder.ToMessageBody();
+
+            var options = FormatOptions.Default.Clone();
+            options.NewLineFormat = NewLineFormat.Dos;
+            using var stream = new MemoryStream();
+            message.WriteTo(options, stream);
+            return stream.ToArray();
+        }
+    }
+}
@@ -0,0 +1,91 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Rnwood.Smtp4dev.Data;
+using Rnwood.Smtp4dev.DbModel;
+using Rnwood.Smtp4dev.DbModel.Projections;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Data
+{
+    public class MessageSummaryIndexTests
+    {
+        private static readonly Mailbox TestMailbox = new Mailbox { Name = "Default" };
+        private static readonly MailboxFolder Inbox = new MailboxFolder { Name = MailboxFolder.INBOX, Mailbox = TestMailbox };
+
+        [Fact]
+        public void GetSorted_LoadsFolderOnceAndSortsInMemory()
+        {
+            var index = new MessageSummaryIndex();
+            int loads = 0;
+            var stored = new[] { CreateProjection("b", 2), CreateProjection("a", 1), CreateProjection("c", 3) };
+            Func<IEnumerable<MessageSummaryProjection>> load = () =>
+            {
+                loads++;
+                return stored;
+            };
+
+            var byDate = index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, load);
+            var bySubject = index.GetSorted("Default", MailboxFolder.INBOX, "subject", false, load);
+
+            Assert.Equal(1, loads);
+            Assert.Equal(new[] { "c", "b", "a" }, byDate.Summaries.Select(s => s.Subject));
+            Assert.Equal(new[] { "a", "b", "c" }, bySubject.Summaries.Select(s => s.Subject));
+            Assert.Equal(byDate.Version, bySubject.Version);
+        }
+
+        [Fact]
+        public void Add_IndexedFolder_AddsSummaryAndChangesVersion()
+        {
+            var index = new MessageSummaryIndex();
+            var before = index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, () => new[] { CreateProjection("old", 1) });
+
+            index.Add(new Message { Id = Guid.NewGuid(), Subject = "new", ReceivedDate = new DateTime(2024, 1, 2), IsUnread = true, Mailbox = TestMailbox, MailboxFolder = Inbox });
+
+            var after = index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, () => throw new InvalidOperationException("Should not reload"));
+            Assert.Equal(new[] { "new", "old" }, after.Summaries.Select(s => s.Subject));
+            Assert.NotEqual(before.Version, after.Version);
+            Assert.Single(before.Summaries);
+        }
+
+        [Fact]
+        public void MarkReadAndRemove_UpdateIndexedSummaries()
+        {
+            var index = new MessageSummaryIndex();
+            var first = CreateProjection("first", 1);
+            var second = CreateProjection("second", 2);
+            index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, () => new[] { first, second });
+
+            index.MarkRead(first.Id);
+            index.Remove(new[] { second.Id });
+
+            var summary = Assert.Single(index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, () => null).Summaries);
+            Assert.Equal(first.Id, summary.Id);
+            Assert.False(summary.IsUnread);
+        }
+
+        [Fact]
+        public void Changes_FolderNotIndexed_AreIgnoredUntilLoaded()
+        {
+            var index = new MessageSummaryIndex();
+            long changeCount = index.ChangeCount;
+
+            index.Add(new Message { Id = Guid.NewGuid(), Subject = "ignored", Mailbox = TestMailbox, MailboxFolder = Inbox });
+            var sorted = index.GetSorted("Default", MailboxFolder.INBOX, "receivedDate", true, () => new[] { CreateProjection("loaded", 1) });
+
+            Assert.Equal(new[] { "loaded" }, sorted.Summaries.Select(s => s.Subject));
+            Assert.NotEqual(changeCount, index.ChangeCount);
+        }
+
+        private static MessageSummaryProjection CreateProjection(string subject, int day)
+        {
+            return new MessageSummaryProjection
+            {
+                Id = Guid.NewGuid(),
+                Subject = subject,
+                ReceivedDate = new DateTime(2024, 1, day),
+                IsUnread = true
+            };
+        }
+    }
+}
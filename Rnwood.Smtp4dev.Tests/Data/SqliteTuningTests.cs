@@ -0,0 +1,82 @@
+using Microsoft.EntityFrameworkCore;
+using Rnwood.Smtp4dev.Data;
+using Rnwood.Smtp4dev.DbModel;
+using Rnwood.Smtp4dev.Tests.DBMigrations.Helpers;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Data
+{
+    public class SqliteTuningTests
+    {
+        [Fact]
+        public void BuildPragmas_FileDatabase_EnablesWalAndMmap()
+        {
+            string pragmas = SqliteTuningInterceptor.BuildPragmas(false, 64L * 1024 * 1024);
+
+            Assert.Contains("journal_mode=WAL", pragmas);
+            Assert.Contains("synchronous=NORMAL", pragmas);
+            Assert.Contains("mmap_size=", pragmas);
+            Assert.Contains("cache_size=-65536", pragmas);
+        }
+
+        [Fact]
+        public void BuildPragmas_InMemoryDatabase_SkipsWalAndMmap()
+        {
+            string pragmas = SqliteTuningInterceptor.BuildPragmas(true, 64L * 1024 * 1024);
+
+            Assert.DoesNotContain("journal_mode", pragmas);
+            Assert.DoesNotContain("mmap_size", pragmas);
+            Assert.Contains("synchronous=NORMAL", pragmas);
+        }
+
+        [Fact]
+        public void GetCacheSizeBytes_IsClamped()
+        {
+            long cacheSize = SqliteTuningInterceptor.GetCacheSizeBytes();
+
+            Assert.InRange(cacheSize, 8L * 1024 * 1024, 256L * 1024 * 1024);
+        }
+
+        [Fact]
+        public void TunedConnection_AppliesPragmas()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            var options = new DbContextOptionsBuilder<Smtp4devDbContext>(sqlLiteForTesting.ContextOptions)
+                .AddInterceptors(new SqliteTuningInterceptor(true))
+                .Options;
+            using var context = new Smtp4devDbContext(options);
+
+            context.Database.OpenConnection();
+            using var command = context.Database.GetDbConnection().CreateCommand();
+            command.CommandText = "PRAGMA synchronous";
+            long synchronous = (long)command.ExecuteScalar();
+
+            // NORMAL
+            Assert.Equal(1, synchronous);
+        }
+
+        [Fact]
+        public void MailboxIdCache_ReturnsIdsAndCachesUntilCleared()
+        {
+            using var sqlLiteForTesting = new SqliteInMemory();
+            using var context = new Smtp4devDbContext(sqlLiteForTesting.ContextOptions);
+            var mailbox = new Mailbox { Name = "Test" };
+            var folder = new MailboxFolder { Name = MailboxFolder.INBOX, Mailbox = mailbox };
+            context.AddRange(mailbox, folder);
+            context.SaveChanges();
+
+            var cache = new MailboxIdCache();
+            var ids = cache.GetOrLoad(context, "Test", MailboxFolder.INBOX);
+
+            Assert.Equal(mailbox.Id, ids.MailboxId);
+            Assert.Equal(folder.Id, ids.FolderId);
+
+            context.Remove(mailbox);
+            context.SaveChanges();
+            Assert.Same(ids, cache.GetOrLoad(context, "Test", MailboxFolder.INBOX));
+
+            cache.Clear();
+            Assert.Null(cache.GetOrLoad(context, "Test", MailboxFolder.INBOX));
+        }
+    }
+}
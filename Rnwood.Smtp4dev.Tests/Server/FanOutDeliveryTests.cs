@@ -0,0 +1,225 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Net;
+using System.Net.Sockets;
+using System.Text;
+using System.Threading.Tasks;
+using MailKit.Net.Smtp;
+using MailKit.Security;
+using Microsoft.Data.Sqlite;
+using Microsoft.EntityFrameworkCore;
+using Microsoft.Extensions.DependencyInjection;
+using Microsoft.Extensions.Logging.Abstractions;
+using Rnwood.Smtp4dev.Data;
+using Rnwood.Smtp4dev.Hubs;
+using Rnwood.Smtp4dev.Server;
+using Rnwood.Smtp4dev.Server.Settings;
+using Rnwood.Smtp4dev.Tests.TestHelpers;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Server
+{
+    /// <summary>
+    /// Delivers a message matching several mailboxes through a running server, which stores a copy per mailbox.
+    /// </summary>
+    public class FanOutDeliveryTests : IDisposable
+    {
+        private readonly string connectionString = $"Data Source=file:cachedb{Guid.NewGuid()}?mode=memory&cache=shared";
+        private readonly SqliteConnection keepAliveConnection;
+        private readonly ServiceProvider serviceProvider;
+
+        public FanOutDeliveryTests()
+        {
+            keepAliveConnection = new SqliteConnection(connectionString);
+            keepAliveConnection.Open();
+
+            var services = new ServiceCollection();
+            services.AddDbContext<Smtp4devDbContext>(opt => opt.UseSqlite(connectionString));
+            services.AddScoped<MimeProcessingService>();
+            serviceProvider = services.BuildServiceProvider();
+
+            using var scope = serviceProvider.CreateScope();
+            scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>().Database.Migrate();
+        }
+
+        [Theory]
+        [InlineData(false)]
+        [InlineData(true)]
+        public async Task MessageForSeveralMailboxes_IsStoredOncePerMailbox(bool deduplicateAttachments)
+        {
+            // Arrange - a server to relay to and smtp4dev with two mailboxes besides Default
+            using var relayTarget = new Rnwood.SmtpServer.SmtpServer(Rnwood.SmtpServer.ServerOptions.Builder()
+                .WithPort(0)
+                .WithEnableIpV6(false)
+                .Build());
+            relayTarget.Start();
+
+            var serverOptions = new TestOptionsMonitor<ServerOptions>(new ServerOptions
+            {
+                Port = 0,
+                HostName = "localhost",
+                AllowRemoteConnections = false,
+                DisableIPv6 = true,
+                DeduplicateAttachments = deduplicateAttachments,
+                Mailboxes =
+                [
+                    new MailboxOptions { Name = "Sales", Recipients = "*@sales.com" },
+                    new MailboxOptions { Name = "Support", Recipients = "*@support.com" }
+                ]
+            });
+            var relayOptions = new TestOptionsMonitor<RelayOptions>(new RelayOptions
+            {
+                SmtpServer = "127.0.0.1",
+                SmtpPort = relayTarget.ListeningEndpoints.First().Port,
+                TlsMode = SecureSocketOptions.None,
+                AutomaticEmails = ["a@sales.com"]
+            });
+
+            var server = new Smtp4devServer(serviceProvider.GetRequiredService<IServiceScopeFactory>(), serverOptions, relayOptions,
+                new NotificationsHub(), CreateRelayClient, new TaskQueue(NullLogger<TaskQueue>.Instance),
+                new ScriptingHost(relayOptions, serverOptions), new MailboxIdCache(), new MessageSummaryIndex());
+            server.TryStart();
+
+            string data = string.Join("\r\n",
+                "From: from@example.com",
+                "To: a@sales.com, b@support.com, c@example.com",
+                "Subject: Fan-out",
+                "MIME-Version: 1.0",
+                "Content-Type: multipart/mixed; boundary=\"boundary\"",
+                "",
+                "--boundary",
+                "Content-Type: text/plain",
+                "",
+                "Hello",
+                "--boundary",
+                "Content-Type: application/octet-stream; name=\"attachment.bin\"",
+                "Content-Transfer-Encoding: base64",
+                "",
+                Convert.ToBase64String(Enumerable.Range(0, 8192).Select(i => (byte)i).ToArray(), Base64FormattingOptions.InsertLineBreaks),
+                "--boundary--");
+
+            try
+            {
+                // Act
+                await SendAsync(server.ListeningEndpoints.First().Port, "from@example.com",
+                    ["a@sales.com", "b@support.com", "c@example.com"], data);
+
+                // Assert
+                using var scope = serviceProvider.CreateScope();
+                var dbContext = scope.ServiceProvider.GetRequiredService<Smtp4devDbContext>();
+                var messages = await WaitForMessagesAsync(dbContext, 3);
+
+                Assert.Equal(new[] { "Sales", "Support", MailboxOptions.DEFAULTNAME }, messages.Select(m => m.Mailbox.Name));
+                Assert.Equal(new[] { "a@sales.com", "b@support.com", "c@example.com" }, messages.Select(m => m.DeliveredTo));
+                Assert.Equal(messages.Count, messages.Select(m => m.ImapUid).Distinct().Count());
+                Assert.All(messages, m => Assert.Equal(Encoding.ASCII.GetBytes(data), m.Data));
+                Assert.All(messages, m => Assert.Equal("a@sales.com", Assert.Single(m.Relays).To));
+
+                // With deduplication the attachment is split out once and every delivery refers to it.
+                Assert.Equal(deduplicateAttachments ? 1 : 0, await dbContext.AttachmentBlobs.CountAsync());
+                Assert.All(messages, m => Assert.Equal(deduplicateAttachments ? 1 : 0, m.AttachmentBlobReferences.Count));
+
+                // Every other mapped property must be copied to each delivery (see CopyForDelivery).
+                var perDeliveryProperties = new[]
+                {
+                    nameof(DbModel.Message.Id), nameof(DbModel.Message.ImapUid), nameof(DbModel.Message.DeliveredTo),
+                    nameof(DbModel.Message.MailboxFolderId), "MailboxId"
+                };
+                var sharedProperties = dbContext.Model.FindEntityType(typeof(DbModel.Message)).GetProperties()
+                    .Where(p => !perDeliveryProperties.Contains(p.Name))
+                    .ToList();
+                foreach (var message in messages.Skip(1))
+                {
+                    foreach (var property in sharedProperties)
+                    {
+                        object expected = dbContext.Entry(messages[0]).Property(property.Name).CurrentValue;
+                        object actual = dbContext.Entry(message).Property(property.Name).CurrentValue;
+                        Assert.True(expected is byte[] expectedBytes ? expectedBytes.SequenceEqual((byte[])actual) : Equals(expected, actual),
+                            $"{property.Name} differs between deliveries");
+                    }
+                }
+            }
+            finally
+            {
+                server.Stop();
+                relayTarget.Stop();
+            }
+        }
+
+        private static SmtpClient CreateRelayClient(RelayOptions relayOptions)
+        {
+            var client = new SmtpClient();
+            client.Connect(relayOptions.SmtpServer, relayOptions.SmtpPort, relayOptions.TlsMode);
+            return client;
+        }
+
+        private static async Task<List<DbModel.Message>> WaitForMessagesAsync(Smtp4devDbContext dbContext, int count)
+        {
+            // Delivery is queued, so it may complete after the client has had its response.
+            DateTime deadline = DateTime.UtcNow.AddSeconds(20);
+            while (await dbContext.Messages.CountAsync() < count)
+            {
+                if (DateTime.UtcNow > deadline)
+                {
+                    throw new TimeoutException($"{count} messages were not delivered in time");
+                }
+
+                await Task.Delay(50);
+            }
+
+            return await dbContext.Messages
+                .Include(m => m.Mailbox)
+                .Include(m => m.Relays)
+                .IncludeAttachmentBlobs()
+                .OrderBy(m => m.ImapUid)
+                .ToListAsync();
+        }
+
+        private static async Task SendAsync(int port, string from, string[] recipients, string data)
+        {
+            using var client = new TcpClient();
+            await client.ConnectAsync(IPAddress.Loopback, port);
+            using var stream = client.GetStream();
+            using var reader = new StreamReader(stream, Encoding.ASCII);
+            using var writer = new StreamWriter(stream, Encoding.ASCII) { NewLine = "\r\n", AutoFlush = true };
+
+            async Task ExpectAsync(string code)
+            {
+                string line;
+                do
+                {
+                    line = await reader.ReadLineAsync() ?? throw new EndOfStreamException();
+                } while (line.Length > 3 && line[3] == '-');
+
+                Assert.StartsWith(code, line);
+            }
+
+            await ExpectAsync("220");
+            await writer.WriteLineAsync("EHLO client");
+            await ExpectAsync("250");
+            await writer.WriteLineAsync($"MAIL FROM:<{from}>");
+            await ExpectAsync("250");
+            foreach (string recipient in recipients)
+            {
+                await writer.WriteLineAsync($"RCPT TO:<{recipient}>");
+                await ExpectAsync("250");
+            }
+
+            await writer.WriteLineAsync("DATA");
+            await ExpectAsync("354");
+            await writer.WriteLineAsync(data);
+            await writer.WriteLineAsync(".");
+            await ExpectAsync("250");
+            await writer.WriteLineAsync("QUIT");
+            await ExpectAsync("221");
+        }
+
+        public void Dispose()
+        {
+            serviceProvider.Dispose();
+            keepAliveConnection.Dispose();
+        }
+    }
+}
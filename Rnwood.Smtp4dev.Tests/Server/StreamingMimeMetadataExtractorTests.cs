@@ -0,0 +1,195 @@
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using MimeKit;
+using Rnwood.Smtp4dev.Server;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Server
+{
+    public class StreamingMimeMetadataExtractorTests
+    {
+        private readonly MimeProcessingService mimeProcessingService = new MimeProcessingService();
+
+        [Fact]
+        public void MultipartWithAttachments_MatchesFullParse()
+        {
+            var builder = new BodyBuilder
+            {
+                TextBody = "Plain body text",
+                HtmlBody = "<p>Html <b>body</b> text</p>"
+            };
+            builder.Attachments.Add("first.bin", Enumerable.Range(0, 100_000).Select(i => (byte)i).ToArray());
+            builder.Attachments.Add("second.pdf", new byte[5000]);
+            var message = CreateMessage(builder.ToMessageBody());
+            message.Cc.Add(new MailboxAddress("Cc", "cc@example.com"));
+
+            var extractor = Extract(message);
+
+            Assert.True(extractor.Succeeded);
+            AssertMatchesFullParse(message, extractor);
+            Assert.Equal(2, extractor.AttachmentCount);
+            Assert.Equal(new[] { "first.bin", "second.pdf" }, extractor.Metadata.AttachmentFilenames);
+        }
+
+        [Fact]
+        public void AttachedMessage_CountsNestedAttachmentsButNotNestedMetadata()
+        {
+            var innerBuilder = new BodyBuilder { TextBody = "Inner text" };
+            innerBuilder.Attachments.Add("inner.txt", Encoding.ASCII.GetBytes("inner attachment"));
+            var inner = CreateMessage(innerBuilder.ToMessageBody());
+
+            var outer = new Multipart("mixed")
+            {
+                new TextPart("plain") { Text = "Outer text" },
+                new MessagePart { Message = inner, ContentDisposition = new ContentDisposition(ContentDisposition.Attachment) { FileName = "inner.eml" } }
+            };
+            var message = CreateMessage(outer);
+
+            var extractor = Extract(message);
+
+            Assert.True(extractor.Succeeded);
+            AssertMatchesFullParse(message, extractor);
+            Assert.Equal(2, extractor.AttachmentCount);
+            Assert.StartsWith("Outer text", extractor.TextBody);
+        }
+
+        [Fact]
+        public void NestedAlternatives_BodyTextMatchesFallback()
+        {
+            var alternatives = new MultipartAlternative
+            {
+                new TextPart("plain") { Text = "Least faithful plain text" },
+                new MultipartAlternative
+                {
+                    new TextPart("plain") { Text = "Preferred plain text" },
+                    new TextPart("html") { Text = "<p>Preferred html</p>" }
+                }
+            };
+            var message = CreateMessage(new Multipart("mixed")
+            {
+                alternatives,
+                new MimePart("application", "octet-stream")
+                {
+                    Content = new MimeContent(new MemoryStream(new byte[5000])),
+                    ContentTransferEncoding = ContentEncoding.Base64,
+                    ContentDisposition = new ContentDisposition(ContentDisposition.Attachment) { FileName = "data.bin" }
+                }
+            });
+
+            var extractor = Extract(message);
+
+            Assert.True(extractor.Succeeded);
+            AssertMatchesFullParse(message, extractor);
+            Assert.StartsWith("Preferred plain text", extractor.TextBody);
+
+            var parsed = MimeMessage.Load(new MemoryStream(ToBytes(message)));
+            Assert.Equal(mimeProcessingService.ExtractBodyText(parsed),
+                mimeProcessingService.BuildBodyText(extractor.TextBody, extractor.HtmlBody));
+        }
+
+        [Fact]
+        public void QuotedPrintableHtml_IsDecoded()
+        {
+            var html = new TextPart("html") { Text = "<p>café " + new string('x', 200) + "</p>" };
+            html.ContentTransferEncoding = ContentEncoding.QuotedPrintable;
+            var message = CreateMessage(html);
+
+            var extractor = Extract(message);
+
+            Assert.True(extractor.Succeeded);
+            Assert.Contains("café", extractor.HtmlBody);
+            Assert.Null(extractor.TextBody);
+            Assert.True(extractor.Metadata.HasHtmlBody);
+        }
+
+        [Fact]
+        public void LargeTextBody_IsCapped()
+        {
+            var message = CreateMessage(new TextPart("plain") { Text = new string('a', StreamingMimeMetadataExtractor.MaxBodyTextLength * 2) });
+
+            var extractor = Extract(message);
+
+            Assert.True(extractor.Succeeded);
+            Assert.Equal(StreamingMimeMetadataExtractor.MaxBodyTextLength, extractor.TextBody.Length);
+        }
+
+        [Fact]
+        public void NoHeaderSeparator_DoesNotSucceed()
+        {
+            var extractor = new StreamingMimeMetadataExtractor();
+            extractor.OnDataLine(Encoding.ASCII.GetBytes("Subject: test"));
+            extractor.OnDataCompleted();
+
+            Assert.False(extractor.Succeeded);
+        }
+
+        private static MimeMessage CreateMessage(MimeEntity body)
+        {
+            var message = new MimeMessage();
+            message.From.Add(new MailboxAddress("From", "from@example.com"));
+            message.To.Add(new MailboxAddress("To", "to@example.com"));
+            message.Subject = "Streaming test";
+            message.Body = body;
+            return message;
+        }
+
+        private static StreamingMimeMetadataExtractor Extract(MimeMessage message)
+        {
+            var extractor = new StreamingMimeMetadataExtractor();
+            foreach (byte[] line in SplitLines(ToBytes(message)))
+            {
+                extractor.OnDataLine(line);
+            }
+            extractor.OnDataCompleted();
+            return extractor;
+        }
+
+        private void AssertMatchesFullParse(MimeMessage message, StreamingMimeMetadataExtractor extractor)
+        {
+            var parsed = MimeMessage.Load(new MemoryStream(ToBytes(message)));
+            var expected = mimeProcessingService.ExtractMimeMetadata(parsed);
+
+            Assert.Equal(parsed.Subject, extractor.Subject);
+            Assert.Equal(expected.CcRecipients, extractor.Metadata.CcRecipients);
+            Assert.Equal(expected.AttachmentFilenames, extractor.Metadata.AttachmentFilenames);
+            Assert.Equal(expected.HasHtmlBody, extractor.Metadata.HasHtmlBody);
+            Assert.Equal(expected.HasTextBody, extractor.Metadata.HasTextBody);
+            Assert.Equal(expected.ContentType, extractor.Metadata.ContentType);
+            Assert.Equal(expected.PartCount, extractor.Metadata.PartCount);
+            Assert.Equal(expected.HasDuplicatedContentIds, extractor.Metadata.HasDuplicatedContentIds);
+            Assert.Equal(parsed.TextBody?.TrimEnd(), extractor.TextBody?.TrimEnd());
+            Assert.Equal(parsed.HtmlBody?.TrimEnd(), extractor.HtmlBody?.TrimEnd());
+        }
+
+        private static byte[] ToBytes(MimeMessage message)
+        {
+            var options = FormatOptions.Default.Clone();
+            options.NewLineFormat = NewLineFormat.Dos;
+
+            using var stream = new MemoryStream();
+            message.WriteTo(options, stream);
+            return stream.ToArray();
+        }
+
+        private static IEnumerable<byte[]> SplitLines(byte[] data)
+        {
+            int start = 0;
+            for (int i = 0; i < data.Length - 1; i++)
+            {
+                if (data[i] == '\r' && data[i + 1] == '\n')
+                {
+                    yield return data[start..i];
+                    start = i + 2;
+                    i++;
+                }
+            }
+
+            if (start < data.Length)
+            {
+                yield return data[start..];
+            }
+        }
+    }
+}
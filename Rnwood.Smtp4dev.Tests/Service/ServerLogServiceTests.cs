@@ -0,0 +1,108 @@
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Rnwood.Smtp4dev.Service;
+using Serilog.Events;
+using Serilog.Parsing;
+using Xunit;
+
+namespace Rnwood.Smtp4dev.Tests.Service
+{
+    public class ServerLogServiceTests
+    {
+        [Fact]
+        public void Emit_BeyondCapacity_KeepsNewestEntriesWithSequenceNumbers()
+        {
+            using var service = CreateService(3);
+
+            for (int i = 1; i <= 5; i++)
+            {
+                service.Emit(CreateEvent(LogEventLevel.Information, "Entry " + i));
+            }
+
+            var entries = service.GetAllLogEntries().ToArray();
+            Assert.Equal(new long[] { 3, 4, 5 }, entries.Select(e => e.Sequence));
+            Assert.Equal("Entry 5", entries[2].Message);
+            Assert.Equal(5, service.LastSequence);
+        }
+
+        [Fact]
+        public void GetEntriesSince_ReturnsOnlyLaterEntries()
+        {
+            using var service = CreateService(10);
+            for (int i = 1; i <= 5; i++)
+            {
+                service.Emit(CreateEvent(LogEventLevel.Information, "Entry " + i));
+            }
+
+            Assert.Equal(new long[] { 4, 5 }, service.GetEntriesSince(3).Select(e => e.Sequence));
+            Assert.Equal(new long[] { 4 }, service.GetEntriesSince(3, maxCount: 1).Select(e => e.Sequence));
+            Assert.Empty(service.GetEntriesSince(5));
+        }
+
+        [Fact]
+        public void GetEntriesSince_MinimumLevel_FiltersLowerLevels()
+        {
+            using var service = CreateService(10);
+            service.Emit(CreateEvent(LogEventLevel.Debug, "Debug"));
+            service.Emit(CreateEvent(LogEventLevel.Warning, "Warning"));
+            service.Emit(CreateEvent(LogEventLevel.Information, "Information"));
+            service.Emit(CreateEvent(LogEventLevel.Error, "Error"));
+
+            var entries = service.GetEntriesSince(0, LogEventLevel.Warning);
+
+            Assert.Equal(new[] { "Warning", "Error" }, entries.Select(e => e.Message));
+        }
+
+        [Fact]
+        public void Clear_KeepsSequenceIncreasing()
+        {
+            using var service = CreateService(10);
+            service.Emit(CreateEvent(LogEventLevel.Information, "Before"));
+
+            service.Clear();
+            service.Emit(CreateEvent(LogEventLevel.Information, "After"));
+
+            var entry = Assert.Single(service.GetAllLogEntries());
+            Assert.Equal(2, entry.Sequence);
+        }
+
+        [Fact]
+        public void PublishPendingEntries_RaisesOneBatchPerCall()
+        {
+            using var service = CreateService(10);
+            var batches = new List<IReadOnlyList<LogEntry>>();
+            service.LogsReceived += (_, entries) => batches.Add(entries);
+
+            service.Emit(CreateEvent(LogEventLevel.Information, "First"));
+            service.Emit(CreateEvent(LogEventLevel.Information, "Second"));
+            service.PublishPendingEntries();
+            service.PublishPendingEntries();
+            service.Emit(CreateEvent(LogEventLevel.Information, "Third"));
+            service.PublishPendingEntries();
+
+            Assert.Equal(2, batches.Count);
+            Assert.Equal(new[] { "First", "Second" }, batches[0].Select(e => e.Message));
+            Assert.Equal(new[] { "Third" }, batches[1].Select(e => e.Message));
+        }
+
+        [Theory]
+        [InlineData(0)]
+        [InlineData(-1)]
+        public void Constructor_CapacityLessThanOne_Throws(int capacity)
+        {
+            Assert.Throws<ArgumentOutOfRangeException>(() => CreateService(capacity));
+        }
+
+        private static ServerLogService CreateService(int capacity)
+        {
+            // Publishing is triggered manually by the tests.
+            return new ServerLogService(capacity, System.Threading.Timeout.InfiniteTimeSpan);
+        }
+
+        private static LogEvent CreateEvent(LogEventLevel level, string message)
+        {
+            return new LogEvent(DateTimeOffset.Now, level, null, new MessageTemplateParser().Parse(message), Array.Empty<LogEventProperty>());
+        }
+    }
+}
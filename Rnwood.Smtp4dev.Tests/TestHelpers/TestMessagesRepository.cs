@@ -39,6 +39,13 @@ namespace Rnwood.Smtp4dev.Tests.TestHelpers
 
         public IQueryable<MessageSummaryProjection> GetMessageSummaries(string mailboxName, string folderName) => messages.Select(m => new MessageSummaryProjection { Id = m.Id, Subject = m.Subject }).AsQueryable();
 
+        public SortedMessageSummaries GetSortedMessageSummaries(string mailboxName, string folderName, string sortColumn, bool sortIsDescending) =>
+            new SortedMessageSummaries(GetMessageSummaries(mailboxName, folderName).Select(m => new ApiModel.MessageSummary(m)).ToArray(), null);
+
+        public void OnMessageRelayed(Guid id)
+        {
+        }
+
         public Task<Message> TryGetMessageById(Guid id, bool tracked) => Task.FromResult(messages.FirstOrDefault(x => x.Id == id));
 
         public Task MarkAllMessagesRead(string mailbox)
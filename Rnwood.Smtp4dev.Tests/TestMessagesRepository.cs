@@ -1,6 +1,7 @@
 ﻿using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Linq.Dynamic.Core;
 using System.Threading.Tasks;
 using Rnwood.Smtp4dev.Data;
 using Rnwood.Smtp4dev.DbModel;
@@ -65,6 +66,19 @@ namespace Rnwood.Smtp4dev.Tests
                 }).AsQueryable();
         }
 
+        public SortedMessageSummaries GetSortedMessageSummaries(string mailboxName, string folderName, string sortColumn, bool sortIsDescending)
+        {
+            var summaries = GetMessageSummaries(mailboxName, folderName)
+                .OrderBy(sortColumn + (sortIsDescending ? " DESC" : ""))
+                .Select(m => new ApiModel.MessageSummary(m))
+                .ToArray();
+            return new SortedMessageSummaries(summaries, null);
+        }
+
+        public void OnMessageRelayed(Guid id)
+        {
+        }
+
         public Task MarkAllMessagesRead(string mailboxName)
         {
             foreach (var msg in Messages)
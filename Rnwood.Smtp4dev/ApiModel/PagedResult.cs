@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Collections.Generic;
+using System.Text.Json.Serialization;
 
 namespace Rnwood.Smtp4dev.ApiModel
 {
@@ -15,10 +16,16 @@ namespace Rnwood.Smtp4dev.ApiModel
         public int LastRowOnPage => Math.Min(CurrentPage * PageSize, RowCount);
     }
 
-    public class PagedResult<T> : PagedResultBase where T : class
+    public class PagedResult<T> : PagedResultBase, ICacheByKey where T : class
     {
         public IList<T> Results { get; set; }
 
+        /// <summary>
+        /// Identifies the contents of the page for ETag generation. Pages without a key are not cached.
+        /// </summary>
+        [JsonIgnore]
+        public string CacheKey { get; set; }
+
         public PagedResult()
         {
             Results = new List<T>();
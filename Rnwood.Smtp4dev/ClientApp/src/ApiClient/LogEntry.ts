@@ -5,4 +5,5 @@ export default class LogEntry {
     exception: string = "";
     source: string = "";
     formattedMessage: string = "";
+    sequence: number = 0;
 }
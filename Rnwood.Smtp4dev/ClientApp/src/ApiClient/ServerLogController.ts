@@ -15,17 +15,19 @@ export default class ServerLogController {
     }
 
     // get: api/ServerLog/entries
-    public getServerLogEntries_url(level?: string, source?: string, search?: string): string {
+    public getServerLogEntries_url(level?: string, source?: string, search?: string, since?: number, minLevel?: string): string {
         const params = new URLSearchParams();
         if (level) params.append("level", level);
         if (source) params.append("source", source);
         if (search) params.append("search", search);
+        if (since) params.append("since", since.toString());
+        if (minLevel) params.append("minLevel", minLevel);
         const queryString = params.toString();
         return `api/ServerLog/entries${queryString ? "?" + queryString : ""}`;
     }
 
-    public async getServerLogEntries(level?: string, source?: string, search?: string): Promise<LogEntry[]> {
-        return (await axios.get(this.getServerLogEntries_url(level, source, search), null || undefined))
+    public async getServerLogEntries(level?: string, source?: string, search?: string, since?: number, minLevel?: string): Promise<LogEntry[]> {
+        return (await axios.get(this.getServerLogEntries_url(level, source, search, since, minLevel), null || undefined))
             .data as LogEntry[];
     }
 
@@ -32,6 +32,7 @@ namespace Rnwood.Smtp4dev
                 { "disableipv6", "If true, SMTP and IMAP servers will NOT listen using IPv6 Dual Stack", data => map.Add((data !=null).ToString(), x => x.ServerOptions.DisableIPv6)},
                 { "smtpport=", "Set the port the SMTP server listens on. Specify 0 to assign automatically", data => map.Add(data, x => x.ServerOptions.Port) },
                 { "db=", "Specifies the path where the database will be stored relative to APPDATA env var on Windows or XDG_CONFIG_HOME on non-Windows. Specify \"\" to use an in memory database.", data => map.Add(data, x => x.ServerOptions.Database) },
+                { "dbprofile=", "Specifies the SQLite tuning profile. Valid options: Default, Tuned (WAL, synchronous=NORMAL, memory mapped I/O and a larger page cache).", data => map.Add(data, x => x.ServerOptions.DatabaseProfile) },
                 { "messagestokeep=", "Specifies the number of messages to keep per mailbox", data => map.Add(data, x => x.ServerOptions.NumberOfMessagesToKeep) },
                 { "sessionstokeep=", "Specifies the number of sessions to keep", data => map.Add(data, x => x.ServerOptions.NumberOfSessionsToKeep) },
                 { "tlsmode=", "Specifies the TLS mode to use for SMTP only. (POP3 uses --pop3tlsmode). Valid options: None, StartTls, ImplicitTls.", data => map.Add(data, x => x.ServerOptions.TlsMode) },
@@ -74,6 +75,10 @@ namespace Rnwood.Smtp4dev
                 { "tlsciphersuites=", "Specifies the TLS cipher suites to be allowed. Not supported on Windows. Separate with commas. See https://learn.microsoft.com/en-us/dotnet/api/system.net.security.tlsciphersuite?view=net-9.0", data => map.Add(data, x => x.ServerOptions.TlsCipherSuites) },
                 { "HtmlValidateConfigfile=", "Defines path to a config file used for HTML validation. See https://html-validate.org/usage/index.html#configuration", data => map.Add(File.ReadAllText(data), x => x.ServerOptions.HtmlValidateConfig) },
                 { "maxmessagesize=", "Defines the maximum message size in bytes accepted by the SMTP server", data => map.Add(data, x => x.ServerOptions.MaxMessageSize) },
+                { "streamingmimeextraction", "Extracts MIME metadata and body text while message data is received, skipping attachment decoding and capping body text.", data => map.Add((data != null).ToString(), x => x.ServerOptions.StreamingMimeExtraction) },
+                { "deduplicateattachments", "Stores the content of attachments received over SMTP once per distinct content, shared between messages.", data => map.Add((data != null).ToString(), x => x.ServerOptions.DeduplicateAttachments) },
+                { "faststart", "Reduces startup time for short-lived instances: in-memory databases are created without replaying migrations, the TLS certificate is prepared in the background and servers start in parallel.", data => map.Add((data != null).ToString(), x => x.ServerOptions.FastStart) },
+                { "trafficcapturedir=", "Specifies a directory to which the raw traffic of each SMTP session is captured, one file per session, for replaying with benchmarks/replay.py. Specify \"\" to disable capturing.", data => map.Add(data, x => x.ServerOptions.TrafficCaptureDirectory) },
                 { "tui", "Run with Terminal User Interface (TUI) instead of web interface", data => map.Add((data != null).ToString(), x => x.UseTui) },
                 { "delivertostdout=", "Specifies mailboxes (comma-separated) or '*' to output received raw message content to stdout", data => map.Add(data, x => x.ServerOptions.DeliverToStdout) },
                 { "exitafter=", "Specifies the number of messages to receive before exiting the application (used with delivertostdout)", data => map.Add(data, x => x.ServerOptions.ExitAfterMessages) },
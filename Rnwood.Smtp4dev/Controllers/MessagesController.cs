@@ -74,32 +74,41 @@ namespace Rnwood.Smtp4dev.Controllers
         /// <param name="sortIsDescending">True if sort should be descending</param>
         /// <param name="page">Page number to retrieve</param>
         /// <param name="pageSize">Max number of items to retrieve</param>
-        /// <returns></returns>
+        /// <returns>Unless searching, the page has an ETag and is not modified (304) until the folder changes.</returns>
         [HttpGet]
         [SwaggerResponse(System.Net.HttpStatusCode.OK, typeof(ApiModel.PagedResult<MessageSummary>), Description = "")]
         public ApiModel.PagedResult<MessageSummary> GetSummaries(string searchTerms, string mailboxName = MailboxOptions.DEFAULTNAME, string folderName = MailboxFolder.INBOX, string sortColumn = "receivedDate",
             bool sortIsDescending = true, int page = 1,
             int pageSize = 5)
         {
+            if (string.IsNullOrEmpty(searchTerms))
+            {
+                var sorted = messagesRepository.GetSortedMessageSummaries(mailboxName, folderName, sortColumn, sortIsDescending);
+                var result = sorted.Summaries.GetPaged(page, pageSize);
+                if (sorted.Version != null)
+                {
+                    result.CacheKey = string.Join("/", sorted.Version, mailboxName, folderName, sortColumn, sortIsDescending, page, pageSize);
+                }
+
+                return result;
+            }
+
             IQueryable<DbModel.Projections.MessageSummaryProjection> query = messagesRepository.GetMessageSummaries(mailboxName, folderName);
              
             query = query.OrderBy(sortColumn + (sortIsDescending ? " DESC" : ""));
 
-            if (!string.IsNullOrEmpty(searchTerms))
-            {
-                var searchTermsLower = searchTerms.ToLower();
-                
-                // Enhanced search using database fields - no need for message limits
-                query = query.Where(m => 
-                    // Basic fields
-                    m.Subject.ToLower().Contains(searchTermsLower) ||
-                    m.From.ToLower().Contains(searchTermsLower) ||
-                    m.To.ToLower().Contains(searchTermsLower) ||
-                    // Extended fields from database - need to access them through the Message entity
-                    (m.MimeMetadata != null && m.MimeMetadata.ToLower().Contains(searchTermsLower)) ||
-                    (m.BodyText != null && m.BodyText.ToLower().Contains(searchTermsLower))
-                );
-            }
+            var searchTermsLower = searchTerms.ToLower();
+            
+            // Enhanced search using database fields - no need for message limits
+            query = query.Where(m => 
+                // Basic fields
+                m.Subject.ToLower().Contains(searchTermsLower) ||
+                m.From.ToLower().Contains(searchTermsLower) ||
+                m.To.ToLower().Contains(searchTermsLower) ||
+                // Extended fields from database - need to access them through the Message entity
+                (m.MimeMetadata != null && m.MimeMetadata.ToLower().Contains(searchTermsLower)) ||
+                (m.BodyText != null && m.BodyText.ToLower().Contains(searchTermsLower))
+            );
 
             return query
                 .Select(m => new MessageSummary(m))
@@ -358,6 +367,7 @@ namespace Rnwood.Smtp4dev.Controllers
                 }
 
                 messagesRepository.DbContext.SaveChanges();
+                messagesRepository.OnMessageRelayed(message.Id);
             }
 
             return Ok();
@@ -605,8 +615,7 @@ namespace Rnwood.Smtp4dev.Controllers
                 dbMessage.IsUnread = true;
 
                 // Add to database
-                dbContext.Messages.Add(dbMessage);
-                await dbContext.SaveChangesAsync();
+                await messagesRepository.AddMessage(dbMessage);
 
                 return Ok(dbMessage.Id);
             }
@@ -1,5 +1,8 @@
 using Microsoft.AspNetCore.Mvc;
 using Rnwood.Smtp4dev.Service;
+using NSwag.Annotations;
+using Serilog.Events;
+using System;
 using System.Collections.Generic;
 using System.Linq;
 
@@ -32,11 +35,25 @@ namespace Rnwood.Smtp4dev.Controllers
         /// <param name="level">Optional log level filter (e.g., "Information", "Warning", "Error")</param>
         /// <param name="source">Optional source filter</param>
         /// <param name="search">Optional text search filter</param>
-        /// <returns>Array of structured log entries</returns>
+        /// <param name="since">Optional sequence number of the last entry already seen. Only later entries are returned.</param>
+        /// <param name="minLevel">Optional minimum log level. Entries of this level or higher are returned.</param>
+        /// <returns>Array of structured log entries, oldest first</returns>
         [HttpGet("entries")]
-        public IEnumerable<LogEntry> GetLogEntries(string level = null, string source = null, string search = null)
+        [SwaggerResponse(System.Net.HttpStatusCode.OK, typeof(LogEntry[]), Description = "")]
+        [SwaggerResponse(System.Net.HttpStatusCode.BadRequest, typeof(void), Description = "If minLevel is not a valid log level")]
+        public ActionResult<IEnumerable<LogEntry>> GetLogEntries(string level = null, string source = null, string search = null, long since = 0, string minLevel = null)
         {
-            var entries = _serverLogService.GetAllLogEntries();
+            LogEventLevel? minimumLevel = null;
+            if (!string.IsNullOrEmpty(minLevel))
+            {
+                if (!Enum.TryParse(minLevel, true, out LogEventLevel parsedLevel))
+                {
+                    return BadRequest($"Unknown log level '{minLevel}'");
+                }
+                minimumLevel = parsedLevel;
+            }
+
+            IEnumerable<LogEntry> entries = _serverLogService.GetEntriesSince(since, minimumLevel);
 
             // Apply filters
             if (!string.IsNullOrEmpty(level))
@@ -56,7 +73,7 @@ namespace Rnwood.Smtp4dev.Controllers
                     e.Exception.Contains(search, System.StringComparison.OrdinalIgnoreCase));
             }
 
-            return entries;
+            return Ok(entries);
         }
 
         /// <summary>
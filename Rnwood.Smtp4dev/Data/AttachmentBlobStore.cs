@@ -0,0 +1,201 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Security.Cryptography;
+using Microsoft.EntityFrameworkCore;
+using MimeKit;
+using MimeKit.IO;
+using Rnwood.Smtp4dev.DbModel;
+
+namespace Rnwood.Smtp4dev.Data
+{
+    /// <summary>
+    /// Content addressed store for attachments, so that an attachment received in many messages is stored once.
+    ///
+    /// The encoded content of each attachment is cut out of the message data and stored as an <see cref="AttachmentBlob"/>
+    /// keyed by its hash. The message keeps the remaining data plus an <see cref="AttachmentBlobReference"/> per attachment
+    /// recording where the content belongs, and <see cref="Message.Data"/> reassembles the original bytes on demand.
+    ///
+    /// References are deleted along with their message by the database, so a blob is no longer needed once it has no
+    /// references. <see cref="DeleteUnreferencedBlobs"/> must be called after messages are deleted.
+    /// </summary>
+    public static class AttachmentBlobStore
+    {
+        /// <summary>
+        /// Attachments with less encoded content than this are left in the message as the saving would not be worth the extra rows.
+        /// </summary>
+        public const int MinimumAttachmentSize = 4096;
+
+        /// <summary>
+        /// Moves the content of the attachments in <paramref name="message"/> into the store, reusing existing blobs
+        /// with the same content. The message must not have been saved yet and its data must not have been split already.
+        /// </summary>
+        /// <returns>The number of attachments split out.</returns>
+        public static int SplitAttachments(Smtp4devDbContext dbContext, Message message)
+        {
+            byte[] data = message.Data;
+            if (data == null || message.AttachmentBlobReferences.Count > 0 || !string.IsNullOrEmpty(message.MimeParseError))
+            {
+                return 0;
+            }
+
+            List<(long Start, long End)> ranges = FindAttachmentContent(data);
+            if (ranges.Count == 0)
+            {
+                return 0;
+            }
+
+            var storedData = new MemoryStream(data.Length);
+            var references = new List<AttachmentBlobReference>();
+            long position = 0;
+
+            foreach ((long start, long end) in ranges)
+            {
+                if (start < position)
+                {
+                    continue;
+                }
+
+                storedData.Write(data, (int)position, (int)(start - position));
+
+                byte[] content = data[(int)start..(int)end];
+                AttachmentBlob blob = GetOrAddBlob(dbContext, content);
+                references.Add(new AttachmentBlobReference
+                {
+                    Offset = storedData.Position,
+                    BlobHash = blob.Hash,
+                    Blob = blob
+                });
+                position = end;
+            }
+
+            storedData.Write(data, (int)position, (int)(data.Length - position));
+
+            message.Data = storedData.ToArray();
+            message.AttachmentBlobReferences.AddRange(references);
+            message.AttachmentBlobCount = references.Count;
+            return references.Count;
+        }
+
+        /// <summary>
+        /// Includes the blobs needed to reassemble <see cref="Message.Data"/>. Queries which read
+        /// <see cref="Message.Data"/> must use this, as the blobs are not loaded otherwise.
+        /// </summary>
+        public static IQueryable<Message> IncludeAttachmentBlobs(this IQueryable<Message> messages)
+        {
+            return messages.Include(m => m.AttachmentBlobReferences).ThenInclude(r => r.Blob);
+        }
+
+        /// <summary>
+        /// Gets the length of <see cref="Message.Data"/> for each of <paramref name="messages"/>, calculated by the
+        /// database so that neither the message data nor the blobs are loaded.
+        /// </summary>
+        public static Dictionary<Guid, long> GetDataSizes(IQueryable<Message> messages)
+        {
+            return messages
+                .Select(m => new
+                {
+                    m.Id,
+                    Size = (m.StoredData == null ? 0L : m.StoredData.Length) + m.AttachmentBlobReferences.Sum(r => (long)r.Blob.Data.Length)
+                })
+                .ToDictionary(m => m.Id, m => m.Size);
+        }
+
+        /// <summary>
+        /// Deletes blobs which are no longer referenced by any message.
+        /// </summary>
+        /// <returns>The number of blobs deleted.</returns>
+        public static int DeleteUnreferencedBlobs(Smtp4devDbContext dbContext)
+        {
+            return dbContext.AttachmentBlobs
+                .Where(b => !b.References.Any())
+                .ExecuteDelete();
+        }
+
+        /// <summary>
+        /// Reinserts the blob content for <paramref name="references"/> into <paramref name="storedData"/>.
+        /// </summary>
+        public static byte[] Reassemble(byte[] storedData, IEnumerable<AttachmentBlobReference> references)
+        {
+            List<AttachmentBlobReference> ordered = references.OrderBy(r => r.Offset).ToList();
+            if (ordered.Any(r => r.Blob?.Data == null))
+            {
+                throw new InvalidOperationException("Attachment blobs must be loaded to reassemble message data.");
+            }
+
+            var result = new byte[storedData.Length + ordered.Sum(r => r.Blob.Data.Length)];
+            int position = 0;
+            int resultPosition = 0;
+
+            foreach (AttachmentBlobReference reference in ordered)
+            {
+                int length = (int)reference.Offset - position;
+                Buffer.BlockCopy(storedData, position, result, resultPosition, length);
+                resultPosition += length;
+                position = (int)reference.Offset;
+
+                Buffer.BlockCopy(reference.Blob.Data, 0, result, resultPosition, reference.Blob.Data.Length);
+                resultPosition += reference.Blob.Data.Length;
+            }
+
+            Buffer.BlockCopy(storedData, position, result, resultPosition, storedData.Length - position);
+            return result;
+        }
+
+        private static AttachmentBlob GetOrAddBlob(Smtp4devDbContext dbContext, byte[] content)
+        {
+            string hash = Convert.ToHexStringLower(SHA256.HashData(content));
+
+            AttachmentBlob blob = dbContext.AttachmentBlobs.Local.FirstOrDefault(b => b.Hash == hash);
+            if (blob != null)
+            {
+                return blob;
+            }
+
+            // The existing content is identical, so attach rather than loading it.
+            blob = new AttachmentBlob { Hash = hash, Data = content };
+            if (dbContext.AttachmentBlobs.Any(b => b.Hash == hash))
+            {
+                dbContext.AttachmentBlobs.Attach(blob);
+            }
+            else
+            {
+                dbContext.AttachmentBlobs.Add(blob);
+            }
+
+            return blob;
+        }
+
+        private static List<(long Start, long End)> FindAttachmentContent(byte[] data)
+        {
+            var ranges = new List<(long Start, long End)>();
+
+            MimeMessage mimeMessage;
+            try
+            {
+                // Persistent loading leaves each part's content as a window onto the original data.
+                mimeMessage = MimeMessage.Load(new MemoryStream(data, false), true);
+            }
+            catch (FormatException)
+            {
+                return ranges;
+            }
+
+            foreach (MimePart part in mimeMessage.BodyParts.OfType<MimePart>())
+            {
+                if (part.IsAttachment
+                    && part.Content?.Stream is BoundStream content
+                    && content.StartBoundary >= 0
+                    && content.EndBoundary <= data.Length
+                    && content.EndBoundary - content.StartBoundary >= MinimumAttachmentSize)
+                {
+                    ranges.Add((content.StartBoundary, content.EndBoundary));
+                }
+            }
+
+            ranges.Sort();
+            return ranges;
+        }
+    }
+}
@@ -0,0 +1,30 @@
+using System;
+using System.Linq;
+using Microsoft.EntityFrameworkCore;
+using Rnwood.Smtp4dev.DbModel;
+
+namespace Rnwood.Smtp4dev.Data
+{
+    /// <summary>
+    /// Precompiled EF queries for lookups that run once or more per received message.
+    /// </summary>
+    internal static class CompiledQueries
+    {
+        public static readonly Func<Smtp4devDbContext, string, Guid?> MailboxIdByName =
+            EF.CompileQuery((Smtp4devDbContext dbContext, string mailboxName) =>
+                dbContext.Mailboxes
+                    .Where(m => m.Name == mailboxName)
+                    .Select(m => (Guid?)m.Id)
+                    .FirstOrDefault());
+
+        public static readonly Func<Smtp4devDbContext, Guid, string, Guid?> FolderIdByMailboxIdAndName =
+            EF.CompileQuery((Smtp4devDbContext dbContext, Guid mailboxId, string folderName) =>
+                dbContext.MailboxFolders
+                    .Where(f => f.MailboxId == mailboxId && f.Name == folderName)
+                    .Select(f => (Guid?)f.Id)
+                    .FirstOrDefault());
+
+        public static readonly Func<Smtp4devDbContext, ImapState> ImapState =
+            EF.CompileQuery((Smtp4devDbContext dbContext) => dbContext.ImapState.Single());
+    }
+}
@@ -18,6 +18,16 @@ namespace Rnwood.Smtp4dev.Data
         IQueryable<Message> GetMessages(string mailboxName, string folderName, bool unTracked = true);
         IQueryable<MessageSummaryProjection> GetMessageSummaries(string mailboxName, string folderName);
 
+        /// <summary>
+        /// Gets all summaries in the folder sorted by the named column. Served from the in-memory summary index where available.
+        /// </summary>
+        SortedMessageSummaries GetSortedMessageSummaries(string mailboxName, string folderName, string sortColumn, bool sortIsDescending);
+
+        /// <summary>
+        /// Must be called after relays have been added to a message and saved so message lists show it as relayed.
+        /// </summary>
+        void OnMessageRelayed(Guid id);
+
         Task DeleteMessage(Guid id);
 
         Task DeleteAllMessages(string mailbox);
@@ -0,0 +1,49 @@
+using System;
+using System.Collections.Concurrent;
+
+namespace Rnwood.Smtp4dev.Data
+{
+    /// <summary>
+    /// Caches mailbox and folder ids by name so message delivery does not need to look them up for every message.
+    /// Must be cleared whenever mailboxes or folders are deleted.
+    /// </summary>
+    public class MailboxIdCache
+    {
+        private readonly ConcurrentDictionary<(string MailboxName, string FolderName), MailboxFolderIds> cache = new();
+
+        /// <summary>
+        /// Gets the ids for the named mailbox and folder, loading them from the database on a cache miss.
+        /// Returns null if the mailbox does not exist. Misses are not cached.
+        /// </summary>
+        public MailboxFolderIds GetOrLoad(Smtp4devDbContext dbContext, string mailboxName, string folderName)
+        {
+            if (cache.TryGetValue((mailboxName, folderName), out MailboxFolderIds ids))
+            {
+                return ids;
+            }
+
+            Guid? mailboxId = CompiledQueries.MailboxIdByName(dbContext, mailboxName);
+            if (!mailboxId.HasValue)
+            {
+                return null;
+            }
+
+            Guid? folderId = CompiledQueries.FolderIdByMailboxIdAndName(dbContext, mailboxId.Value, folderName);
+            ids = new MailboxFolderIds(mailboxId.Value, folderId);
+
+            if (folderId.HasValue)
+            {
+                cache[(mailboxName, folderName)] = ids;
+            }
+
+            return ids;
+        }
+
+        public void Clear()
+        {
+            cache.Clear();
+        }
+    }
+
+    public record MailboxFolderIds(Guid MailboxId, Guid? FolderId);
+}
@@ -0,0 +1,238 @@
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.Linq;
+using System.Linq.Dynamic.Core;
+using System.Threading;
+using Rnwood.Smtp4dev.DbModel;
+using Rnwood.Smtp4dev.DbModel.Projections;
+
+namespace Rnwood.Smtp4dev.Data
+{
+    /// <summary>
+    /// Keeps the message summaries of each mailbox folder in memory so message lists can be sorted and paged without
+    /// querying the database on every refresh. A folder is loaded on first use and is then updated incrementally by the
+    /// code which changes messages. Changes must be applied to the index after they have been saved to the database.
+    /// </summary>
+    public class MessageSummaryIndex
+    {
+        private readonly ConcurrentDictionary<(string MailboxName, string FolderName), Folder> folders = new();
+        private readonly string instanceId = Guid.NewGuid().ToString("N");
+        private long lastVersion;
+        private long changeCount;
+
+        /// <summary>
+        /// Incremented whenever any message changes, whether or not its folder is indexed. Lets views which do not
+        /// use the index, such as the terminal UI, skip reloading when nothing has changed.
+        /// </summary>
+        public long ChangeCount => Interlocked.Read(ref changeCount);
+
+        /// <summary>
+        /// Gets all summaries in the folder sorted by <paramref name="sortColumn"/>, loading the folder using
+        /// <paramref name="load"/> if it is not already indexed. The returned list must not be modified.
+        /// </summary>
+        public SortedMessageSummaries GetSorted(string mailboxName, string folderName, string sortColumn, bool sortIsDescending,
+            Func<IEnumerable<MessageSummaryProjection>> load)
+        {
+            Folder folder = folders.GetOrAdd((mailboxName, folderName), _ => new Folder());
+            lock (folder)
+            {
+                if (folder.Items == null)
+                {
+                    folder.Items = new Dictionary<Guid, Item>();
+                    foreach (MessageSummaryProjection projection in load())
+                    {
+                        // Body text is only needed for searching, which is always done against the database.
+                        projection.BodyText = null;
+                        folder.Items[projection.Id] = new Item(projection, new ApiModel.MessageSummary(projection));
+                    }
+                    folder.Version = Interlocked.Increment(ref lastVersion);
+                }
+
+                string ordering = sortColumn + (sortIsDescending ? " DESC" : "");
+                if (!folder.Sorted.TryGetValue(ordering, out ApiModel.MessageSummary[] sorted))
+                {
+                    var items = folder.Items;
+                    sorted = items.Values.Select(i => i.Projection).AsQueryable()
+                        .OrderBy(ordering)
+                        .AsEnumerable()
+                        .Select(p => items[p.Id].Summary)
+                        .ToArray();
+                    folder.Sorted[ordering] = sorted;
+                }
+
+                return new SortedMessageSummaries(sorted, instanceId + "-" + folder.Version);
+            }
+        }
+
+        /// <summary>
+        /// Adds or replaces a message. Messages without a mailbox and folder are not listed, so are ignored.
+        /// </summary>
+        public void Add(Message message)
+        {
+            Interlocked.Increment(ref changeCount);
+            if (message.Mailbox == null || message.MailboxFolder == null)
+            {
+                return;
+            }
+
+            if (!folders.TryGetValue((message.Mailbox.Name, message.MailboxFolder.Name), out Folder folder))
+            {
+                return;
+            }
+
+            var projection = new MessageSummaryProjection
+            {
+                Id = message.Id,
+                From = message.From,
+                To = message.To,
+                Subject = message.Subject,
+                ReceivedDate = message.ReceivedDate,
+                AttachmentCount = message.AttachmentCount,
+                DeliveredTo = message.DeliveredTo,
+                IsRelayed = message.Relays.Count > 0,
+                IsUnread = message.IsUnread,
+                HasBareLineFeed = message.HasBareLineFeed,
+                MimeMetadata = message.MimeMetadata
+            };
+
+            lock (folder)
+            {
+                if (folder.Items != null)
+                {
+                    folder.Items[message.Id] = new Item(projection, new ApiModel.MessageSummary(projection));
+                    OnChanged(folder);
+                }
+            }
+        }
+
+        public void Remove(IEnumerable<Guid> ids)
+        {
+            var idSet = ids.ToHashSet();
+            ForEachLoadedFolder(null, folder =>
+            {
+                bool changed = false;
+                foreach (Guid id in idSet)
+                {
+                    changed |= folder.Items.Remove(id);
+                }
+
+                return changed;
+            });
+        }
+
+        public void RemoveAll(string mailboxName)
+        {
+            ForEachLoadedFolder(mailboxName, folder =>
+            {
+                bool changed = folder.Items.Count > 0;
+                folder.Items.Clear();
+                return changed;
+            });
+        }
+
+        public void MarkRead(Guid id)
+        {
+            ForEachLoadedFolder(null, folder => UpdateItem(folder, id, p => p.IsUnread = false));
+        }
+
+        public void MarkAllRead(string mailboxName)
+        {
+            ForEachLoadedFolder(mailboxName, folder =>
+            {
+                bool changed = false;
+                foreach (Guid id in folder.Items.Where(i => i.Value.Projection.IsUnread).Select(i => i.Key).ToList())
+                {
+                    changed |= UpdateItem(folder, id, p => p.IsUnread = false);
+                }
+
+                return changed;
+            });
+        }
+
+        public void MarkRelayed(Guid id)
+        {
+            ForEachLoadedFolder(null, folder => UpdateItem(folder, id, p => p.IsRelayed = true));
+        }
+
+        /// <summary>
+        /// Discards all indexed folders so they are reloaded from the database when next requested.
+        /// Must be called after changes which are not applied incrementally, such as deleting mailboxes.
+        /// </summary>
+        public void Clear()
+        {
+            Interlocked.Increment(ref changeCount);
+            folders.Clear();
+        }
+
+        private void ForEachLoadedFolder(string mailboxName, Func<Folder, bool> change)
+        {
+            Interlocked.Increment(ref changeCount);
+            foreach (var (key, folder) in folders)
+            {
+                if (mailboxName != null && key.MailboxName != mailboxName)
+                {
+                    continue;
+                }
+
+                lock (folder)
+                {
+                    if (folder.Items != null && change(folder))
+                    {
+                        OnChanged(folder);
+                    }
+                }
+            }
+        }
+
+        private static bool UpdateItem(Folder folder, Guid id, Action<MessageSummaryProjection> update)
+        {
+            if (!folder.Items.TryGetValue(id, out Item item))
+            {
+                return false;
+            }
+
+            // Items are replaced rather than modified as sorted lists handed out earlier may still be in use.
+            var projection = new MessageSummaryProjection
+            {
+                Id = item.Projection.Id,
+                From = item.Projection.From,
+                To = item.Projection.To,
+                Subject = item.Projection.Subject,
+                ReceivedDate = item.Projection.ReceivedDate,
+                AttachmentCount = item.Projection.AttachmentCount,
+                DeliveredTo = item.Projection.DeliveredTo,
+                IsRelayed = item.Projection.IsRelayed,
+                IsUnread = item.Projection.IsUnread,
+                HasBareLineFeed = item.Projection.HasBareLineFeed,
+                MimeMetadata = item.Projection.MimeMetadata
+            };
+            update(projection);
+            folder.Items[id] = new Item(projection, new ApiModel.MessageSummary(projection));
+            return true;
+        }
+
+        private void OnChanged(Folder folder)
+        {
+            folder.Sorted.Clear();
+            folder.Version = Interlocked.Increment(ref lastVersion);
+        }
+
+        private class Folder
+        {
+            public Dictionary<Guid, Item> Items { get; set; }
+
+            public Dictionary<string, ApiModel.MessageSummary[]> Sorted { get; } = new();
+
+            public long Version { get; set; }
+        }
+
+        private record Item(MessageSummaryProjection Projection, ApiModel.MessageSummary Summary);
+    }
+
+    /// <summary>
+    /// A sorted list of message summaries. <see cref="Version"/> changes whenever the contents of the folder change,
+    /// or is null if the list is not versioned.
+    /// </summary>
+    public record SortedMessageSummaries(IReadOnlyList<ApiModel.MessageSummary> Summaries, string Version);
+}
@@ -1,5 +1,6 @@
 ﻿using System;
 using System.Linq;
+using System.Linq.Dynamic.Core;
 using System.Threading.Tasks;
 using Microsoft.EntityFrameworkCore;
 using Rnwood.Smtp4dev.DbModel;
@@ -14,12 +15,14 @@ namespace Rnwood.Smtp4dev.Data
         private readonly ITaskQueue taskQueue;
         private readonly NotificationsHub notificationsHub;
         private readonly Smtp4devDbContext dbContext;
+        private readonly MessageSummaryIndex summaryIndex;
 
-        public MessagesRepository(ITaskQueue taskQueue, NotificationsHub notificationsHub, Smtp4devDbContext dbContext)
+        public MessagesRepository(ITaskQueue taskQueue, NotificationsHub notificationsHub, Smtp4devDbContext dbContext, MessageSummaryIndex summaryIndex = null)
         {
             this.taskQueue = taskQueue;
             this.notificationsHub = notificationsHub;
             this.dbContext = dbContext;
+            this.summaryIndex = summaryIndex;
         }
 
         public Smtp4devDbContext DbContext => this.dbContext;
@@ -36,6 +39,7 @@ namespace Rnwood.Smtp4dev.Data
                 }
 
                 dbContext.SaveChanges();
+                summaryIndex?.MarkAllRead(mailbox);
                 notificationsHub.OnMessagesChanged(mailbox).Wait();
             }, true);
         }
@@ -46,6 +50,7 @@ namespace Rnwood.Smtp4dev.Data
             {
                 dbContext.Messages.Add(message);
                 dbContext.SaveChanges();
+                summaryIndex?.Add(message);
                 notificationsHub.OnMessagesChanged(message.Mailbox.Name).Wait();
             }, false);
         }
@@ -58,6 +63,7 @@ namespace Rnwood.Smtp4dev.Data
                 if (message?.IsUnread != true) return;
                 message.IsUnread = false;
                 dbContext.SaveChanges();
+                summaryIndex?.MarkRead(id);
                 notificationsHub.OnMessagesChanged(message.Mailbox.Name).Wait();
             }, true);
         }
@@ -97,6 +103,27 @@ namespace Rnwood.Smtp4dev.Data
                 }).AsNoTracking();
         }
 
+        public SortedMessageSummaries GetSortedMessageSummaries(string mailboxName, string folderName, string sortColumn, bool sortIsDescending)
+        {
+            if (summaryIndex != null)
+            {
+                return summaryIndex.GetSorted(mailboxName, folderName, sortColumn, sortIsDescending,
+                    () => GetMessageSummaries(mailboxName, folderName));
+            }
+
+            var summaries = GetMessageSummaries(mailboxName, folderName)
+                .OrderBy(sortColumn + (sortIsDescending ? " DESC" : ""))
+                .AsEnumerable()
+                .Select(m => new ApiModel.MessageSummary(m))
+                .ToArray();
+            return new SortedMessageSummaries(summaries, null);
+        }
+
+        public void OnMessageRelayed(Guid id)
+        {
+            summaryIndex?.MarkRelayed(id);
+        }
+
 
         public Task DeleteMessage(Guid id)
         {
@@ -108,6 +135,8 @@ namespace Rnwood.Smtp4dev.Data
                 {
                     dbContext.Messages.Remove(message);
                     dbContext.SaveChanges();
+                    AttachmentBlobStore.DeleteUnreferencedBlobs(dbContext);
+                    summaryIndex?.Remove(new[] { id });
                     notificationsHub.OnMessagesChanged(message.Mailbox.Name).Wait();
                 }
             }, true);
@@ -119,13 +148,15 @@ namespace Rnwood.Smtp4dev.Data
             {
                 dbContext.Messages.RemoveRange(dbContext.Messages.Where(m=> m.Mailbox.Name == mailbox));
                 dbContext.SaveChanges();
+                AttachmentBlobStore.DeleteUnreferencedBlobs(dbContext);
+                summaryIndex?.RemoveAll(mailbox);
                 notificationsHub.OnMessagesChanged(mailbox).Wait();
             }, true);
         }
 
         public Task<Message> TryGetMessageById(Guid id, bool tracked)
         {
-            return this.GetAllMessages(!tracked).SingleOrDefaultAsync(m => m.Id == id);
+            return this.GetAllMessages(!tracked).IncludeAttachmentBlobs().SingleOrDefaultAsync(m => m.Id == id);
         }
         
     }
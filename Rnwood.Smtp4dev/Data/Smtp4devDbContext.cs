@@ -50,6 +50,21 @@ namespace Rnwood.Smtp4dev.Data
                .WithMany()
                 .OnDelete(DeleteBehavior.SetNull);
 
+            // Attachment store. References are deleted with their message, see AttachmentBlobStore.
+            modelBuilder.Entity<AttachmentBlobReference>()
+                .HasOne(r => r.Message)
+                .WithMany(m => m.AttachmentBlobReferences)
+                .HasForeignKey(r => r.MessageId)
+                .OnDelete(DeleteBehavior.Cascade)
+                .IsRequired();
+
+            modelBuilder.Entity<AttachmentBlobReference>()
+                .HasOne(r => r.Blob)
+                .WithMany(b => b.References)
+                .HasForeignKey(r => r.BlobHash)
+                .OnDelete(DeleteBehavior.Cascade)
+                .IsRequired();
+
             base.OnModelCreating(modelBuilder);
         }
 
@@ -61,5 +76,8 @@ namespace Rnwood.Smtp4dev.Data
 
         public DbSet<Mailbox> Mailboxes { get; set; }
         public DbSet<MailboxFolder> MailboxFolders { get; set; }
+
+        public DbSet<AttachmentBlob> AttachmentBlobs { get; set; }
+        public DbSet<AttachmentBlobReference> AttachmentBlobReferences { get; set; }
     }
 }
\ No newline at end of file
@@ -0,0 +1,62 @@
+using System;
+using System.Data.Common;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.EntityFrameworkCore.Diagnostics;
+
+namespace Rnwood.Smtp4dev.Data
+{
+    /// <summary>
+    /// Applies the pragmas for <see cref="Server.Settings.DatabaseProfile.Tuned"/> to every SQLite connection as it is opened.
+    /// </summary>
+    public class SqliteTuningInterceptor : DbConnectionInterceptor
+    {
+        private const long MinCacheSizeBytes = 8L * 1024 * 1024;
+        private const long MaxCacheSizeBytes = 256L * 1024 * 1024;
+        private const long MmapSizeBytes = 256L * 1024 * 1024;
+
+        public SqliteTuningInterceptor(bool isInMemory)
+        {
+            Pragmas = BuildPragmas(isInMemory, GetCacheSizeBytes());
+        }
+
+        public string Pragmas { get; }
+
+        /// <summary>
+        /// Sizes the page cache at 1/32nd of the memory available to the process, clamped to 8MB-256MB.
+        /// </summary>
+        internal static long GetCacheSizeBytes()
+        {
+            long availableBytes = GC.GetGCMemoryInfo().TotalAvailableMemoryBytes;
+            return Math.Clamp(availableBytes / 32, MinCacheSizeBytes, MaxCacheSizeBytes);
+        }
+
+        internal static string BuildPragmas(bool isInMemory, long cacheSizeBytes)
+        {
+            // Negative cache_size is in KiB rather than pages.
+            string pragmas = $"PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY; PRAGMA cache_size=-{cacheSizeBytes / 1024};";
+
+            if (!isInMemory)
+            {
+                // WAL and mmap have no meaning for memory databases.
+                pragmas = $"PRAGMA journal_mode=WAL; PRAGMA mmap_size={MmapSizeBytes}; PRAGMA busy_timeout=5000; " + pragmas;
+            }
+
+            return pragmas;
+        }
+
+        public override void ConnectionOpened(DbConnection connection, ConnectionEndEventData eventData)
+        {
+            using DbCommand command = connection.CreateCommand();
+            command.CommandText = Pragmas;
+            command.ExecuteNonQuery();
+        }
+
+        public override async Task ConnectionOpenedAsync(DbConnection connection, ConnectionEndEventData eventData, CancellationToken cancellationToken = default)
+        {
+            await using DbCommand command = connection.CreateCommand();
+            command.CommandText = Pragmas;
+            await command.ExecuteNonQueryAsync(cancellationToken);
+        }
+    }
+}
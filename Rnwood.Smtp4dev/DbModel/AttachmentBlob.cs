@@ -0,0 +1,20 @@
+﻿using System.Collections.Generic;
+using System.ComponentModel.DataAnnotations;
+
+namespace Rnwood.Smtp4dev.DbModel
+{
+    /// <summary>
+    /// Attachment content split out of one or more messages. See <see cref="Data.AttachmentBlobStore"/>.
+    /// </summary>
+    public class AttachmentBlob
+    {
+        /// <summary>
+        /// Lowercase hex SHA-256 hash of <see cref="Data"/>.
+        /// </summary>
+        [Key] public string Hash { get; set; }
+
+        public byte[] Data { get; set; }
+
+        public virtual List<AttachmentBlobReference> References { get; set; } = new List<AttachmentBlobReference>();
+    }
+}
\ No newline at end of file
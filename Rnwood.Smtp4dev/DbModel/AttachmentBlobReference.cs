@@ -0,0 +1,23 @@
+﻿using System;
+using System.ComponentModel.DataAnnotations;
+
+namespace Rnwood.Smtp4dev.DbModel
+{
+    public class AttachmentBlobReference
+    {
+        [Key] public Guid Id { get; set; }
+
+        public Guid MessageId { get; set; }
+
+        public virtual Message Message { get; set; }
+
+        /// <summary>
+        /// Position in <see cref="DbModel.Message.StoredData"/> at which the blob content is reinserted.
+        /// </summary>
+        public long Offset { get; set; }
+
+        public string BlobHash { get; set; }
+
+        public virtual AttachmentBlob Blob { get; set; }
+    }
+}
\ No newline at end of file
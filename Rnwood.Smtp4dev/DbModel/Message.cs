@@ -1,7 +1,9 @@
 ﻿using System;
 using System.Collections.Generic;
 using System.ComponentModel.DataAnnotations;
+using System.ComponentModel.DataAnnotations.Schema;
 using System.Data.Entity.Core.Objects.DataClasses;
+using Rnwood.Smtp4dev.Data;
 
 namespace Rnwood.Smtp4dev.DbModel
 {
@@ -17,7 +19,53 @@ namespace Rnwood.Smtp4dev.DbModel
 
         public string Subject { get; set; }
 
-        public byte[] Data { get; set; }
+        /// <summary>
+        /// Message data as stored. When attachments have been split out into the attachment store their content
+        /// is missing from this data and is listed in <see cref="AttachmentBlobReferences"/>.
+        /// </summary>
+        [Column("Data")]
+        public byte[] StoredData { get; set; }
+
+        /// <summary>
+        /// The complete message data, reassembled from <see cref="StoredData"/> and any attachment blobs.
+        /// Setting this replaces the stored data and removes any attachment blob references.
+        /// Throws <see cref="InvalidOperationException"/> if the message has attachment blobs but they were not loaded,
+        /// see <see cref="AttachmentBlobStore.IncludeAttachmentBlobs"/>.
+        /// </summary>
+        [NotMapped]
+        public byte[] Data
+        {
+            get
+            {
+                if (AttachmentBlobReferences.Count < AttachmentBlobCount)
+                {
+                    throw new InvalidOperationException(
+                        $"The attachment blob references of message {Id} were not loaded, so its data cannot be reassembled.");
+                }
+
+                if (AttachmentBlobReferences.Count == 0)
+                {
+                    return StoredData;
+                }
+
+                return reassembledData ??= AttachmentBlobStore.Reassemble(StoredData, AttachmentBlobReferences);
+            }
+            set
+            {
+                StoredData = value;
+                reassembledData = null;
+                AttachmentBlobReferences.Clear();
+                AttachmentBlobCount = 0;
+            }
+        }
+
+        private byte[] reassembledData;
+
+        /// <summary>
+        /// The number of <see cref="AttachmentBlobReferences"/> saved with the message, so that <see cref="Data"/> can
+        /// tell when they were not loaded.
+        /// </summary>
+        public int AttachmentBlobCount { get; set; }
 
         public string MimeParseError { get; set; }
         
@@ -50,6 +98,8 @@ namespace Rnwood.Smtp4dev.DbModel
         public string BodyText { get; set; }
 
         public virtual List<MessageRelay> Relays { get; set; } = new List<MessageRelay>();
+
+        public virtual List<AttachmentBlobReference> AttachmentBlobReferences { get; set; } = new List<AttachmentBlobReference>();
         public string DeliveredTo { get; set; }
 
         public void AddRelay(MessageRelay messageRelay)
@@ -34,6 +34,18 @@ namespace Rnwood.Smtp4dev.Hubs
             }
         }
 
+        /// <summary>
+        /// Notifies clients once for a change affecting several mailboxes. "*" is sent if more than one mailbox is affected.
+        /// </summary>
+        public async Task OnMessagesChangedBatch(string[] mailboxes)
+        {
+            string[] distinctMailboxes = mailboxes.Distinct(StringComparer.OrdinalIgnoreCase).ToArray();
+            if (distinctMailboxes.Length > 0)
+            {
+                await OnMessagesChanged(distinctMailboxes.Length == 1 ? distinctMailboxes[0] : "*");
+            }
+        }
+
         public async Task onServerChanged()
         {
             if (Clients != null)
@@ -66,11 +78,11 @@ namespace Rnwood.Smtp4dev.Hubs
             }
         }
 
-        public async Task OnServerLogReceived(Service.LogEntry logEntry)
+        public async Task OnServerLogsReceived(IReadOnlyList<Service.LogEntry> logEntries)
         {
             if (Clients != null)
             {
-                await Clients.All.SendAsync("serverlogreceived", logEntry);
+                await Clients.All.SendAsync("serverlogsreceived", logEntries);
             }
         }
     }
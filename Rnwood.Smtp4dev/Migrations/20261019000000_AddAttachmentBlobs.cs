@@ -0,0 +1,74 @@
+using System;
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Rnwood.Smtp4dev.Migrations
+{
+    /// <inheritdoc />
+    [Migration("20261019000000_AddAttachmentBlobs")]
+    public partial class AddAttachmentBlobs : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.CreateTable(
+                name: "AttachmentBlobs",
+                columns: table => new
+                {
+                    Hash = table.Column<string>(type: "TEXT", nullable: false),
+                    Data = table.Column<byte[]>(type: "BLOB", nullable: true)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_AttachmentBlobs", x => x.Hash);
+                });
+
+            migrationBuilder.CreateTable(
+                name: "AttachmentBlobReferences",
+                columns: table => new
+                {
+                    Id = table.Column<Guid>(type: "TEXT", nullable: false),
+                    MessageId = table.Column<Guid>(type: "TEXT", nullable: false),
+                    Offset = table.Column<long>(type: "INTEGER", nullable: false),
+                    BlobHash = table.Column<string>(type: "TEXT", nullable: false)
+                },
+                constraints: table =>
+                {
+                    table.PrimaryKey("PK_AttachmentBlobReferences", x => x.Id);
+                    table.ForeignKey(
+                        name: "FK_AttachmentBlobReferences_AttachmentBlobs_BlobHash",
+                        column: x => x.BlobHash,
+                        principalTable: "AttachmentBlobs",
+                        principalColumn: "Hash",
+                        onDelete: ReferentialAction.Cascade);
+                    table.ForeignKey(
+                        name: "FK_AttachmentBlobReferences_Messages_MessageId",
+                        column: x => x.MessageId,
+                        principalTable: "Messages",
+                        principalColumn: "Id",
+                        onDelete: ReferentialAction.Cascade);
+                });
+
+            migrationBuilder.CreateIndex(
+                name: "IX_AttachmentBlobReferences_BlobHash",
+                table: "AttachmentBlobReferences",
+                column: "BlobHash");
+
+            migrationBuilder.CreateIndex(
+                name: "IX_AttachmentBlobReferences_MessageId",
+                table: "AttachmentBlobReferences",
+                column: "MessageId");
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropTable(
+                name: "AttachmentBlobReferences");
+
+            migrationBuilder.DropTable(
+                name: "AttachmentBlobs");
+        }
+    }
+}
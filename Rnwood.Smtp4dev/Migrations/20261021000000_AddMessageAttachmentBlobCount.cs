@@ -0,0 +1,30 @@
+using Microsoft.EntityFrameworkCore.Migrations;
+
+#nullable disable
+
+namespace Rnwood.Smtp4dev.Migrations
+{
+    /// <inheritdoc />
+    [Migration("20261021000000_AddMessageAttachmentBlobCount")]
+    public partial class AddMessageAttachmentBlobCount : Migration
+    {
+        /// <inheritdoc />
+        protected override void Up(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.AddColumn<int>(
+                name: "AttachmentBlobCount",
+                table: "Messages",
+                type: "INTEGER",
+                nullable: false,
+                defaultValue: 0);
+        }
+
+        /// <inheritdoc />
+        protected override void Down(MigrationBuilder migrationBuilder)
+        {
+            migrationBuilder.DropColumn(
+                name: "AttachmentBlobCount",
+                table: "Messages");
+        }
+    }
+}
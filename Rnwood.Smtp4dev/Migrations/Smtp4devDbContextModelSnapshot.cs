@@ -17,6 +17,44 @@ namespace Rnwood.Smtp4dev.Migrations
 #pragma warning disable 612, 618
             modelBuilder.HasAnnotation("ProductVersion", "10.0.2");
 
+            modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.AttachmentBlob", b =>
+                {
+                    b.Property<string>("Hash")
+                        .HasColumnType("TEXT");
+
+                    b.Property<byte[]>("Data")
+                        .HasColumnType("BLOB");
+
+                    b.HasKey("Hash");
+
+                    b.ToTable("AttachmentBlobs");
+                });
+
+            modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.AttachmentBlobReference", b =>
+                {
+                    b.Property<Guid>("Id")
+                        .ValueGeneratedOnAdd()
+                        .HasColumnType("TEXT");
+
+                    b.Property<string>("BlobHash")
+                        .IsRequired()
+                        .HasColumnType("TEXT");
+
+                    b.Property<Guid>("MessageId")
+                        .HasColumnType("TEXT");
+
+                    b.Property<long>("Offset")
+                        .HasColumnType("INTEGER");
+
+                    b.HasKey("Id");
+
+                    b.HasIndex("BlobHash");
+
+                    b.HasIndex("MessageId");
+
+                    b.ToTable("AttachmentBlobReferences");
+                });
+
             modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.ImapState", b =>
                 {
                     b.Property<Guid>("Id")
@@ -70,15 +108,15 @@ namespace Rnwood.Smtp4dev.Migrations
                         .ValueGeneratedOnAdd()
                         .HasColumnType("TEXT");
 
+                    b.Property<int>("AttachmentBlobCount")
+                        .HasColumnType("INTEGER");
+
                     b.Property<int>("AttachmentCount")
                         .HasColumnType("INTEGER");
 
                     b.Property<string>("BodyText")
                         .HasColumnType("TEXT");
 
-                    b.Property<byte[]>("Data")
-                        .HasColumnType("BLOB");
-
                     b.Property<string>("DeliveredTo")
                         .HasColumnType("TEXT");
 
@@ -124,6 +162,10 @@ namespace Rnwood.Smtp4dev.Migrations
                     b.Property<Guid?>("SessionId")
                         .HasColumnType("TEXT");
 
+                    b.Property<byte[]>("StoredData")
+                        .HasColumnType("BLOB")
+                        .HasColumnName("Data");
+
                     b.Property<string>("Subject")
                         .HasColumnType("TEXT");
 
@@ -201,6 +243,25 @@ namespace Rnwood.Smtp4dev.Migrations
                     b.ToTable("Sessions");
                 });
 
+            modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.AttachmentBlobReference", b =>
+                {
+                    b.HasOne("Rnwood.Smtp4dev.DbModel.AttachmentBlob", "Blob")
+                        .WithMany("References")
+                        .HasForeignKey("BlobHash")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.HasOne("Rnwood.Smtp4dev.DbModel.Message", "Message")
+                        .WithMany("AttachmentBlobReferences")
+                        .HasForeignKey("MessageId")
+                        .OnDelete(DeleteBehavior.Cascade)
+                        .IsRequired();
+
+                    b.Navigation("Blob");
+
+                    b.Navigation("Message");
+                });
+
             modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.MailboxFolder", b =>
                 {
                     b.HasOne("Rnwood.Smtp4dev.DbModel.Mailbox", "Mailbox")
@@ -247,6 +308,11 @@ namespace Rnwood.Smtp4dev.Migrations
                     b.Navigation("Message");
                 });
 
+            modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.AttachmentBlob", b =>
+                {
+                    b.Navigation("References");
+                });
+
             modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.Mailbox", b =>
                 {
                     b.Navigation("MailboxFolders");
@@ -259,6 +325,8 @@ namespace Rnwood.Smtp4dev.Migrations
 
             modelBuilder.Entity("Rnwood.Smtp4dev.DbModel.Message", b =>
                 {
+                    b.Navigation("AttachmentBlobReferences");
+
                     b.Navigation("Relays");
                 });
 #pragma warning restore 612, 618
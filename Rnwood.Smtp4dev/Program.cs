@@ -364,6 +364,16 @@ namespace Rnwood.Smtp4dev
                     services.AddHostedService(sp => (Smtp4devServer)sp.GetRequiredService<ISmtp4devServer>());
                     services.AddHostedService(sp => sp.GetRequiredService<ImapServer>());
                     services.AddHostedService(sp => sp.GetRequiredService<Rnwood.Smtp4dev.Server.Pop3.Pop3Server>());
+
+                    if (serverOptions.FastStart)
+                    {
+                        // Start the SMTP, IMAP, POP3 and web servers side by side rather than one after another.
+                        services.Configure<HostOptions>(o =>
+                        {
+                            o.ServicesStartConcurrently = true;
+                            o.ServicesStopConcurrently = true;
+                        });
+                    }
                 });
             });
 
@@ -242,7 +242,9 @@ namespace Rnwood.Smtp4dev.Server
 
                     if (e.Folder == "INBOX")
                     {
-                        foreach (var message in messagesRepository.GetMessages(GetMailboxName(), "INBOX", true))
+                        var messages = messagesRepository.GetMessages(GetMailboxName(), "INBOX", true);
+                        var sizes = AttachmentBlobStore.GetDataSizes(messages);
+                        foreach (var message in messages)
                         {
                             List<string> flags = new List<string>();
                             if (!message.IsUnread)
@@ -250,12 +252,14 @@ namespace Rnwood.Smtp4dev.Server
                                 flags.Add("Seen");
                             }
 
-                            e.MessagesInfo.Add(new IMAP_MessageInfo(message.Id.ToString(), message.ImapUid, flags.ToArray(), message.Data.Length, message.ReceivedDate));
+                            e.MessagesInfo.Add(new IMAP_MessageInfo(message.Id.ToString(), message.ImapUid, flags.ToArray(), (int)sizes.GetValueOrDefault(message.Id), message.ReceivedDate));
                         }
                     }
                     else if (e.Folder == "Sent")
                     {
-                        foreach (var message in messagesRepository.GetMessages(GetMailboxName(), "Sent", true))
+                        var messages = messagesRepository.GetMessages(GetMailboxName(), "Sent", true);
+                        var sizes = AttachmentBlobStore.GetDataSizes(messages);
+                        foreach (var message in messages)
                         {
                             List<string> flags = new List<string>();
                             if (!message.IsUnread)
@@ -263,7 +267,7 @@ namespace Rnwood.Smtp4dev.Server
                                 flags.Add("Seen");
                             }
 
-                            e.MessagesInfo.Add(new IMAP_MessageInfo(message.Id.ToString(), message.ImapUid, flags.ToArray(), message.Data.Length, message.ReceivedDate));
+                            e.MessagesInfo.Add(new IMAP_MessageInfo(message.Id.ToString(), message.ImapUid, flags.ToArray(), (int)sizes.GetValueOrDefault(message.Id), message.ReceivedDate));
                         }
                     }
                 }
@@ -284,7 +288,7 @@ namespace Rnwood.Smtp4dev.Server
 
                     foreach (var msgInfo in e.MessagesInfo)
                     {
-                        var dbMessage = messagesRepository.GetAllMessages().SingleOrDefault(m => m.Id == new Guid(msgInfo.ID));
+                        var dbMessage = messagesRepository.GetAllMessages().IncludeAttachmentBlobs().SingleOrDefault(m => m.Id == new Guid(msgInfo.ID));
 
                         if (dbMessage != null)
                         {
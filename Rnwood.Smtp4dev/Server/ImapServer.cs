@@ -207,6 +207,11 @@ namespace Rnwood.Smtp4dev.Server
 
         Task IHostedService.StartAsync(CancellationToken cancellationToken)
         {
+            if (serverOptions.CurrentValue.FastStart)
+            {
+                return Task.Run(this.TryStart, cancellationToken);
+            }
+
             this.TryStart();
             return Task.CompletedTask;
 
@@ -21,13 +21,21 @@ namespace Rnwood.Smtp4dev.Server
         {
             _mimeProcessingService = mimeProcessingService;
         }
-        public async Task<DbModel.Message> ConvertAsync(IMessage message, string[] deliveredTo)
+        /// <summary>
+        /// Converts a received message to a database message, extracting subject, MIME metadata and body text.
+        /// </summary>
+        /// <param name="streamingExtractor">
+        /// Optional extractor which observed the message data as it was received. When it succeeded its results are
+        /// used instead of parsing the message again.
+        /// </param>
+        public async Task<DbModel.Message> ConvertAsync(IMessage message, string[] deliveredTo, StreamingMimeMetadataExtractor streamingExtractor = null)
         {
             string subject = "";
             string mimeParseError = null;
             string toAddress = string.Join(", ", message.Recipients);
             MimeMetadata mimeMetadata = new MimeMetadata();
             string bodyText = "";
+            int? attachmentCount = null;
 
             byte[] data;
             using (Stream messageData = await message.GetData())
@@ -59,6 +67,13 @@ namespace Rnwood.Smtp4dev.Server
                     // If MIME parsing fails, use the complete message as body text
                     bodyText = Encoding.UTF8.GetString(data);
                 }
+                else if (streamingExtractor?.Succeeded == true)
+                {
+                    subject = streamingExtractor.Subject;
+                    mimeMetadata = streamingExtractor.Metadata;
+                    bodyText = _mimeProcessingService.BuildBodyText(streamingExtractor.TextBody, streamingExtractor.HtmlBody);
+                    attachmentCount = streamingExtractor.AttachmentCount;
+                }
                 else
                 {
                     messageData.Seek(0, SeekOrigin.Begin);
@@ -98,7 +113,7 @@ namespace Rnwood.Smtp4dev.Server
                 Subject = PunyCodeReplacer.DecodePunycode(subject),
                 Data = data,
                 MimeParseError = mimeParseError,
-                AttachmentCount = 0,
+                AttachmentCount = attachmentCount ?? 0,
                 SecureConnection = message.SecureConnection,
                 SessionEncoding = message.EightBitTransport ? Encoding.UTF8.WebName : Encoding.Latin1.WebName,
                 HasBareLineFeed = message.HasBareLineFeed,
@@ -106,10 +121,13 @@ namespace Rnwood.Smtp4dev.Server
                 BodyText = bodyText
             };
 
-            var parts = new Message(result).Parts;
-            foreach (var part in parts)
+            if (!attachmentCount.HasValue)
             {
-                result.AttachmentCount += CountAttachments(part);
+                var parts = new Message(result).Parts;
+                foreach (var part in parts)
+                {
+                    result.AttachmentCount += CountAttachments(part);
+                }
             }
 
             return result;
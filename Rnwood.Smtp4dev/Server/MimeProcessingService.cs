@@ -115,20 +115,30 @@ namespace Rnwood.Smtp4dev.Server
         }
 
         public string ExtractBodyText(MimeMessage mime)
+        {
+            try
+            {
+                return BuildBodyText(mime.TextBody, mime.HtmlBody);
+            }
+            catch
+            {
+                return "";
+            }
+        }
+
+        public string BuildBodyText(string textPart, string htmlPart)
         {
             try
             {
                 var bodyText = new StringBuilder();
 
                 // Get text parts
-                var textPart = mime.TextBody;
                 if (!string.IsNullOrEmpty(textPart))
                 {
                     bodyText.AppendLine(textPart);
                 }
 
                 // Get HTML parts and convert to text
-                var htmlPart = mime.HtmlBody;
                 if (!string.IsNullOrEmpty(htmlPart))
                 {
                     try
@@ -1,8 +1,10 @@
 namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 {
+	using System.Collections.Generic;
 	using System.Linq;
 	using System.Threading;
 	using System.Threading.Tasks;
+	using Rnwood.Smtp4dev.Data;
 	using Rnwood.Smtp4dev.Server.Pop3;
 	using System;
 	using Microsoft.Extensions.Logging;
@@ -40,13 +42,14 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 			}
 
 			var messages = context.MessagesRepository.GetMessages(mailbox, "INBOX").ToList();
+			var sizes = AttachmentBlobStore.GetDataSizes(context.MessagesRepository.GetMessages(mailbox, "INBOX"));
 			if (string.IsNullOrWhiteSpace(argument))
 			{
 				// mult-line response
 				context.Writer.Write($"+OK {messages.Count} messages:\r\n");
 				for (int i = 0; i < messages.Count; i++)
 				{
-					context.Writer.Write($"{i + 1} {messages[i].Data?.LongLength ?? 0}\r\n");
+					context.Writer.Write($"{i + 1} {sizes.GetValueOrDefault(messages[i].Id)}\r\n");
 				}
 				context.Writer.Write(".\r\n");
 				return context.Writer.FlushAsync();
@@ -55,7 +58,7 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 			// single message
 			if (int.TryParse(argument.Trim(), out int id) && id > 0 && id <= messages.Count)
 			{
-				var size = messages[id - 1].Data?.LongLength ?? 0;
+				var size = sizes.GetValueOrDefault(messages[id - 1].Id);
 				return context.WriteLineAsync($"+OK {id} {size}");
 			}
 
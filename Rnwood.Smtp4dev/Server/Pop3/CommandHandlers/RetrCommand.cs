@@ -4,6 +4,7 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 	using System.Linq;
 	using System.Threading;
 	using System.Threading.Tasks;
+	using Rnwood.Smtp4dev.Data;
 	using Rnwood.Smtp4dev.Server.Pop3;
 	using Microsoft.Extensions.Logging;
 
@@ -53,7 +54,14 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 				return;
 			}
 
-			var msg = messages[id - 1];
+			var messageId = messages[id - 1].Id;
+			var msg = context.MessagesRepository.GetAllMessages().IncludeAttachmentBlobs().SingleOrDefault(m => m.Id == messageId);
+			if (msg == null)
+			{
+				await context.WriteLineAsync("-ERR No such message");
+				return;
+			}
+
 			await context.WriteLineAsync($"+OK {msg.Data?.LongLength ?? 0} octets");
 			var data = msg.Data ?? Array.Empty<byte>();
 			await Rnwood.Smtp4dev.Server.Pop3ProtocolHelper.WriteDotStuffedMessageAsync(context.Stream, data, cancellationToken);
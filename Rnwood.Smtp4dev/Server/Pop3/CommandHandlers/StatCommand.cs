@@ -4,6 +4,7 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 	using System.Threading;
 	using System.Threading.Tasks;
 	using System;
+	using Rnwood.Smtp4dev.Data;
 	using Rnwood.Smtp4dev.Server.Pop3;
 	using Microsoft.Extensions.Logging;
 
@@ -42,7 +43,7 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 			}
 
 			var messages = context.MessagesRepository.GetMessages(mailbox, "INBOX").ToList();
-			var totalSize = messages.Sum(m => m.Data?.LongLength ?? 0);
+			var totalSize = AttachmentBlobStore.GetDataSizes(context.MessagesRepository.GetMessages(mailbox, "INBOX")).Values.Sum();
 
 			// Additional diagnostics after query
 			try
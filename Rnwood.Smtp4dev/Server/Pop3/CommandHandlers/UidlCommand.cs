@@ -1,8 +1,10 @@
 namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 {
+	using System.Collections.Generic;
 	using System.Linq;
 	using System.Threading;
 	using System.Threading.Tasks;
+	using Rnwood.Smtp4dev.Data;
 	using Rnwood.Smtp4dev.Server.Pop3;
 	using System;
 
@@ -27,13 +29,14 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 			}
 
 			var messages = context.MessagesRepository.GetMessages(mailbox, "INBOX").ToList();
+			var sizes = AttachmentBlobStore.GetDataSizes(context.MessagesRepository.GetMessages(mailbox, "INBOX"));
 			if (string.IsNullOrWhiteSpace(argument))
 			{
 				context.Writer.Write($"+OK {messages.Count} messages\r\n");
 				for (int i = 0; i < messages.Count; i++)
 				{
 					// Use message id and a simple fingerprint as UIDL
-					var uid = messages[i].Id.ToString("N") + "-" + (messages[i].Data?.LongLength ?? 0);
+					var uid = messages[i].Id.ToString("N") + "-" + sizes.GetValueOrDefault(messages[i].Id);
 					context.Writer.Write($"{i + 1} {uid}\r\n");
 				}
 				context.Writer.Write(".\r\n");
@@ -42,7 +45,7 @@ namespace Rnwood.Smtp4dev.Server.Pop3.CommandHandlers
 
 			if (int.TryParse(argument.Trim(), out int id) && id > 0 && id <= messages.Count)
 			{
-				var uid = messages[id - 1].Id.ToString("N") + "-" + (messages[id - 1].Data?.LongLength ?? 0);
+				var uid = messages[id - 1].Id.ToString("N") + "-" + sizes.GetValueOrDefault(messages[id - 1].Id);
 				return context.WriteLineAsync($"+OK {id} {uid}");
 			}
 
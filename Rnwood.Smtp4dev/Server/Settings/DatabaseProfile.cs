@@ -0,0 +1,16 @@
+namespace Rnwood.Smtp4dev.Server.Settings
+{
+    public enum DatabaseProfile
+    {
+        /// <summary>
+        /// SQLite defaults (rollback journal, synchronous=FULL, default page cache).
+        /// </summary>
+        Default,
+
+        /// <summary>
+        /// WAL journal, synchronous=NORMAL, memory mapped I/O and a page cache sized from available memory.
+        /// Faster ingest and listing at the cost of -wal/-shm files alongside the database.
+        /// </summary>
+        Tuned
+    }
+}
@@ -23,6 +23,12 @@ namespace Rnwood.Smtp4dev.Server.Settings
         public string BindAddress { get; set; }
 
         public string Database { get => database?.Trim('"'); set => database = value; }
+
+        /// <summary>
+        /// SQLite tuning profile applied to every database connection.
+        /// </summary>
+        public DatabaseProfile DatabaseProfile { get; set; } = DatabaseProfile.Default;
+
         public int NumberOfMessagesToKeep { get; set; } = 100;
         public int NumberOfSessionsToKeep { get; set; } = 100;
 
@@ -92,6 +98,28 @@ namespace Rnwood.Smtp4dev.Server.Settings
         public bool DisableHtmlCompatibilityCheck { get; set; } = false;
 
         public long? MaxMessageSize { get; set; }
+
+        /// <summary>
+        /// Extract MIME metadata and body text while message data is being received instead of parsing the complete message afterwards.
+        /// </summary>
+        public bool StreamingMimeExtraction { get; set; } = false;
+
+        /// <summary>
+        /// Store attachment content once per distinct content in a shared store instead of within each received message.
+        /// </summary>
+        public bool DeduplicateAttachments { get; set; } = false;
+
+        /// <summary>
+        /// Reduce startup time by creating in-memory databases directly from the model, preparing the TLS certificate in the
+        /// background and starting the SMTP, IMAP and POP3 servers in parallel.
+        /// </summary>
+        public bool FastStart { get; set; } = false;
+
+        /// <summary>
+        /// Directory to which the raw traffic of each SMTP session is captured, one file per session, so it can be
+        /// replayed later. Null or empty to disable capturing.
+        /// </summary>
+        public string TrafficCaptureDirectory { get; set; }
         
         public bool ValidateBareLineFeed { get; set; } = false;
 
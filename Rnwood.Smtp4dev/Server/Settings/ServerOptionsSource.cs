@@ -21,6 +21,8 @@ namespace Rnwood.Smtp4dev.Server.Settings
 
         public string Database { get; set; }
 
+        public DatabaseProfile? DatabaseProfile { get; set; }
+
         public int? NumberOfMessagesToKeep { get; set; }
         public int? NumberOfSessionsToKeep { get; set; }
 
@@ -78,6 +80,14 @@ namespace Rnwood.Smtp4dev.Server.Settings
 
         public long? MaxMessageSize { get; set; }
 
+        public bool? StreamingMimeExtraction { get; set; }
+
+        public bool? DeduplicateAttachments { get; set; }
+
+        public bool? FastStart { get; set; }
+
+        public string TrafficCaptureDirectory { get; set; }
+
         public string DeliverToStdout { get; set; }
 
         public int? ExitAfterMessages { get; set; }
@@ -3,6 +3,7 @@ using Rnwood.Smtp4dev.DbModel;
 using Rnwood.Smtp4dev.Hubs;
 using Rnwood.SmtpServer;
 using System;
+using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.IO;
 using System.Linq;
@@ -50,7 +51,7 @@ namespace Rnwood.Smtp4dev.Server
 
         public Smtp4devServer(IServiceScopeFactory serviceScopeFactory, IOptionsMonitor<Settings.ServerOptions> serverOptions,
             IOptionsMonitor<RelayOptions> relayOptions, NotificationsHub notificationsHub, Func<RelayOptions, SmtpClient> relaySmtpClientFactory,
-            ITaskQueue taskQueue, ScriptingHost scriptingHost)
+            ITaskQueue taskQueue, ScriptingHost scriptingHost, MailboxIdCache mailboxIdCache, MessageSummaryIndex summaryIndex)
         {
             this.notificationsHub = notificationsHub;
             this.serverOptions = serverOptions;
@@ -59,6 +60,8 @@ namespace Rnwood.Smtp4dev.Server
             this.relaySmtpClientFactory = relaySmtpClientFactory;
             this.taskQueue = taskQueue;
             this.scriptingHost = scriptingHost;
+            this.mailboxIdCache = mailboxIdCache;
+            this.summaryIndex = summaryIndex;
             this.oauth2TokenValidator = new OAuth2TokenValidator(log);
             this.mailboxRouter = new MailboxRouter();
 
@@ -94,9 +97,8 @@ namespace Rnwood.Smtp4dev.Server
 
         private void CreateSmtpServer()
         {
-            X509Certificate2 cert = CertificateHelper.GetTlsCertificate(serverOptions.CurrentValue, log);
-
             Settings.ServerOptions serverOptionsValue = serverOptions.CurrentValue;
+            Task<X509Certificate> cert = GetTlsCertificate(serverOptionsValue);
             IPAddress bindAddress = null;
             if (!string.IsNullOrWhiteSpace(serverOptionsValue.BindAddress))
             {
@@ -114,8 +116,8 @@ namespace Rnwood.Smtp4dev.Server
                 .WithRequireAuthentication(serverOptionsValue.AuthenticationRequired)
                 .WithNonSecureAuthMechanisms(serverOptionsValue.SmtpEnabledAuthTypesWhenNotSecureConnection.Split(',', StringSplitOptions.TrimEntries | StringSplitOptions.RemoveEmptyEntries))
                 .WithSecureAuthMechanisms(serverOptionsValue.SmtpEnabledAuthTypesWhenSecureConnection.Split(',', StringSplitOptions.TrimEntries | StringSplitOptions.RemoveEmptyEntries))
-                .WithImplicitTlsCertificate(serverOptionsValue.TlsMode == TlsMode.ImplicitTls ? cert : null)
-                .WithStartTlsCertificate(serverOptionsValue.TlsMode == TlsMode.StartTls ? cert : null)
+                .WithDeferredImplicitTlsCertificate(serverOptionsValue.TlsMode == TlsMode.ImplicitTls ? cert : null)
+                .WithDeferredStartTlsCertificate(serverOptionsValue.TlsMode == TlsMode.StartTls ? cert : null)
                 .WithSslProtocols(!string.IsNullOrWhiteSpace(serverOptionsValue.SslProtocols) 
                     ? serverOptionsValue.SslProtocols.Split(",", StringSplitOptions.RemoveEmptyEntries|StringSplitOptions.TrimEntries).Select(s => Enum.Parse<SslProtocols>(s, true)).Aggregate((current, protocol) => current | protocol) 
                     : SslProtocols.None)
@@ -126,6 +128,13 @@ namespace Rnwood.Smtp4dev.Server
                 builder.WithBindAddress(bindAddress);
             }
 
+            if (!string.IsNullOrWhiteSpace(serverOptionsValue.TrafficCaptureDirectory))
+            {
+                string captureDirectory = Path.GetFullPath(serverOptionsValue.TrafficCaptureDirectory);
+                log.Information("Capturing SMTP traffic to {captureDirectory}", captureDirectory);
+                builder.WithTrafficCaptureDirectory(captureDirectory);
+            }
+
             if (!string.IsNullOrWhiteSpace(serverOptionsValue.TlsCipherSuites))
             {
                 var cipherSuites = serverOptionsValue.TlsCipherSuites.Split(",", StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries)
@@ -136,6 +145,7 @@ namespace Rnwood.Smtp4dev.Server
 
             this.smtpServer = new Rnwood.SmtpServer.SmtpServer(builder.Build());
             this.smtpServer.MessageCompletedEventHandler += OnMessageCompleted;
+            ((SmtpServer.ServerOptions)this.smtpServer.Options).MessageDataStartingEventHandler += OnMessageDataStarting;
             this.smtpServer.MessageReceivedEventHandler += OnMessageReceived;
             this.smtpServer.SessionCompletedEventHandler += OnSessionCompleted;
             this.smtpServer.SessionStartedHandler += OnSessionStarted;
@@ -147,6 +157,27 @@ namespace Rnwood.Smtp4dev.Server
             ((SmtpServer.ServerOptions)this.smtpServer.Options).CommandReceivedEventHandler += OnCommandReceived;
         }
 
+        private Task<X509Certificate> GetTlsCertificate(Settings.ServerOptions serverOptionsValue)
+        {
+            if (!serverOptionsValue.FastStart)
+            {
+                return Task.FromResult<X509Certificate>(CertificateHelper.GetTlsCertificate(serverOptionsValue, log));
+            }
+
+            if (serverOptionsValue.TlsMode == TlsMode.None)
+            {
+                // SMTP does not use a certificate. POP3 loads its own when a connection needs it.
+                return Task.FromResult<X509Certificate>(null);
+            }
+
+            // Loading or generating the certificate can take a few seconds, so let the server start listening first.
+            // TLS handshakes wait for it to complete.
+            Task<X509Certificate> cert = Task.Run(() => (X509Certificate)CertificateHelper.GetTlsCertificate(serverOptionsValue, log));
+            cert.ContinueWith(t => log.Error(t.Exception, "Failed to load TLS certificate. TLS connections will fail."),
+                TaskContinuationOptions.OnlyOnFaulted);
+            return cert;
+        }
+
         private Task OnCommandReceived(object sender, CommandEventArgs e)
         {
             if (!scriptingHost.HasValidateCommandExpression)
@@ -208,6 +239,20 @@ namespace Rnwood.Smtp4dev.Server
             this.notificationsHub.onServerChanged().Wait();
         }
 
+        private Task OnMessageDataStarting(object sender, MessageDataStartingEventArgs e)
+        {
+            if (!this.serverOptions.CurrentValue.StreamingMimeExtraction)
+            {
+                streamingMimeExtractors.TryRemove(e.Connection.Session, out _);
+                return Task.CompletedTask;
+            }
+
+            var extractor = new StreamingMimeMetadataExtractor();
+            streamingMimeExtractors[e.Connection.Session] = extractor;
+            e.DataObserver = extractor;
+            return Task.CompletedTask;
+        }
+
         private async Task OnMessageCompleted(object sender, ConnectionEventArgs e)
         {
             if (!scriptingHost.HasValidateMessageExpression)
@@ -217,7 +262,8 @@ namespace Rnwood.Smtp4dev.Server
 
             using var scope = serviceScopeFactory.CreateScope();
             var mimeProcessingService = scope.ServiceProvider.GetService<MimeProcessingService>();
-            Message message = new MessageConverter(mimeProcessingService).ConvertAsync(await e.Connection.CurrentMessage.ToMessage(), e.Connection.CurrentMessage.Recipients.ToArray()).Result;
+            streamingMimeExtractors.TryGetValue(e.Connection.Session, out var streamingExtractor);
+            Message message = new MessageConverter(mimeProcessingService).ConvertAsync(await e.Connection.CurrentMessage.ToMessage(), e.Connection.CurrentMessage.Recipients.ToArray(), streamingExtractor).Result;
 
             var apiMessage = new ApiModel.Message(message);
 
@@ -305,6 +351,7 @@ namespace Rnwood.Smtp4dev.Server
                 }
             }
             dbContext.SaveChanges();
+            mailboxIdCache.Clear();
 
             var defaultMailbox = dbContext.Mailboxes.FirstOrDefault(m => m.Name == MailboxOptions.DEFAULTNAME);
             foreach (var messageWithoutMailbox in dbContext.Messages.Where(m => m.Mailbox == null))
@@ -335,6 +382,7 @@ namespace Rnwood.Smtp4dev.Server
 
             TrimSessions(dbContext);
             dbContext.SaveChanges();
+            summaryIndex.Clear();
 
             this.notificationsHub.OnMessagesChanged("*").Wait();
             this.notificationsHub.OnSessionsChanged().Wait();
@@ -456,7 +504,10 @@ namespace Rnwood.Smtp4dev.Server
         private readonly IOptionsMonitor<Settings.ServerOptions> serverOptions;
         private readonly IOptionsMonitor<RelayOptions> relayOptions;
         private readonly IDictionary<ISession, Guid> activeSessionsToDbId = new Dictionary<ISession, Guid>();
+        private readonly ConcurrentDictionary<ISession, StreamingMimeMetadataExtractor> streamingMimeExtractors = new ConcurrentDictionary<ISession, StreamingMimeMetadataExtractor>();
         private readonly ScriptingHost scriptingHost;
+        private readonly MailboxIdCache mailboxIdCache;
+        private readonly MessageSummaryIndex summaryIndex;
 
         private static async Task UpdateDbSession(ISession session, Session dbSession)
         {
@@ -492,6 +543,8 @@ namespace Rnwood.Smtp4dev.Server
 
         private async Task OnSessionCompleted(object sender, SessionEventArgs e)
         {
+            streamingMimeExtractors.TryRemove(e.Session, out _);
+
             int messageCount = (await e.Session.GetMessages()).Count;
             var duration = e.Session.EndDate.HasValue 
                 ? (e.Session.EndDate.Value - e.Session.StartDate).TotalMilliseconds 
@@ -554,6 +607,8 @@ namespace Rnwood.Smtp4dev.Server
                 e.Message.Session.ClientAddress, e.Message.From, 
                 string.Join(", ", e.Message.Recipients), e.Message.SecureConnection, e.Message.DeclaredMessageSize);
 
+            streamingMimeExtractors.TryRemove(e.Message.Session, out var streamingExtractor);
+
             var targetMailboxes = await GetTargetMailboxes(e.Message.Recipients, e.Message.Session, e.Message);
 
             if (!targetMailboxes.Any())
@@ -563,11 +618,23 @@ namespace Rnwood.Smtp4dev.Server
                 return;
             }
 
+            if (targetMailboxes.Count > 1)
+            {
+                using var fanOutScope = serviceScopeFactory.CreateScope();
+                var fanOutMimeProcessingService = fanOutScope.ServiceProvider.GetService<MimeProcessingService>();
+                var fanOutTargets = targetMailboxes.ToList();
+                Message fanOutMessage = await new MessageConverter(fanOutMimeProcessingService).ConvertAsync(e.Message, fanOutTargets[0].ToArray(), streamingExtractor);
+                fanOutMessage.IsUnread = true;
+
+                await taskQueue.QueueTask(() => ProcessFanOutMessage(fanOutMessage, e.Message.Session, fanOutTargets), false).ConfigureAwait(false);
+                return;
+            }
+
             foreach (var targetMailboxWithMatchedRecipients in targetMailboxes)
             {
                 using var scope = serviceScopeFactory.CreateScope();
                 var mimeProcessingService = scope.ServiceProvider.GetService<MimeProcessingService>();
-                Message message = new MessageConverter(mimeProcessingService).ConvertAsync(e.Message, targetMailboxWithMatchedRecipients.ToArray()).Result;
+                Message message = new MessageConverter(mimeProcessingService).ConvertAsync(e.Message, targetMailboxWithMatchedRecipients.ToArray(), streamingExtractor).Result;
                 message.IsUnread = true;
 
                 await taskQueue.QueueTask(() => ProcessMessage(message, e.Message.Session, targetMailboxWithMatchedRecipients), false).ConfigureAwait(false);
@@ -707,23 +774,13 @@ namespace Rnwood.Smtp4dev.Server
             Smtp4devDbContext dbContext = scope.ServiceProvider.GetService<Smtp4devDbContext>();
             
             message.Session = dbContext.Sessions.Find(activeSessionsToDbId[session]);
-            message.Mailbox = dbContext.Mailboxes.FirstOrDefault(m => m.Name == targetMailboxWithRecipients.Key.Name);
-            
-            // Assign message to INBOX folder by default for SMTP received messages
-            if (message.Mailbox != null)
-            {
-                var inboxFolder = dbContext.MailboxFolders.FirstOrDefault(f => f.MailboxId == message.Mailbox.Id && f.Name == MailboxFolder.INBOX);
-                if (inboxFolder != null)
-                {
-                    message.MailboxFolder = inboxFolder;
-                    message.MailboxFolderId = inboxFolder.Id;
-                }
-            }
+
+            AttachToMailbox(dbContext, message, targetMailboxWithRecipients.Key.Name);
             
             var relayResult = TryRelayMessage(message, null);
             message.RelayError = string.Join("\n", relayResult.Exceptions.Select(e => e.Key + ": " + e.Value.Message));
             
-            ImapState imapState = dbContext.ImapState.Single();
+            ImapState imapState = CompiledQueries.ImapState(dbContext);
             imapState.LastUid = Math.Max(0, imapState.LastUid + 1);
             message.ImapUid = imapState.LastUid;
             if (relayResult.WasRelayed)
@@ -734,6 +791,11 @@ namespace Rnwood.Smtp4dev.Server
                 }
             }
             
+            if (serverOptions.CurrentValue.DeduplicateAttachments)
+            {
+                AttachmentBlobStore.SplitAttachments(dbContext, message);
+            }
+
             dbContext.Messages.Add(message);
             
             // Update session warnings if message has bare line feeds
@@ -743,6 +805,7 @@ namespace Rnwood.Smtp4dev.Server
             }
             
             dbContext.SaveChanges();
+            summaryIndex.Add(message);
             
             TrimMessages(dbContext, new List<Mailbox>() {message.Mailbox});
             dbContext.SaveChanges();
@@ -750,41 +813,167 @@ namespace Rnwood.Smtp4dev.Server
             log.Information("Message processing completed. MessageId: {messageId}, Mailbox: {mailbox}, ImapUid: {imapUid}", 
                 message.Id, message.Mailbox.Name, message.ImapUid);
 
-            // Deliver to stdout if configured for this mailbox
-            if (ShouldDeliverToStdout(targetMailboxWithRecipients.Key.Name))
+            DeliverToStdoutIfConfigured(message, targetMailboxWithRecipients.Key.Name);
+        }
+
+        /// <summary>
+        /// Delivers a message which matched more than one mailbox. A message row is stored per mailbox, with the
+        /// attachments split out once and shared by the rows when <c>DeduplicateAttachments</c> is enabled. The message
+        /// is relayed once and all rows are saved in a single transaction followed by a single change notification.
+        /// </summary>
+        void ProcessFanOutMessage(Message message, ISession session, IReadOnlyList<IGrouping<MailboxOptions, string>> targetMailboxes)
+        {
+            log.Information("Processing received message for {mailboxCount} mailboxes '{mailboxes}'", targetMailboxes.Count, targetMailboxes.Select(t => t.Key.Name).ToArray());
+            using var scope = serviceScopeFactory.CreateScope();
+            Smtp4devDbContext dbContext = scope.ServiceProvider.GetService<Smtp4devDbContext>();
+
+            message.Session = dbContext.Sessions.Find(activeSessionsToDbId[session]);
+
+            var relayResult = TryRelayMessage(message, null);
+            string relayError = string.Join("\n", relayResult.Exceptions.Select(e => e.Key + ": " + e.Value.Message));
+
+            if (serverOptions.CurrentValue.DeduplicateAttachments)
             {
-                lock (stdoutLock)
+                AttachmentBlobStore.SplitAttachments(dbContext, message);
+            }
+
+            ImapState imapState = CompiledQueries.ImapState(dbContext);
+            var deliveries = new List<(Message Message, string MailboxName)>(targetMailboxes.Count);
+
+            foreach (var targetMailboxWithRecipients in targetMailboxes)
+            {
+                Message delivery = deliveries.Count == 0 ? message : CopyForDelivery(dbContext, message);
+                delivery.DeliveredTo = PunyCodeReplacer.DecodePunycode(string.Join(", ", targetMailboxWithRecipients));
+                delivery.RelayError = relayError;
+
+                AttachToMailbox(dbContext, delivery, targetMailboxWithRecipients.Key.Name);
+
+                imapState.LastUid = Math.Max(0, imapState.LastUid + 1);
+                delivery.ImapUid = imapState.LastUid;
+
+                if (relayResult.WasRelayed)
                 {
-                    // Output the raw message content to stdout
-                    // Use a delimiter that is very unlikely to appear in email messages
-                    Console.WriteLine("--- BEGIN SMTP4DEV MESSAGE ---");
-                    if (message.Data != null)
+                    foreach (var relay in relayResult.RelayRecipients)
                     {
-                        // Write raw message bytes to stdout
-                        using (var stdout = Console.OpenStandardOutput())
-                        {
-                            stdout.Write(message.Data, 0, message.Data.Length);
-                            stdout.Flush();
-                        }
-                        Console.WriteLine(); // Ensure delimiter is on new line
+                        delivery.AddRelay(new MessageRelay { SendDate = relay.RelayDate, To = relay.Email });
+                    }
+                }
+
+                deliveries.Add((delivery, targetMailboxWithRecipients.Key.Name));
+            }
+
+            dbContext.Messages.AddRange(deliveries.Select(d => d.Message));
+
+            if (message.HasBareLineFeed)
+            {
+                message.Session.HasBareLineFeed = true;
+            }
+
+            dbContext.SaveChanges();
+            foreach (var (delivery, _) in deliveries)
+            {
+                summaryIndex.Add(delivery);
+            }
+
+            TrimMessages(dbContext, deliveries.Select(d => d.Message.Mailbox).Where(m => m != null).Distinct());
+            dbContext.SaveChanges();
+            notificationsHub.OnMessagesChangedBatch(deliveries.Select(d => d.MailboxName).ToArray()).Wait();
+            log.Information("Message processing completed. MessageIds: {messageIds}, Mailboxes: {mailboxes}",
+                deliveries.Select(d => d.Message.Id).ToArray(), deliveries.Select(d => d.MailboxName).ToArray());
+
+            foreach (var (delivery, mailboxName) in deliveries)
+            {
+                DeliverToStdoutIfConfigured(delivery, mailboxName);
+            }
+        }
+
+        private static Message CopyForDelivery(Smtp4devDbContext dbContext, Message message)
+        {
+            // Every mapped property is copied, then those which differ per delivery are reset.
+            var values = dbContext.Entry(message).CurrentValues.Clone();
+            values[nameof(Message.Id)] = Guid.NewGuid();
+            values[nameof(Message.ImapUid)] = 0L;
+            values[nameof(Message.DeliveredTo)] = null;
+            values[nameof(Message.MailboxFolderId)] = null;
+
+            var copy = (Message)values.ToObject();
+            copy.Session = message.Session;
+            copy.AttachmentBlobReferences.AddRange(message.AttachmentBlobReferences.Select(r => new AttachmentBlobReference
+            {
+                Offset = r.Offset,
+                BlobHash = r.BlobHash,
+                Blob = r.Blob
+            }));
+            return copy;
+        }
+
+        private void AttachToMailbox(Smtp4devDbContext dbContext, Message message, string mailboxName)
+        {
+            // Mailbox and folder are attached as stubs from cached ids rather than queried per message.
+            var ids = mailboxIdCache.GetOrLoad(dbContext, mailboxName, MailboxFolder.INBOX);
+            if (ids != null)
+            {
+                var mailbox = dbContext.Mailboxes.Local.FirstOrDefault(m => m.Id == ids.MailboxId);
+                if (mailbox == null)
+                {
+                    mailbox = new Mailbox { Id = ids.MailboxId, Name = mailboxName };
+                    dbContext.Attach(mailbox);
+                }
+                message.Mailbox = mailbox;
+
+                // Assign message to INBOX folder by default for SMTP received messages
+                if (ids.FolderId.HasValue)
+                {
+                    var inboxFolder = dbContext.MailboxFolders.Local.FirstOrDefault(f => f.Id == ids.FolderId.Value);
+                    if (inboxFolder == null)
+                    {
+                        inboxFolder = new MailboxFolder { Id = ids.FolderId.Value, Name = MailboxFolder.INBOX, MailboxId = mailbox.Id, Mailbox = mailbox };
+                        dbContext.Attach(inboxFolder);
                     }
-                    Console.WriteLine("--- END SMTP4DEV MESSAGE ---");
-                    Console.Out.Flush();
+                    message.MailboxFolder = inboxFolder;
+                    message.MailboxFolderId = inboxFolder.Id;
+                }
+            }
+        }
 
-                    messagesDeliveredToStdoutCount++;
-                    
-                    // Check if we should exit after delivering this message
-                    var exitAfter = serverOptions.CurrentValue.ExitAfterMessages;
-                    if (exitAfter.HasValue && messagesDeliveredToStdoutCount >= exitAfter.Value)
+        private void DeliverToStdoutIfConfigured(Message message, string mailboxName)
+        {
+            if (!ShouldDeliverToStdout(mailboxName))
+            {
+                return;
+            }
+
+            lock (stdoutLock)
+            {
+                // Output the raw message content to stdout
+                // Use a delimiter that is very unlikely to appear in email messages
+                Console.WriteLine("--- BEGIN SMTP4DEV MESSAGE ---");
+                if (message.Data != null)
+                {
+                    // Write raw message bytes to stdout
+                    using (var stdout = Console.OpenStandardOutput())
                     {
-                        log.Information("Delivered {count} messages to stdout. Exiting as configured by ExitAfterMessages.", messagesDeliveredToStdoutCount);
-                        // Schedule application exit on a background thread to allow this method to complete
-                        Task.Run(async () =>
-                        {
-                            await Task.Delay(100); // Give time for logs to flush
-                            Environment.Exit(0);
-                        });
+                        stdout.Write(message.Data, 0, message.Data.Length);
+                        stdout.Flush();
                     }
+                    Console.WriteLine(); // Ensure delimiter is on new line
+                }
+                Console.WriteLine("--- END SMTP4DEV MESSAGE ---");
+                Console.Out.Flush();
+
+                messagesDeliveredToStdoutCount++;
+                
+                // Check if we should exit after delivering this message
+                var exitAfter = serverOptions.CurrentValue.ExitAfterMessages;
+                if (exitAfter.HasValue && messagesDeliveredToStdoutCount >= exitAfter.Value)
+                {
+                    log.Information("Delivered {count} messages to stdout. Exiting as configured by ExitAfterMessages.", messagesDeliveredToStdoutCount);
+                    // Schedule application exit on a background thread to allow this method to complete
+                    Task.Run(async () =>
+                    {
+                        await Task.Delay(100); // Give time for logs to flush
+                        Environment.Exit(0);
+                    });
                 }
             }
         }
@@ -871,13 +1060,30 @@ namespace Rnwood.Smtp4dev.Server
 
         private void TrimMessages(Smtp4devDbContext dbContext, IEnumerable<Mailbox> mailboxes)
         {
+            bool trimmed = false;
             foreach (var mailbox in mailboxes)
             {
-                dbContext.Messages
+                // The ids are needed to remove the messages from the summary index.
+                var trimmedIds = dbContext.Messages
                     .Where(m => m.Mailbox == mailbox)
                     .OrderByDescending(m => m.ReceivedDate)
                     .Skip(serverOptions.CurrentValue.NumberOfMessagesToKeep)
-                    .ExecuteDelete();
+                    .Select(m => m.Id)
+                    .ToList();
+
+                if (trimmedIds.Count > 0)
+                {
+                    dbContext.Messages
+                        .Where(m => trimmedIds.Contains(m.Id))
+                        .ExecuteDelete();
+                    summaryIndex.Remove(trimmedIds);
+                    trimmed = true;
+                }
+            }
+
+            if (trimmed)
+            {
+                AttachmentBlobStore.DeleteUnreferencedBlobs(dbContext);
             }
         }
 
@@ -937,6 +1143,11 @@ namespace Rnwood.Smtp4dev.Server
 
         Task IHostedService.StartAsync(CancellationToken cancellationToken)
         {
+            if (serverOptions.CurrentValue.FastStart)
+            {
+                return Task.Run(this.TryStart, cancellationToken);
+            }
+
             this.TryStart();
             return Task.CompletedTask;
         }
@@ -0,0 +1,376 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Text;
+using MimeKit;
+using Rnwood.SmtpServer;
+
+namespace Rnwood.Smtp4dev.Server
+{
+    /// <summary>
+    /// Extracts MIME metadata, subject, attachment count and body text line by line while the DATA command is
+    /// still receiving a message, so that no full parse is needed once the message is complete.
+    ///
+    /// Only header blocks and text parts which could be the body are buffered. Attachments and other
+    /// non-text parts are skipped without being decoded, and extracted body text is capped at
+    /// <see cref="MaxBodyTextLength"/> characters per format.
+    ///
+    /// The parsed entities are assembled into a message without attachment content, so that the body text
+    /// is chosen by <see cref="MimeMessage.TextBody"/> and <see cref="MimeMessage.HtmlBody"/> exactly as it
+    /// would be from a full parse.
+    ///
+    /// If the message cannot be handled <see cref="Succeeded"/> is false and callers should fall back to
+    /// <see cref="MimeProcessingService"/>.
+    /// </summary>
+    public class StreamingMimeMetadataExtractor : IMessageDataObserver
+    {
+        /// <summary>
+        /// Maximum number of characters of text extracted from each of the plain text and HTML bodies.
+        /// </summary>
+        public const int MaxBodyTextLength = 256 * 1024;
+
+        // Allows for quoted-printable and base64 overhead when buffering encoded body text.
+        private const int MaxEncodedBodyLength = MaxBodyTextLength * 4;
+        private const int MaxHeaderBlockLength = 1024 * 1024;
+
+        private static readonly byte[] Crlf = "\r\n"u8.ToArray();
+
+        private readonly List<MultipartFrame> openMultiparts = new List<MultipartFrame>();
+        private readonly HashSet<string> seenContentIds = new HashSet<string>();
+        private readonly MemoryStream headerBlock = new MemoryStream();
+
+        private bool inHeaders = true;
+        private PendingEntity pendingEntity = new PendingEntity(IsMessage: true, HasParent: false, InsideMessagePart: false);
+        private MimeMessage topLevelMessage;
+        private bool topLevelHeadersParsed;
+        private bool failed;
+        private bool completed;
+
+        private TextPart collectingTextPart;
+        private MemoryStream collectedBody;
+
+        public bool Succeeded => completed && !failed && topLevelHeadersParsed;
+
+        public string Subject { get; private set; }
+
+        public MimeMetadata Metadata { get; } = new MimeMetadata();
+
+        public string TextBody { get; private set; }
+
+        public string HtmlBody { get; private set; }
+
+        /// <summary>
+        /// Number of attachments using the same rules as <see cref="ApiModel.Message"/>, including those in attached messages.
+        /// </summary>
+        public int AttachmentCount { get; private set; }
+
+        public void OnDataLine(byte[] line)
+        {
+            if (failed || completed)
+            {
+                return;
+            }
+
+            try
+            {
+                ProcessLine(line);
+            }
+            catch (Exception)
+            {
+                failed = true;
+            }
+        }
+
+        public void OnDataCompleted()
+        {
+            if (completed)
+            {
+                return;
+            }
+
+            try
+            {
+                if (!failed)
+                {
+                    if (inHeaders)
+                    {
+                        if (pendingEntity.HasParent)
+                        {
+                            CompleteHeaders();
+                        }
+                        else
+                        {
+                            // No blank line after the top level headers.
+                            failed = true;
+                        }
+                    }
+
+                    FinishLeaf();
+
+                    if (topLevelMessage != null)
+                    {
+                        TextBody = Truncate(topLevelMessage.TextBody);
+                        HtmlBody = Truncate(topLevelMessage.HtmlBody);
+                    }
+                }
+            }
+            catch (Exception)
+            {
+                failed = true;
+            }
+            finally
+            {
+                completed = true;
+                headerBlock.Dispose();
+                collectedBody = null;
+                collectingTextPart = null;
+                topLevelMessage = null;
+            }
+        }
+
+        private void ProcessLine(byte[] line)
+        {
+            if (openMultiparts.Count > 0 && line.Length >= 2 && line[0] == '-' && line[1] == '-'
+                && TryMatchBoundary(line, out int frameIndex, out bool isClosing))
+            {
+                if (inHeaders)
+                {
+                    CompleteHeaders();
+                }
+
+                ProcessBoundary(frameIndex, isClosing);
+                return;
+            }
+
+            if (inHeaders)
+            {
+                if (line.Length == 0)
+                {
+                    CompleteHeaders();
+                    return;
+                }
+
+                if (headerBlock.Length + line.Length > MaxHeaderBlockLength)
+                {
+                    failed = true;
+                    return;
+                }
+
+                headerBlock.Write(line, 0, line.Length);
+                headerBlock.Write(Crlf, 0, Crlf.Length);
+                return;
+            }
+
+            if (collectedBody != null && collectedBody.Length < MaxEncodedBodyLength)
+            {
+                collectedBody.Write(line, 0, line.Length);
+                collectedBody.Write(Crlf, 0, Crlf.Length);
+            }
+        }
+
+        private bool TryMatchBoundary(byte[] line, out int frameIndex, out bool isClosing)
+        {
+            // Innermost first, but a boundary of an enclosing multipart also ends any parts nested within it.
+            for (frameIndex = openMultiparts.Count - 1; frameIndex >= 0; frameIndex--)
+            {
+                byte[] delimiter = openMultiparts[frameIndex].Delimiter;
+                if (line.Length < delimiter.Length || !line.AsSpan(0, delimiter.Length).SequenceEqual(delimiter))
+                {
+                    continue;
+                }
+
+                ReadOnlySpan<byte> rest = line.AsSpan(delimiter.Length);
+                isClosing = rest.Length >= 2 && rest[0] == '-' && rest[1] == '-';
+                if (isClosing)
+                {
+                    rest = rest.Slice(2);
+                }
+
+                if (rest.Trim(" \t"u8).Length == 0)
+                {
+                    return true;
+                }
+            }
+
+            isClosing = false;
+            return false;
+        }
+
+        private void ProcessBoundary(int frameIndex, bool isClosing)
+        {
+            // The line break before a boundary belongs to the boundary rather than to the part.
+            if (collectedBody is { Length: >= 2 })
+            {
+                collectedBody.SetLength(collectedBody.Length - Crlf.Length);
+            }
+
+            FinishLeaf();
+
+            MultipartFrame frame = openMultiparts[frameIndex];
+            openMultiparts.RemoveRange(frameIndex + 1, openMultiparts.Count - frameIndex - 1);
+
+            if (isClosing)
+            {
+                // Anything up to the next enclosing boundary is epilogue and is ignored.
+                openMultiparts.RemoveAt(frameIndex);
+                return;
+            }
+
+            pendingEntity = new PendingEntity(IsMessage: false, HasParent: true, InsideMessagePart: frame.InsideMessagePart);
+            inHeaders = true;
+        }
+
+        private void CompleteHeaders()
+        {
+            inHeaders = false;
+            headerBlock.Write(Crlf, 0, Crlf.Length);
+            headerBlock.Position = 0;
+
+            MimeEntity entity;
+            if (pendingEntity.IsMessage)
+            {
+                MimeMessage message = MimeMessage.Load(headerBlock);
+
+                if (!pendingEntity.HasParent)
+                {
+                    topLevelHeadersParsed = true;
+                    topLevelMessage = message;
+                    Subject = message.Subject;
+
+                    foreach (InternetAddress cc in message.Cc)
+                    {
+                        Metadata.CcRecipients.Add(cc.ToString());
+                    }
+
+                    Metadata.ContentType = message.Body?.ContentType?.MimeType ?? "";
+                }
+
+                entity = message.Body;
+            }
+            else
+            {
+                entity = MimeEntity.Load(headerBlock);
+            }
+
+            headerBlock.SetLength(0);
+
+            if (entity == null)
+            {
+                failed = true;
+                return;
+            }
+
+            StartEntity(entity);
+        }
+
+        private void StartEntity(MimeEntity entity)
+        {
+            bool insideMessagePart = pendingEntity.InsideMessagePart;
+            Multipart parent = pendingEntity.IsMessage ? null : openMultiparts[^1].Multipart;
+
+            if (!insideMessagePart)
+            {
+                AddPartMetadata(entity);
+                parent?.Add(entity);
+            }
+
+            if (pendingEntity.HasParent && IsAttachment(entity))
+            {
+                AttachmentCount++;
+            }
+
+            switch (entity)
+            {
+                case Multipart multipart when !string.IsNullOrEmpty(multipart.Boundary):
+                    // The preamble up to the first boundary is ignored.
+                    openMultiparts.Add(new MultipartFrame(Encoding.ASCII.GetBytes("--" + multipart.Boundary), multipart, insideMessagePart));
+                    break;
+
+                case MessagePart:
+                    // The body of an attached message starts with its own header block.
+                    pendingEntity = new PendingEntity(IsMessage: true, HasParent: true, InsideMessagePart: true);
+                    inHeaders = true;
+                    break;
+
+                // MimeKit ignores the disposition of the alternatives in a multipart/alternative or multipart/related.
+                case TextPart textPart when !insideMessagePart && (textPart.IsPlain || textPart.IsHtml)
+                                            && (!textPart.IsAttachment || parent is MultipartAlternative or MultipartRelated):
+                    collectingTextPart = textPart;
+                    collectedBody = new MemoryStream();
+                    break;
+            }
+        }
+
+        private void FinishLeaf()
+        {
+            if (collectingTextPart == null)
+            {
+                return;
+            }
+
+            TextPart textPart = collectingTextPart;
+            MemoryStream body = collectedBody;
+            collectingTextPart = null;
+            collectedBody = null;
+
+            body.Position = 0;
+            textPart.Content = new MimeContent(body, textPart.ContentTransferEncoding);
+        }
+
+        private static string Truncate(string text)
+        {
+            return text?.Length > MaxBodyTextLength ? text.Substring(0, MaxBodyTextLength) : text;
+        }
+
+        private void AddPartMetadata(MimeEntity entity)
+        {
+            // Mirrors MimeProcessingService.ExtractPartMetadata.
+            Metadata.PartCount++;
+
+            if (!string.IsNullOrEmpty(entity.ContentId) && seenContentIds.Contains(entity.ContentId))
+            {
+                Metadata.HasDuplicatedContentIds = true;
+            }
+            else
+            {
+                seenContentIds.Add(entity.ContentId);
+            }
+
+            if (entity.IsAttachment)
+            {
+                var filename = entity.ContentDisposition?.FileName ?? entity.ContentType?.Name;
+                if (!string.IsNullOrEmpty(filename))
+                {
+                    Metadata.AttachmentFilenames.Add(filename);
+                }
+            }
+
+            if (entity is TextPart textPart)
+            {
+                if (textPart.IsPlain)
+                {
+                    Metadata.HasTextBody = true;
+                }
+                else if (textPart.IsHtml)
+                {
+                    Metadata.HasHtmlBody = true;
+                }
+            }
+        }
+
+        private static bool IsAttachment(MimeEntity entity)
+        {
+            // Same rule as ApiModel.Message uses to list attachments.
+            var fileName = !string.IsNullOrEmpty(entity.ContentDisposition?.FileName)
+                ? entity.ContentDisposition?.FileName
+                : entity.ContentType?.Name;
+
+            return (entity.ContentDisposition?.Disposition != "inline" && !string.IsNullOrEmpty(fileName))
+                   || entity.ContentDisposition?.Disposition == "attachment";
+        }
+
+        private record MultipartFrame(byte[] Delimiter, Multipart Multipart, bool InsideMessagePart);
+
+        private record PendingEntity(bool IsMessage, bool HasParent, bool InsideMessagePart);
+    }
+}
@@ -1,8 +1,8 @@
 using System;
-using System.Collections.Concurrent;
 using System.Collections.Generic;
 using System.Linq;
 using System.Text;
+using System.Threading;
 using Microsoft.Extensions.Logging;
 using Serilog.Events;
 using Serilog.Core;
@@ -22,24 +22,70 @@ namespace Rnwood.Smtp4dev.Service
         public string Exception { get; set; }
         public string Source { get; set; }
         public string FormattedMessage { get; set; }
+
+        /// <summary>
+        /// Position of this entry in the log, increasing by one per entry. Used as the cursor for retrieving later entries.
+        /// </summary>
+        public long Sequence { get; set; }
     }
 
     /// <summary>
-    /// Service to capture and store server logs in memory for streaming to web UI
+    /// Service to capture and store server logs in memory for streaming to web UI.
+    ///
+    /// Entries are kept in a fixed size ring buffer and numbered by <see cref="LogEntry.Sequence"/> so that clients
+    /// can fetch only the entries after the last one they have seen. New entries are published to
+    /// <see cref="LogsReceived"/> in batches rather than one by one.
     /// </summary>
     public class ServerLogService : ILogEventSink, IDisposable
     {
-        private readonly ConcurrentQueue<LogEntry> _logBuffer = new ConcurrentQueue<LogEntry>();
-        private readonly int _maxLogEntries;
+        public static readonly TimeSpan DefaultPublishInterval = TimeSpan.FromMilliseconds(250);
+
+        private readonly LogEntry[] _entries;
+        private readonly LogEventLevel[] _levels;
         private readonly ITextFormatter _formatter;
         private readonly object _lock = new object();
+        private readonly Timer _publishTimer;
 
-        public event EventHandler<LogEntry> LogReceived;
+        // Sequence of the newest entry, and of the oldest entry still in the buffer.
+        private long _lastSequence;
+        private long _firstSequence = 1;
+        private long _lastPublishedSequence;
+        private int _publishing;
 
-        public ServerLogService(int maxLogEntries = 500)
+        /// <summary>
+        /// Raised with the entries logged since the previous batch, at most once per publish interval.
+        /// </summary>
+        public event EventHandler<IReadOnlyList<LogEntry>> LogsReceived;
+
+        public ServerLogService(int maxLogEntries = 500) : this(maxLogEntries, DefaultPublishInterval)
         {
-            _maxLogEntries = maxLogEntries;
+        }
+
+        public ServerLogService(int maxLogEntries, TimeSpan publishInterval)
+        {
+            if (maxLogEntries < 1)
+            {
+                throw new ArgumentOutOfRangeException(nameof(maxLogEntries), maxLogEntries, "At least one log entry must be kept.");
+            }
+
+            _entries = new LogEntry[maxLogEntries];
+            _levels = new LogEventLevel[maxLogEntries];
             _formatter = new MessageTemplateTextFormatter("{Timestamp:yyyy-MM-dd HH:mm:ss.fff zzz} [{Level:u3}] {Message:lj}{NewLine}{Exception}", null);
+            _publishTimer = new Timer(_ => PublishPendingEntries(), null, publishInterval, publishInterval);
+        }
+
+        /// <summary>
+        /// Sequence number of the newest entry, or 0 if nothing has been logged.
+        /// </summary>
+        public long LastSequence
+        {
+            get
+            {
+                lock (_lock)
+                {
+                    return _lastSequence;
+                }
+            }
         }
 
         public void Emit(LogEvent logEvent)
@@ -65,44 +111,123 @@ namespace Rnwood.Smtp4dev.Service
                 FormattedMessage = formattedMessage
             };
 
-            _logBuffer.Enqueue(logEntry);
-
-            // Trim buffer if it exceeds max size
-            while (_logBuffer.Count > _maxLogEntries)
+            lock (_lock)
             {
-                _logBuffer.TryDequeue(out _);
-            }
+                logEntry.Sequence = ++_lastSequence;
+                int index = IndexOf(logEntry.Sequence);
+                _entries[index] = logEntry;
+                _levels[index] = logEvent.Level;
 
-            // Notify subscribers
-            LogReceived?.Invoke(this, logEntry);
+                if (_lastSequence - _firstSequence >= _entries.Length)
+                {
+                    _firstSequence = _lastSequence - _entries.Length + 1;
+                }
+            }
         }
 
         public IEnumerable<LogEntry> GetAllLogEntries()
         {
-            return _logBuffer.ToArray();
+            return GetEntriesSince(0);
+        }
+
+        /// <summary>
+        /// Returns the entries with a sequence number greater than <paramref name="afterSequence"/>, oldest first.
+        /// If entries after the cursor have already been overwritten the result starts at the oldest entry still held.
+        /// </summary>
+        /// <param name="afterSequence">Sequence number of the last entry already seen, or 0 for all entries.</param>
+        /// <param name="minimumLevel">If specified only entries of this level or higher are returned.</param>
+        /// <param name="maxCount">Maximum number of entries to return. The oldest matching entries are returned first.</param>
+        public IReadOnlyList<LogEntry> GetEntriesSince(long afterSequence, LogEventLevel? minimumLevel = null, int maxCount = int.MaxValue)
+        {
+            var result = new List<LogEntry>();
+
+            lock (_lock)
+            {
+                for (long sequence = Math.Max(afterSequence + 1, _firstSequence); sequence <= _lastSequence && result.Count < maxCount; sequence++)
+                {
+                    int index = IndexOf(sequence);
+                    if (!minimumLevel.HasValue || _levels[index] >= minimumLevel.Value)
+                    {
+                        result.Add(_entries[index]);
+                    }
+                }
+            }
+
+            return result;
         }
 
         public string GetAllLogs()
         {
-            return string.Join("", _logBuffer.Select(e => e.FormattedMessage));
+            var builder = new StringBuilder();
+            foreach (LogEntry entry in GetEntriesSince(0))
+            {
+                builder.Append(entry.FormattedMessage);
+            }
+
+            return builder.ToString();
         }
 
         public IEnumerable<string> GetRecentLogs(int count)
         {
-            return _logBuffer.TakeLast(count).Select(e => e.FormattedMessage);
+            long afterSequence;
+            lock (_lock)
+            {
+                afterSequence = Math.Max(0, _lastSequence - count);
+            }
+
+            return GetEntriesSince(afterSequence).Select(e => e.FormattedMessage);
         }
 
         public void Clear()
         {
             lock (_lock)
             {
-                _logBuffer.Clear();
+                // Sequence numbers keep increasing so cursors held by clients remain valid.
+                _firstSequence = _lastSequence + 1;
+                Array.Clear(_entries);
+            }
+        }
+
+        /// <summary>
+        /// Raises <see cref="LogsReceived"/> for any entries logged since the last batch. Called by a timer.
+        /// </summary>
+        public void PublishPendingEntries()
+        {
+            // Skip this tick if the previous batch is still being delivered.
+            if (Interlocked.Exchange(ref _publishing, 1) == 1)
+            {
+                return;
+            }
+
+            try
+            {
+                IReadOnlyList<LogEntry> entries = GetEntriesSince(Interlocked.Read(ref _lastPublishedSequence));
+                if (entries.Count == 0)
+                {
+                    return;
+                }
+
+                Interlocked.Exchange(ref _lastPublishedSequence, entries[entries.Count - 1].Sequence);
+                LogsReceived?.Invoke(this, entries);
+            }
+            catch (Exception)
+            {
+                // Publishing must never take down the timer.
+            }
+            finally
+            {
+                Interlocked.Exchange(ref _publishing, 0);
             }
         }
 
+        private int IndexOf(long sequence)
+        {
+            return (int)((sequence - 1) % _entries.Length);
+        }
+
         public void Dispose()
         {
-            // Nothing to dispose
+            _publishTimer.Dispose();
         }
     }
 }
@@ -81,6 +81,28 @@ namespace Rnwood.Smtp4dev
             }
         }
 
+        /// <summary>
+        /// Creates the schema of a new in-memory database directly from the model and seeds the IMAP state.
+        /// A new in-memory database has no data to migrate and cannot be from a newer version, so this is used
+        /// by fast start instead of replaying every migration. Does nothing if the schema already exists.
+        /// </summary>
+        /// <param name="context">The database context to create the schema for</param>
+        private static void CreateFastStartDatabase(Smtp4devDbContext context)
+        {
+            if (!context.Database.EnsureCreated() || context.ImapState.Any())
+            {
+                return;
+            }
+
+            Log.Logger.Information("Fast start: created in-memory database schema from model");
+            context.Add(new ImapState
+            {
+                Id = Guid.Empty,
+                LastUid = 0
+            });
+            context.SaveChanges();
+        }
+
         // This method gets called by the runtime. Use this method to add services to the container.
         public void ConfigureServices(IServiceCollection services)
         {
@@ -131,10 +153,22 @@ namespace Rnwood.Smtp4dev
                             opt.UseSqlite($"Data Source={dbLocation}");
                         }
 
+                        if (serverOptions.DatabaseProfile == DatabaseProfile.Tuned)
+                        {
+                            var tuningInterceptor = new SqliteTuningInterceptor(string.IsNullOrEmpty(serverOptions.Database));
+                            Log.Logger.Information("Using tuned SQLite profile. Pragmas: {pragmas}", tuningInterceptor.Pragmas);
+                            opt.AddInterceptors(tuningInterceptor);
+                        }
 
 
                         using var context = new Smtp4devDbContext((DbContextOptions<Smtp4devDbContext>)opt.Options);
 
+                        if (serverOptions.FastStart && string.IsNullOrEmpty(serverOptions.Database))
+                        {
+                            CreateFastStartDatabase(context);
+                            return;
+                        }
+
                         // Validate database version compatibility before attempting any operations
                         ValidateDatabaseVersionCompatibility(context);
 
@@ -217,6 +251,7 @@ namespace Rnwood.Smtp4dev
 
                         // Populate MIME metadata for existing messages synchronously during startup
                         var messagesWithoutMetadata = context.Messages
+                            .IncludeAttachmentBlobs()
                             .Where(m => string.IsNullOrEmpty(m.MimeMetadata) || string.IsNullOrEmpty(m.BodyText))
                             .ToList();
 
@@ -268,6 +303,8 @@ namespace Rnwood.Smtp4dev
             services.AddSingleton<ITaskQueue, TaskQueue>();
             services.AddSingleton<ScriptingHost>();
             services.AddScoped<MimeProcessingService>();
+            services.AddSingleton<MailboxIdCache>();
+            services.AddSingleton<MessageSummaryIndex>();
             services.AddSingleton(Program.ServerLogService);
 
             services.AddSingleton<Func<RelayOptions, SmtpClient>>(relayOptions =>
@@ -342,9 +379,9 @@ namespace Rnwood.Smtp4dev
             // Wire up server log notifications
             var serverLogService = app.ApplicationServices.GetRequiredService<ServerLogService>();
             var notificationsHub = app.ApplicationServices.GetRequiredService<NotificationsHub>();
-            serverLogService.LogReceived += async (sender, logEntry) =>
+            serverLogService.LogsReceived += (sender, logEntries) =>
             {
-                await notificationsHub.OnServerLogReceived(logEntry);
+                notificationsHub.OnServerLogsReceived(logEntries).Wait();
             };
 
             app.UseRouting();
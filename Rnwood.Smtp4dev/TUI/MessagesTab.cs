@@ -33,6 +33,7 @@ namespace Rnwood.Smtp4dev.TUI
         private Message selectedMessage;
         private string searchFilter = string.Empty;
         private int lastSelectedRow = -1;
+        private long lastChangeCount = -1;
 
         public MessagesTab(IHost host)
         {
@@ -270,8 +271,21 @@ namespace Rnwood.Smtp4dev.TUI
             return container;
         }
 
+        /// <summary>
+        /// Refreshes the list only if messages have changed since the last refresh.
+        /// </summary>
+        public void RefreshIfChanged()
+        {
+            if (host.Services.GetRequiredService<MessageSummaryIndex>().ChangeCount != lastChangeCount)
+            {
+                Refresh();
+            }
+        }
+
         public void Refresh()
         {
+            lastChangeCount = host.Services.GetRequiredService<MessageSummaryIndex>().ChangeCount;
+
             // Save current selection
             if (messageTableView.Table != null && messageTableView.SelectedRow >= 0)
             {
@@ -281,6 +295,7 @@ namespace Rnwood.Smtp4dev.TUI
             var dbContext = host.Services.GetRequiredService<Smtp4devDbContext>();
             messages = dbContext.Messages
                 .AsNoTracking()
+                .IncludeAttachmentBlobs()
                 .OrderByDescending(m => m.ReceivedDate)
                 .Take(100)
                 .ToList();
@@ -103,19 +103,31 @@ namespace Rnwood.Smtp4dev.TUI
                 {
                     Application.MainLoop.Invoke(() =>
                     {
-                        RefreshCurrentTab();
+                        RefreshCurrentTab(onlyIfChanged: true);
                     });
                 }
             }
         }
 
         private void RefreshCurrentTab()
+        {
+            RefreshCurrentTab(onlyIfChanged: false);
+        }
+
+        private void RefreshCurrentTab(bool onlyIfChanged)
         {
             var currentTab = tabView.SelectedTab;
             var tabs = tabView.Tabs.ToList();
             if (tabs.Count > 0 && currentTab == tabs[0]) // Messages tab
             {
-                messagesTab.Refresh();
+                if (onlyIfChanged)
+                {
+                    messagesTab.RefreshIfChanged();
+                }
+                else
+                {
+                    messagesTab.Refresh();
+                }
             }
             else if (tabs.Count > 1 && currentTab == tabs[1]) // Sessions tab
             {
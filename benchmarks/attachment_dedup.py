@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measures database size and ingest time when the same attachments are sent repeatedly, with and without
+``--deduplicateattachments``.
+
+Each message carries ``--attachments`` attachments drawn from a pool of ``--distinct`` random files, as a CI
+system sending the same report or log many times would. For each mode a fresh smtp4dev with a file database is
+launched and:
+
+* ``ingest_s`` - wall clock time until every message is visible through the API.
+* ``db_mb`` - size of the database file (including the WAL file, if any) once ingest is complete.
+* ``raw_p50_ms`` - median time to fetch ``/api/messages/{id}/raw``, which reassembles deduplicated messages.
+
+Example:
+    python benchmarks/attachment_dedup.py --messages 500 --distinct 3 --attachment-size 524288
+"""
+
+import argparse
+import os
+import random
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import smtp4dev_bench as bench
+
+MODES = {"inline": [], "dedup": ["--deduplicateattachments"]}
+DATABASE = "database.db"
+
+
+def database_size(instance: bench.Smtp4devInstance) -> int:
+    path = os.path.join(instance.data_dir.name, DATABASE)
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+def run(args, extra_args, pool):
+    rng = random.Random(args.seed)
+    messages = []
+    for i in range(args.messages):
+        chosen = rng.sample(range(len(pool)), min(args.attachments, len(pool)))
+        attachments = [(f"attachment{index}.bin", pool[index]) for index in chosen]
+        messages.append(bench.build_message(f"Attachment dedup {i}", attachments=attachments))
+
+    extra = list(extra_args) + [f"--messagestokeep={args.messages}"]
+    with bench.launch(args, extra_args=extra, database=DATABASE) as instance:
+
+        def send_batch(batch):
+            with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=120) as smtp:
+                for message in batch:
+                    smtp.sendmail("bench@example.com", ["to@example.com"], message)
+
+        batches = [messages[i::args.senders] for i in range(args.senders)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.senders) as executor:
+            list(executor.map(send_batch, batches))
+        bench.wait_for_message_count(instance, args.messages, timeout=600)
+        ingest = time.perf_counter() - start
+
+        summaries = instance.get_json(f"/api/messages?mailboxName=Default&page=1&pageSize={args.raw_requests}")
+        raw_latencies = []
+        for summary in summaries["results"]:
+            raw_start = time.perf_counter()
+            status, _, _ = instance.get(f"/api/messages/{summary['id']}/raw")
+            raw_latencies.append((time.perf_counter() - raw_start) * 1000)
+            if status != 200:
+                raise RuntimeError(f"/raw returned {status}")
+
+        return {
+            "sent_mb": sum(len(m) for m in messages) / (1024 * 1024),
+            "db_mb": database_size(instance) / (1024 * 1024),
+            "ingest_s": ingest,
+            "msgs_per_s": args.messages / ingest,
+            "raw_p50_ms": bench.summarize(raw_latencies)["p50"] if raw_latencies else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--messages", type=int, default=300, help="Messages to send per mode.")
+    parser.add_argument("--distinct", type=int, default=3, help="Number of distinct attachment files.")
+    parser.add_argument("--attachments", type=int, default=2, help="Attachments per message, chosen from the pool.")
+    parser.add_argument("--attachment-size", type=int, default=256 * 1024, help="Size of each attachment in bytes.")
+    parser.add_argument("--senders", type=int, default=4, help="Concurrent SMTP connections.")
+    parser.add_argument("--raw-requests", type=int, default=20, help="Messages to fetch through /raw after ingest.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for choosing attachments per message.")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES,
+                        help="'inline' stores attachments in each message, 'dedup' uses --deduplicateattachments.")
+    args = parser.parse_args()
+
+    if args.url:
+        parser.error("this benchmark measures the database file of instances it launches; --url is not supported")
+
+    pool = [os.urandom(args.attachment_size) for _ in range(args.distinct)]
+    results = {mode: run(args, MODES[mode], pool) for mode in args.modes}
+    bench.report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
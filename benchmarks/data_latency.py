@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Measures end-of-DATA latency for messages with many large attachments, with and without
+``--streamingmimeextraction``.
+
+Each message is uploaded untimed, then the clock starts as the terminating ``.`` is sent:
+
+* ``eod_250`` - from sending the final dot until the ``250`` reply arrives.
+* ``eod_ready`` - from sending the final dot until the server answers a following ``RSET``, i.e. until
+  the connection is free for the next message. smtp4dev converts the message before it reads the next command.
+* ``ingest_s`` - wall clock time until every message is visible through the API.
+
+Example:
+    python benchmarks/data_latency.py --attachments 20 --attachment-size 1048576
+"""
+
+import argparse
+import os
+import smtplib
+import time
+
+import smtp4dev_bench as bench
+
+MODES = {"full": [], "streaming": ["--streamingmimeextraction"]}
+
+
+def dot_stuff(message: bytes) -> bytes:
+    data = message.replace(b"\r\n", b"\n").replace(b"\n", b"\r\n")
+    if data.startswith(b"."):
+        data = b"." + data
+    data = data.replace(b"\r\n.", b"\r\n..")
+    if not data.endswith(b"\r\n"):
+        data += b"\r\n"
+    return data
+
+
+def send_timed(smtp: smtplib.SMTP, payload: bytes):
+    """Sends one message on an open connection. Returns (end of data to 250, end of data to RSET reply) in ms."""
+    smtp.mail("bench@example.com")
+    smtp.rcpt("to@example.com")
+    code, _ = smtp.docmd("DATA")
+    if code != 354:
+        raise RuntimeError(f"DATA rejected with {code}")
+    smtp.sock.sendall(payload)
+
+    start = time.perf_counter()
+    smtp.sock.sendall(b".\r\n")
+    code, _ = smtp.getreply()
+    accepted = time.perf_counter()
+    if code != 250:
+        raise RuntimeError(f"message rejected with {code}")
+
+    smtp.rset()
+    ready = time.perf_counter()
+    return (accepted - start) * 1000, (ready - start) * 1000
+
+
+def run(args, extra_args):
+    attachments = [(f"attachment{i}.bin", os.urandom(args.attachment_size)) for i in range(args.attachments)]
+    payload = dot_stuff(bench.build_message("DATA latency benchmark", body="x" * args.body_size,
+                                            attachments=attachments))
+
+    extra = list(extra_args) + [f"--messagestokeep={args.messages}"]
+    with bench.launch(args, extra_args=extra) as instance:
+        initial = bench.message_count(instance)
+        to_250, to_ready = [], []
+
+        start = time.perf_counter()
+        with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=300) as smtp:
+            smtp.ehlo()
+            for _ in range(args.messages):
+                eod_250, eod_ready = send_timed(smtp, payload)
+                to_250.append(eod_250)
+                to_ready.append(eod_ready)
+        bench.wait_for_message_count(instance, initial + args.messages, timeout=600)
+        ingest = time.perf_counter() - start
+
+        accepted = bench.summarize(to_250)
+        ready = bench.summarize(to_ready)
+        return {
+            "message_mb": len(payload) / (1024 * 1024),
+            "eod_250_p50_ms": accepted["p50"],
+            "eod_250_p95_ms": accepted["p95"],
+            "eod_ready_p50_ms": ready["p50"],
+            "eod_ready_p95_ms": ready["p95"],
+            "ingest_s": ingest,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--messages", type=int, default=20, help="Messages to send per mode.")
+    parser.add_argument("--attachments", type=int, default=10, help="Attachments per message.")
+    parser.add_argument("--attachment-size", type=int, default=1024 * 1024, help="Size of each attachment in bytes.")
+    parser.add_argument("--body-size", type=int, default=4096, help="Size of the text body in bytes.")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES,
+                        help="'full' parses after receipt, 'streaming' uses --streamingmimeextraction.")
+    args = parser.parse_args()
+
+    if args.url and len(args.modes) > 1:
+        parser.error("with --url only a single --modes entry matching the running instance can be measured")
+
+    results = {mode: run(args, MODES[mode]) for mode in args.modes}
+    bench.report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
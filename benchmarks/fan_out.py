@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measures delivery of messages with large recipient lists spread over many mailboxes.
+
+smtp4dev is launched with ``--mailboxes`` mailboxes, each matching its own recipient domain. Every message is
+addressed to ``--recipients`` recipients spread evenly over those mailboxes, and is sent only after the previous
+one is visible everywhere:
+
+* ``smtp_ms`` - time for the SMTP transaction, up to the ``250`` reply to the end of DATA.
+* ``visible_ms`` - time from starting the transaction until the message is listed in every mailbox.
+
+Example:
+    python benchmarks/fan_out.py --mailboxes 50 --recipients 500 --messages 20
+"""
+
+import argparse
+import smtplib
+import time
+
+import smtp4dev_bench as bench
+
+
+def mailbox_name(index):
+    return f"Box{index}"
+
+
+def wait_until_visible(instance, mailboxes, expected, timeout):
+    pending = set(mailboxes)
+    deadline = time.perf_counter() + timeout
+    while pending:
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{len(pending)} mailboxes did not reach {expected} messages within {timeout}s")
+        pending = {m for m in pending if bench.message_count(instance, m) < expected}
+        if pending:
+            time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--mailboxes", type=int, default=50, help="Number of mailboxes to deliver to.")
+    parser.add_argument("--recipients", type=int, default=500, help="Recipients per message, spread over the mailboxes.")
+    parser.add_argument("--messages", type=int, default=20, help="Messages to send.")
+    parser.add_argument("--body-size", type=int, default=16 * 1024, help="Body size of each message in bytes.")
+    args = parser.parse_args()
+
+    if args.url:
+        parser.error("this benchmark configures the mailboxes of the instance it launches; --url is not supported")
+
+    mailboxes = [mailbox_name(i) for i in range(args.mailboxes)]
+    recipients = [f"user{i}@box{i % args.mailboxes}.example.com" for i in range(args.recipients)]
+    extra = [f"--mailbox={name}=*@box{i}.example.com" for i, name in enumerate(mailboxes)]
+    extra.append(f"--messagestokeep={args.messages}")
+
+    message = bench.build_message("Fan out benchmark", body="x" * args.body_size, recipients=recipients[:10])
+
+    smtp_times, visible_times = [], []
+    with bench.launch(args, extra_args=extra) as instance:
+        for i in range(args.messages):
+            start = time.perf_counter()
+            with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=120) as smtp:
+                smtp.sendmail("bench@example.com", recipients, message)
+            smtp_times.append((time.perf_counter() - start) * 1000)
+
+            wait_until_visible(instance, mailboxes, i + 1, timeout=120)
+            visible_times.append((time.perf_counter() - start) * 1000)
+
+    smtp_stats = bench.summarize(smtp_times)
+    visible_stats = bench.summarize(visible_times)
+    bench.report({
+        f"{args.recipients} rcpt/{args.mailboxes} mailboxes": {
+            "smtp_p50_ms": smtp_stats["p50"],
+            "smtp_p95_ms": smtp_stats["p95"],
+            "visible_p50_ms": visible_stats["p50"],
+            "visible_p95_ms": visible_stats["p95"],
+            "visible_max_ms": visible_stats["max"],
+        }
+    }, args.json)
+
+
+if __name__ == "__main__":
+    main()
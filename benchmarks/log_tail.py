@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tails the smtp4dev server log through the ``since`` cursor of ``/api/ServerLog/entries`` while a load test runs.
+
+Only entries after the last one seen are fetched on each poll. If the server's log buffer wraps between
+polls, the skipped entries are counted as dropped. When the tail stops (``--duration`` elapses or Ctrl+C),
+a summary is printed:
+
+* ``entries`` and ``entries_per_s`` - entries received and the rate at which they arrived.
+* ``dropped`` - entries overwritten in the server's buffer before they could be fetched.
+* ``poll_p50_ms`` / ``poll_p95_ms`` - latency of the cursor request.
+
+Example, alongside another benchmark against the same instance:
+    python benchmarks/log_tail.py --url http://localhost:5000 --min-level Warning --duration 60
+"""
+
+import argparse
+import json
+import sys
+import time
+import urllib.parse
+
+import smtp4dev_bench as bench
+
+
+def fetch_since(instance, since, min_level):
+    query = {"since": since}
+    if min_level:
+        query["minLevel"] = min_level
+    status, body, _ = instance.get("/api/ServerLog/entries?" + urllib.parse.urlencode(query))
+    if status != 200:
+        raise RuntimeError(f"/api/ServerLog/entries returned {status}: {body}")
+    return json.loads(body or "[]")
+
+
+def tail(instance, args):
+    # Start from the end of the log unless the whole buffer was asked for.
+    since = 0
+    if not args.from_start:
+        existing = fetch_since(instance, 0, None)
+        since = existing[-1]["sequence"] if existing else 0
+
+    received = dropped = 0
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + args.duration if args.duration else None
+
+    try:
+        while deadline is None or time.perf_counter() < deadline:
+            poll_start = time.perf_counter()
+            entries = fetch_since(instance, since, args.min_level)
+            latencies.append((time.perf_counter() - poll_start) * 1000)
+
+            if entries:
+                # With a level filter, gaps are expected and cannot be told apart from overwritten entries.
+                if not args.min_level and entries[0]["sequence"] > since + 1:
+                    dropped += entries[0]["sequence"] - since - 1
+                since = entries[-1]["sequence"]
+                received += len(entries)
+                if not args.quiet:
+                    sys.stdout.write("".join(e["formattedMessage"] for e in entries))
+                    sys.stdout.flush()
+
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+    elapsed = time.perf_counter() - start
+    stats = bench.summarize(latencies)
+    return {
+        "entries": received,
+        "entries_per_s": received / elapsed if elapsed else 0.0,
+        "dropped": dropped,
+        "poll_p50_ms": stats.get("p50", 0.0),
+        "poll_p95_ms": stats.get("p95", 0.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds between polls.")
+    parser.add_argument("--duration", type=float, default=0, help="Seconds to tail for. 0 tails until Ctrl+C.")
+    parser.add_argument("--min-level", help="Only fetch entries of this level or higher, e.g. Warning.")
+    parser.add_argument("--from-start", action="store_true", help="Print the entries already in the buffer first.")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Only print the summary, not the log entries. Use with --json for machine-readable output.")
+    args = parser.parse_args()
+
+    with bench.launch(args) as instance:
+        result = tail(instance, args)
+
+    bench.report({"serverlog": result}, args.json)
+
+
+if __name__ == "__main__":
+    main()
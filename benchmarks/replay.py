@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Replays SMTP sessions captured with ``--trafficcapturedir`` (``TrafficCaptureDirectory``) against smtp4dev.
+
+Each ``.smtpcap`` file holds one session as the client sent it, including pipelined commands, AUTH exchanges and
+bare line feeds. Each session is replayed chunk by chunk. A chunk is sent once the server has sent as many complete
+responses as it had in the capture, and at 1x no sooner than its original time. ``--speed 2`` halves the gaps
+between chunks and between session starts. ``--speed 0`` replays as fast as the server responds. TLS is started
+where the capture shows it was, without verifying the server certificate.
+
+When every session has finished a summary is printed:
+
+* ``sessions_per_s`` / ``msgs_per_s`` / ``mb_per_s`` - replay throughput. Messages are counted by ``354``
+  responses.
+* ``mismatched`` - responses whose code differs from the capture, e.g. authentication that no longer succeeds.
+* ``failed`` - sessions which could not be replayed to the end.
+* ``resp_p50_ms`` / ``resp_p95_ms`` / ``resp_p99_ms`` - time from sending a chunk to receiving the responses it
+  produced.
+
+Example, replaying production captures against a local build with StartTls enabled:
+    python benchmarks/replay.py captures/ --speed 0 --concurrency 16 --server-arg=--tlsmode=StartTls
+"""
+
+import argparse
+import io
+import os
+import socket
+import ssl
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import smtp4dev_bench as bench
+
+HEADER = b"SMTPCAP1"
+CLIENT_DATA, SERVER_DATA, TLS_STARTED = b"C", b"S", b"T"
+
+
+class Capture:
+    """A parsed capture: ``records`` is a list of ``(type, offset_s, payload)`` with offsets from the session start."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(HEADER):
+            raise ValueError(f"{path} is not a traffic capture")
+
+        self.start_s = struct.unpack_from("<q", data, len(HEADER))[0] / 1000
+        self.records = []
+        stream = io.BytesIO(data)
+        stream.seek(len(HEADER) + 8)
+        offset_s = 0.0
+        while True:
+            record_type = stream.read(1)
+            if not record_type:
+                break
+            offset_s += read_7bit_int(stream) / 1_000_000
+            payload = stream.read(read_7bit_int(stream))
+            self.records.append((record_type, offset_s, payload))
+
+        self.duration_s = offset_s
+
+
+def read_7bit_int(stream):
+    """Reads an integer written by .NET ``BinaryWriter.Write7BitEncodedInt``/``Write7BitEncodedInt64``."""
+    result = shift = 0
+    while True:
+        byte = stream.read(1)
+        if not byte:
+            raise ValueError("truncated capture")
+        result |= (byte[0] & 0x7F) << shift
+        if not byte[0] & 0x80:
+            return result
+        shift += 7
+
+
+def final_response_codes(data):
+    """Returns the codes of the final lines of the responses in ``data``, e.g. ``250`` for ``250-A\\r\\n250 B\\r\\n``."""
+    return [line[:3].decode("ascii", "replace") for line in data.split(b"\r\n") if len(line) >= 4 and line[3:4] == b" "]
+
+
+class ResponseReader:
+    """Reads complete responses from the server, counting them and recording their codes."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b""
+        self.codes = []
+
+    def wait_for(self, count):
+        while len(self.codes) < count:
+            while b"\r\n" not in self.buffer:
+                data = self.sock.recv(65536)
+                if not data:
+                    raise ConnectionError(f"connection closed after {len(self.codes)} responses, expected {count}")
+                self.buffer += data
+            line, self.buffer = self.buffer.split(b"\r\n", 1)
+            if len(line) >= 4 and line[3:4] == b" ":
+                self.codes.append(line[:3].decode("ascii", "replace"))
+
+
+def replay_session(instance, capture, speed, start_at, timeout):
+    """Replays one capture. Returns ``(latencies_ms, expected_codes, actual_codes, client_bytes)``."""
+    if speed:
+        time.sleep(max(0.0, start_at - time.perf_counter()))
+
+    session_start = time.perf_counter()
+    sock = socket.create_connection((instance.smtp_host, instance.smtp_port), timeout=timeout)
+    reader = ResponseReader(sock)
+    expected_codes, latencies = [], []
+    client_bytes = 0
+    last_sent = session_start
+    waited_for = 0
+
+    def wait_for_responses():
+        nonlocal waited_for
+        if len(expected_codes) > waited_for:
+            reader.wait_for(len(expected_codes))
+            latencies.append((time.perf_counter() - last_sent) * 1000)
+            waited_for = len(expected_codes)
+
+    try:
+        for record_type, offset_s, payload in capture.records:
+            if record_type == SERVER_DATA:
+                expected_codes.extend(final_response_codes(payload))
+            elif record_type == TLS_STARTED:
+                wait_for_responses()
+                context = ssl.create_default_context()
+                context.check_hostname = False
+                context.verify_mode = ssl.CERT_NONE
+                sock = context.wrap_socket(sock, server_hostname=instance.smtp_host)
+                reader.sock = sock
+            elif record_type == CLIENT_DATA:
+                wait_for_responses()
+                if not payload:
+                    break
+                if speed:
+                    time.sleep(max(0.0, session_start + offset_s / speed - time.perf_counter()))
+                sock.sendall(payload)
+                client_bytes += len(payload)
+                last_sent = time.perf_counter()
+
+        wait_for_responses()
+    finally:
+        sock.close()
+
+    return latencies, expected_codes, reader.codes, client_bytes
+
+
+def load_captures(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".smtpcap"))
+        else:
+            files.append(path)
+    if not files:
+        raise SystemExit("no .smtpcap files found")
+    return [Capture(f) for f in files]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("captures", nargs="+", help="Capture files, or directories containing .smtpcap files.")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed as a multiple of the original timing. 0 replays as fast as possible.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum sessions replayed at the same time.")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to replay the whole set of captures.")
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for each server response.")
+    parser.add_argument("--server-arg", action="append", default=[],
+                        help="Extra argument for a launched smtp4dev, e.g. --server-arg=--tlsmode=StartTls. Repeatable.")
+    args = parser.parse_args()
+
+    captures = load_captures(args.captures)
+    first_start = min(c.start_s for c in captures)
+    span = max(c.start_s + c.duration_s for c in captures) - first_start
+
+    with bench.launch(args, extra_args=args.server_arg) as instance:
+        start = time.perf_counter()
+        schedule = []
+        for repetition in range(args.repeat):
+            for capture in captures:
+                offset = repetition * span + capture.start_s - first_start
+                schedule.append((capture, start + offset / args.speed if args.speed else start))
+
+        failures = []
+        lock = threading.Lock()
+
+        def run(item):
+            capture, start_at = item
+            try:
+                return replay_session(instance, capture, args.speed, start_at, args.timeout)
+            except (OSError, ConnectionError, ssl.SSLError) as e:
+                with lock:
+                    failures.append(f"{capture.path}: {e}")
+                return None
+
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            results = [r for r in executor.map(run, schedule) if r is not None]
+        elapsed = time.perf_counter() - start
+
+    for failure in failures:
+        print(f"failed: {failure}")
+
+    latencies = [latency for result in results for latency in result[0]]
+    mismatched = sum(1 for _, expected, actual, _ in results for e, a in zip(expected, actual) if e != a)
+    messages = sum(actual.count("354") for _, _, actual, _ in results)
+    client_bytes = sum(result[3] for result in results)
+    stats = bench.summarize(latencies)
+    bench.report({
+        f"{len(schedule)} sessions": {
+            "elapsed_s": elapsed,
+            "sessions_per_s": len(results) / elapsed,
+            "msgs_per_s": messages / elapsed,
+            "mb_per_s": client_bytes / elapsed / 1_000_000,
+            "mismatched": mismatched,
+            "failed": len(failures),
+            "resp_p50_ms": stats.get("p50", 0.0),
+            "resp_p95_ms": stats.get("p95", 0.0),
+            "resp_p99_ms": stats.get("p99", 0.0),
+        }
+    }, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Shared helpers for the smtp4dev performance benchmarks.
+
+Only the Python standard library is used so the scripts can run on a bare CI agent.
+Each benchmark either launches its own smtp4dev process (``--command``) or talks to
+an already running instance (``--url`` and ``--smtp-port``).
+"""
+
+import argparse
+import json
+import os
+import shlex
+import smtplib
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from email.message import EmailMessage
+
+DEFAULT_COMMAND = "smtp4dev"
+
+
+def add_server_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the options shared by every benchmark for locating or launching smtp4dev."""
+    parser.add_argument(
+        "--command",
+        default=os.environ.get("SMTP4DEV_COMMAND", DEFAULT_COMMAND),
+        help="Command used to launch smtp4dev, e.g. 'dotnet Rnwood.Smtp4dev.dll'. "
+        "Ignored when --url is given. Default: $SMTP4DEV_COMMAND or 'smtp4dev'.",
+    )
+    parser.add_argument("--url", help="Base URL of an already running smtp4dev instance.")
+    parser.add_argument("--smtp-host", default="127.0.0.1", help="SMTP host of a running instance.")
+    parser.add_argument("--smtp-port", type=int, default=25, help="SMTP port of a running instance.")
+    parser.add_argument("--startup-timeout", type=float, default=60, help="Seconds to wait for smtp4dev to start.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table.")
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Smtp4devInstance:
+    """A running smtp4dev, either launched by us or supplied by the user."""
+
+    def __init__(self, base_url, smtp_host, smtp_port, process=None, data_dir=None):
+        self.base_url = base_url.rstrip("/")
+        self.smtp_host = smtp_host
+        self.smtp_port = smtp_port
+        self.process = process
+        self.data_dir = data_dir
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.data_dir:
+            self.data_dir.cleanup()
+            self.data_dir = None
+
+    def get(self, path, headers=None):
+        return api_request(self.base_url + path, headers=headers)
+
+    def get_json(self, path):
+        return json.loads(self.get(path)[1] or "null")
+
+    def delete(self, path):
+        return api_request(self.base_url + path, method="DELETE")
+
+    def send(self, message, sender="bench@example.com", recipients=("to@example.com",)):
+        send_message(self.smtp_host, self.smtp_port, message, sender, recipients)
+
+
+def launch(args, extra_args=(), database="", wait_for_api=True, imap_pop3=False) -> Smtp4devInstance:
+    """
+    Returns an ``Smtp4devInstance`` for ``args``. If ``args.url`` is set the running instance is
+    used as-is and ``extra_args``/``database`` are ignored, otherwise smtp4dev is launched on free
+    ports in a throwaway data directory.
+
+    ``database`` is passed to ``--db``: "" for in-memory, or a file name relative to the data directory.
+    The IMAP and POP3 servers are disabled unless ``imap_pop3`` is set, in which case they listen on free ports.
+    """
+    if args.url:
+        return Smtp4devInstance(args.url, args.smtp_host, args.smtp_port)
+
+    data_dir = tempfile.TemporaryDirectory(prefix="smtp4dev-bench-")
+    http_port = free_port()
+    smtp_port = free_port()
+    command = shlex.split(args.command) + [
+        f"--urls=http://127.0.0.1:{http_port}",
+        f"--smtpport={smtp_port}",
+        f"--imapport={free_port() if imap_pop3 else ''}",
+        f"--pop3port={free_port() if imap_pop3 else ''}",
+        f"--db={database}",
+        f"--baseappdatapath={data_dir.name}",
+        "--nousersettings",
+        "--hostname=localhost",
+        *extra_args,
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    instance = Smtp4devInstance(f"http://127.0.0.1:{http_port}", "127.0.0.1", smtp_port, process, data_dir)
+
+    if wait_for_api:
+        try:
+            wait_until_ready(instance, args.startup_timeout)
+        except Exception:
+            instance.stop()
+            raise
+    return instance
+
+
+def wait_until_ready(instance: Smtp4devInstance, timeout: float) -> None:
+    """Waits until both ``/api/server`` reports the SMTP server running and the SMTP port accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if instance.process and instance.process.poll() is not None:
+            raise RuntimeError(f"smtp4dev exited with code {instance.process.returncode} during startup")
+        try:
+            server = instance.get_json("/api/server")
+            if server and server.get("isRunning"):
+                with socket.create_connection((instance.smtp_host, instance.smtp_port), timeout=1):
+                    return
+        except (OSError, urllib.error.URLError, ValueError):
+            pass
+        time.sleep(0.1)
+    raise TimeoutError(f"smtp4dev did not become ready within {timeout}s")
+
+
+def api_request(url, method="GET", headers=None, data=None):
+    """Performs an HTTP request and returns ``(status, body, response_headers)``. HTTP errors are returned, not raised."""
+    request = urllib.request.Request(url, method=method, headers=headers or {}, data=data)
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.read().decode("utf-8", "replace"), dict(response.headers)
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "replace"), dict(e.headers)
+
+
+def build_message(subject, body="Benchmark message body.\r\n", attachments=(), sender="bench@example.com",
+                  recipients=("to@example.com",)) -> bytes:
+    """Builds a MIME message. ``attachments`` is a sequence of ``(filename, bytes)``."""
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = ", ".join(recipients)
+    message["Subject"] = subject
+    message.set_content(body)
+    for filename, content in attachments:
+        message.add_attachment(content, maintype="application", subtype="octet-stream", filename=filename)
+    return message.as_bytes()
+
+
+def send_message(host, port, message: bytes, sender="bench@example.com", recipients=("to@example.com",)):
+    with smtplib.SMTP(host, port, timeout=60) as smtp:
+        smtp.sendmail(sender, list(recipients), message)
+
+
+def message_count(instance: Smtp4devInstance, mailbox="Default") -> int:
+    result = instance.get_json(f"/api/messages?mailboxName={urllib.request.quote(mailbox)}&page=1&pageSize=1")
+    return result["rowCount"]
+
+
+def wait_for_message_count(instance: Smtp4devInstance, expected: int, mailbox="Default", timeout=120.0) -> float:
+    """Polls until ``mailbox`` holds at least ``expected`` messages. Returns the time waited in seconds."""
+    start = time.perf_counter()
+    deadline = start + timeout
+    while time.perf_counter() < deadline:
+        if message_count(instance, mailbox) >= expected:
+            return time.perf_counter() - start
+        time.sleep(0.02)
+    raise TimeoutError(f"mailbox {mailbox} did not reach {expected} messages within {timeout}s")
+
+
+def summarize(values):
+    """Returns count, mean and percentiles (in the units of ``values``)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+    }
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def report(results: dict, as_json=False) -> None:
+    """Prints ``{row name: {column: value}}`` as a table or JSON."""
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = []
+    for row in results.values():
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+
+    name_width = max([len("name")] + [len(name) for name in results])
+    print("name".ljust(name_width) + "".join(c.rjust(14) for c in columns))
+    for name, row in results.items():
+        cells = []
+        for column in columns:
+            value = row.get(column, "")
+            cells.append((f"{value:.3f}" if isinstance(value, float) else str(value)).rjust(14))
+        print(name.ljust(name_width) + "".join(cells))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Measures how long a fresh smtp4dev takes to start, with and without ``--faststart``.
+
+Each run launches smtp4dev with an in-memory database and polls from the moment the process is started:
+
+* ``smtp_ready_ms`` - until an SMTP connection receives the ``220`` greeting.
+* ``tls_ready_ms`` - until a TLS handshake completes (``STARTTLS`` or implicit TLS). Only with ``--tls-mode``.
+* ``api_ready_ms`` - until ``/api/server`` reports the SMTP server running.
+
+Each mode is run ``--runs`` times and the mean and worst case are reported. The self-signed certificate is cached
+in the working directory, so delete ``selfsigned-certificate.pfx`` before running to include generating it.
+
+Example:
+    python benchmarks/startup_time.py --runs 10 --tls-mode StartTls --imap-pop3
+"""
+
+import argparse
+import smtplib
+import ssl
+import time
+import urllib.error
+
+import smtp4dev_bench as bench
+
+MODES = {
+    "default": [],
+    "faststart": ["--faststart"],
+}
+
+
+def poll(instance, deadline, probe):
+    """Calls ``probe`` until it succeeds and returns the time it first succeeded."""
+    while time.perf_counter() < deadline:
+        if instance.process.poll() is not None:
+            raise RuntimeError(f"smtp4dev exited with code {instance.process.returncode} during startup")
+        try:
+            if probe():
+                return time.perf_counter()
+        except (OSError, smtplib.SMTPException, urllib.error.URLError, ValueError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError("smtp4dev did not become ready in time")
+
+
+def smtp_greeting(instance):
+    with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=5) as smtp:
+        return smtp.noop()[0] == 250
+
+
+def tls_handshake(instance, tls_mode):
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+
+    if tls_mode == "ImplicitTls":
+        with smtplib.SMTP_SSL(instance.smtp_host, instance.smtp_port, timeout=30, context=context) as smtp:
+            return smtp.noop()[0] == 250
+
+    with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=30) as smtp:
+        smtp.starttls(context=context)
+        return smtp.noop()[0] == 250
+
+
+def api_running(instance):
+    server = instance.get_json("/api/server")
+    return bool(server and server.get("isRunning"))
+
+
+def run_once(args, extra_args):
+    start = time.perf_counter()
+    deadline = start + args.startup_timeout
+    with bench.launch(args, extra_args=extra_args, wait_for_api=False, imap_pop3=args.imap_pop3) as instance:
+        result = {}
+        if args.tls_mode == "ImplicitTls":
+            # Plain SMTP is not available in this mode, so the handshake is the first sign of life.
+            tls_ready = poll(instance, deadline, lambda: tls_handshake(instance, args.tls_mode))
+            result["smtp_ready_ms"] = result["tls_ready_ms"] = (tls_ready - start) * 1000
+        else:
+            result["smtp_ready_ms"] = (poll(instance, deadline, lambda: smtp_greeting(instance)) - start) * 1000
+            if args.tls_mode == "StartTls":
+                tls_ready = poll(instance, deadline, lambda: tls_handshake(instance, args.tls_mode))
+                result["tls_ready_ms"] = (tls_ready - start) * 1000
+        result["api_ready_ms"] = (poll(instance, deadline, lambda: api_running(instance)) - start) * 1000
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--runs", type=int, default=5, help="Launches per mode.")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--tls-mode", default="None", choices=["None", "StartTls", "ImplicitTls"],
+                        help="SMTP TLS mode to start with.")
+    parser.add_argument("--imap-pop3", action="store_true", help="Also start the IMAP and POP3 servers.")
+    args = parser.parse_args()
+
+    if args.url:
+        parser.error("this benchmark launches its own instances; --url is not supported")
+
+    extra = [f"--tlsmode={args.tls_mode}"]
+    results = {}
+    for mode in args.modes:
+        runs = [run_once(args, extra + MODES[mode]) for _ in range(args.runs)]
+        row = {}
+        for column in runs[0]:
+            stats = bench.summarize([r[column] for r in runs])
+            row[column] = stats["mean"]
+            row[column.replace("_ms", "_max_ms")] = stats["max"]
+        results[mode] = row
+
+    bench.report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Compares the SQLite storage profiles (``--dbprofile``) for message ingest and list latency.
+
+For each combination of database (in-memory / file) and profile a fresh smtp4dev is launched,
+``--messages`` messages are sent over ``--senders`` concurrent SMTP connections, and the time until
+all of them are visible through the API is recorded. List latency is then sampled by fetching the
+first page of the message list ``--list-requests`` times.
+
+Example:
+    python benchmarks/storage_profiles.py --command "dotnet Rnwood.Smtp4dev/bin/Release/net10.0/Rnwood.Smtp4dev.dll"
+"""
+
+import argparse
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import smtp4dev_bench as bench
+
+PROFILES = ("Default", "Tuned")
+
+
+def run(args, database, profile):
+    extra = [f"--dbprofile={profile}", f"--messagestokeep={args.messages}"]
+    with bench.launch(args, extra_args=extra, database=database) as instance:
+        message = bench.build_message("Storage profile benchmark", body="x" * args.body_size)
+
+        def send_batch(count):
+            with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=60) as smtp:
+                for _ in range(count):
+                    smtp.sendmail("bench@example.com", ["to@example.com"], message)
+
+        per_sender = [args.messages // args.senders + (1 if i < args.messages % args.senders else 0)
+                      for i in range(args.senders)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.senders) as pool:
+            list(pool.map(send_batch, per_sender))
+        sent = time.perf_counter() - start
+        bench.wait_for_message_count(instance, args.messages)
+        visible = time.perf_counter() - start
+
+        list_latencies = []
+        for _ in range(args.list_requests):
+            list_start = time.perf_counter()
+            instance.get(f"/api/messages?mailboxName=Default&page=1&pageSize={args.page_size}")
+            list_latencies.append((time.perf_counter() - list_start) * 1000)
+
+        stats = bench.summarize(list_latencies)
+        return {
+            "ingest_s": visible,
+            "smtp_s": sent,
+            "msgs_per_s": args.messages / visible,
+            "list_p50_ms": stats["p50"],
+            "list_p95_ms": stats["p95"],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--messages", type=int, default=2000, help="Messages to ingest per run.")
+    parser.add_argument("--senders", type=int, default=4, help="Concurrent SMTP connections.")
+    parser.add_argument("--body-size", type=int, default=2048, help="Body size of each message in bytes.")
+    parser.add_argument("--list-requests", type=int, default=200, help="Message list requests to time.")
+    parser.add_argument("--page-size", type=int, default=30, help="Page size for list requests.")
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=PROFILES)
+    parser.add_argument("--databases", nargs="+", default=["memory", "file"], choices=["memory", "file"])
+    args = parser.parse_args()
+
+    if args.url:
+        parser.error("this benchmark launches its own instances; --url is not supported")
+
+    results = {}
+    for database in args.databases:
+        for profile in args.profiles:
+            results[f"{database}/{profile}"] = run(args, "" if database == "memory" else "database.db", profile)
+
+    bench.report(results, args.json)
+
+
+if __name__ == "__main__":
+    main()
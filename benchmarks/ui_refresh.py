@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Simulates many web UI clients refreshing the message list while messages are being received.
+
+``--clients`` threads each request the first page of the Default mailbox's message list every ``--interval``
+seconds, sending back the ``ETag`` of the previous response in ``If-None-Match`` as a browser does. At the same
+time ``--senders`` SMTP connections send ``--messages`` messages. Once every message is listed the clients stop:
+
+* ``ingest_msgs_per_s`` - rate at which messages were received while the clients were refreshing.
+* ``requests_per_s`` - message list requests served per second across all clients.
+* ``not_modified_pct`` - percentage of requests answered with ``304 Not Modified``.
+* ``list_p50_ms`` / ``list_p95_ms`` / ``list_p99_ms`` - message list request latency.
+
+Example:
+    python benchmarks/ui_refresh.py --clients 50 --messages 2000 --page-size 25
+"""
+
+import argparse
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import smtp4dev_bench as bench
+
+
+def refresh_loop(instance, path, interval, stop, results):
+    etag = None
+    latencies, not_modified = [], 0
+    while not stop.is_set():
+        headers = {"If-None-Match": etag} if etag else {}
+        start = time.perf_counter()
+        status, _, response_headers = instance.get(path, headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if status == 304:
+            not_modified += 1
+        elif status == 200:
+            etag = response_headers.get("ETag", etag)
+        else:
+            raise RuntimeError(f"{path} returned {status}")
+
+        stop.wait(interval)
+
+    results.append((latencies, not_modified))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    bench.add_server_arguments(parser)
+    parser.add_argument("--clients", type=int, default=50, help="Concurrent UI clients refreshing the message list.")
+    parser.add_argument("--interval", type=float, default=0.25, help="Seconds each client waits between refreshes.")
+    parser.add_argument("--page-size", type=int, default=25, help="Messages per page requested by the clients.")
+    parser.add_argument("--messages", type=int, default=1000, help="Messages to send while the clients refresh.")
+    parser.add_argument("--senders", type=int, default=4, help="Concurrent SMTP connections.")
+    args = parser.parse_args()
+
+    message = bench.build_message("UI refresh benchmark")
+    path = f"/api/messages?mailboxName=Default&page=1&pageSize={args.page_size}"
+    extra = [f"--messagestokeep={args.messages}"]
+
+    with bench.launch(args, extra_args=extra) as instance:
+        initial = bench.message_count(instance)
+        stop = threading.Event()
+        results = []
+        clients = [threading.Thread(target=refresh_loop, args=(instance, path, args.interval, stop, results), daemon=True)
+                   for _ in range(args.clients)]
+        for client in clients:
+            client.start()
+
+        def send_batch(count):
+            with smtplib.SMTP(instance.smtp_host, instance.smtp_port, timeout=120) as smtp:
+                for _ in range(count):
+                    smtp.sendmail("bench@example.com", ["to@example.com"], message)
+
+        batches = [args.messages // args.senders + (1 if i < args.messages % args.senders else 0) for i in range(args.senders)]
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.senders) as executor:
+            list(executor.map(send_batch, batches))
+        bench.wait_for_message_count(instance, initial + args.messages, timeout=600)
+        elapsed = time.perf_counter() - start
+
+        stop.set()
+        for client in clients:
+            client.join()
+
+    if len(results) < args.clients:
+        raise RuntimeError(f"{args.clients - len(results)} clients failed")
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    not_modified = sum(count for _, count in results)
+    stats = bench.summarize(latencies)
+    bench.report({
+        f"{args.clients} clients": {
+            "ingest_msgs_per_s": args.messages / elapsed,
+            "requests_per_s": len(latencies) / elapsed,
+            "not_modified_pct": 100.0 * not_modified / len(latencies) if latencies else 0.0,
+            "list_p50_ms": stats.get("p50", 0.0),
+            "list_p95_ms": stats.get("p95", 0.0),
+            "list_p99_ms": stats.get("p99", 0.0),
+        }
+    }, args.json)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@
 
 using System.Net;
 using System.Security.Authentication;
+using System.Security.Cryptography.X509Certificates;
+using System.Threading.Tasks;
+using Rnwood.SmtpServer.Extensions;
 using Xunit;
 
 namespace Rnwood.SmtpServer.Tests;
@@ -216,6 +219,36 @@ public class ServerOptionsBuilderTests
         Assert.False(server.IsRunning);
     }
 
+    [Fact]
+    public async Task Builder_WithDeferredStartTlsCertificate_AdvertisesStartTlsBeforeCertificateIsReady()
+    {
+        // Arrange
+        var certificate = new TaskCompletionSource<X509Certificate>();
+
+        // Act
+        var options = ServerOptions.Builder()
+            .WithDeferredStartTlsCertificate(certificate.Task)
+            .Build();
+        var extensions = await options.GetExtensions(null);
+
+        // Assert
+        Assert.Contains(extensions, e => e is StartTlsExtension);
+        Assert.Same(certificate.Task, options.GetSSLCertificate(null));
+        Assert.False(await options.IsSSLEnabled(null));
+    }
+
+    [Fact]
+    public async Task Builder_WithoutTlsCertificate_DoesNotAdvertiseStartTls()
+    {
+        // Act
+        var options = ServerOptions.Builder().Build();
+        var extensions = await options.GetExtensions(null);
+
+        // Assert
+        Assert.DoesNotContain(extensions, e => e is StartTlsExtension);
+        Assert.Null(await options.GetSSLCertificate(null));
+    }
+
     [Fact]
     public void Builder_MultipleBuilds_WithSeparateBuilders_CreateIndependentInstances()
     {
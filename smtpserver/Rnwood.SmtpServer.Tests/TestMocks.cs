@@ -54,8 +54,12 @@ public class TestMocks
         ServerOptions.Setup(sb => sb.OnMessageReceived(It.IsAny<IConnection>(), It.IsAny<IMessage>()))
             .Returns(Task.CompletedTask);
         ServerOptions.Setup(sb => sb.OnMessageCompleted(It.IsAny<IConnection>())).Returns(Task.CompletedTask);
+        ServerOptions.Setup(sb => sb.OnMessageDataStarting(It.IsAny<IConnection>()))
+            .ReturnsAsync((IMessageDataObserver)null);
         ServerOptions.Setup(sb => sb.OnCommandReceived(It.IsAny<IConnection>(), It.IsAny<SmtpCommand>()))
             .Returns(Task.CompletedTask);
+        ServerOptions.Setup(sb => sb.GetTrafficCaptureStream(It.IsAny<IConnectionChannel>()))
+            .ReturnsAsync((System.IO.Stream)null);
         ServerOptions.SetupGet(sb => sb.MaximumNumberOfSequentialBadCommands).Returns(0);
         ServerOptions
             .Setup(sb =>
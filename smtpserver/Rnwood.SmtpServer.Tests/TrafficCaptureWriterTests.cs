@@ -0,0 +1,106 @@
+﻿// <copyright file="TrafficCaptureWriterTests.cs" company="Rnwood.SmtpServer project contributors">
+// Copyright (c) Rnwood.SmtpServer project contributors. All rights reserved.
+// Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
+// </copyright>
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Xunit;
+
+namespace Rnwood.SmtpServer.Tests;
+
+/// <summary>
+///     Tests for <see cref="TrafficCaptureWriter" /> and <see cref="TrafficCaptureStream" />
+/// </summary>
+public class TrafficCaptureWriterTests
+{
+    [Fact]
+    public void Write_RecordsAreReadableInOrder()
+    {
+        // Arrange
+        var output = new MemoryStream();
+        var startDate = new DateTime(2024, 1, 2, 3, 4, 5, DateTimeKind.Utc);
+
+        // Act
+        using (var capture = new TrafficCaptureWriter(output, startDate))
+        {
+            capture.WriteServerData(Encoding.ASCII.GetBytes("220 ready\r\n"));
+            capture.WriteClientData(Encoding.ASCII.GetBytes("EHLO a\r\nMAIL FROM:<a@b>\r\n"));
+            capture.WriteTlsStarted();
+        }
+
+        // Assert
+        var (start, records) = ReadCapture(output.ToArray());
+        Assert.Equal(new DateTimeOffset(startDate).ToUnixTimeMilliseconds(), start);
+        Assert.Equal(new[] { 'S', 'C', 'T' }, records.Select(r => (char)r.Type));
+        Assert.Equal("EHLO a\r\nMAIL FROM:<a@b>\r\n", Encoding.ASCII.GetString(records[1].Data));
+        Assert.Empty(records[2].Data);
+        Assert.All(records, r => Assert.True(r.DelayMicroseconds >= 0));
+    }
+
+    [Fact]
+    public void Dispose_LaterWritesAreIgnored()
+    {
+        // Arrange
+        var output = new MemoryStream();
+        var capture = new TrafficCaptureWriter(output, DateTime.Now);
+        capture.WriteClientData(new byte[] { 1, 2, 3 });
+        byte[] written = output.ToArray();
+
+        // Act
+        capture.Dispose();
+        capture.WriteClientData(new byte[] { 4 });
+
+        // Assert
+        Assert.False(output.CanWrite);
+        Assert.Single(ReadCapture(written).Records);
+    }
+
+    [Fact]
+    public async Task TrafficCaptureStream_RecordsReadsAsClientDataAndWritesAsServerData()
+    {
+        // Arrange
+        var inner = new MemoryStream(Encoding.ASCII.GetBytes("QUIT\r\n"));
+        var output = new MemoryStream();
+        using (var capture = new TrafficCaptureWriter(output, DateTime.Now))
+        {
+            var stream = new TrafficCaptureStream(inner, capture);
+
+            // Act
+            byte[] buffer = new byte[64];
+            int read = await stream.ReadAsync(buffer, 0, buffer.Length);
+            Assert.Equal(6, read);
+            Assert.Equal(0, await stream.ReadAsync(buffer.AsMemory()));
+            await stream.WriteAsync(Encoding.ASCII.GetBytes("221 bye\r\n"));
+        }
+
+        // Assert
+        var records = ReadCapture(output.ToArray()).Records;
+        Assert.Equal(new[] { 'C', 'C', 'S' }, records.Select(r => (char)r.Type));
+        Assert.Equal("QUIT\r\n", Encoding.ASCII.GetString(records[0].Data));
+        Assert.Empty(records[1].Data);
+        Assert.Equal("221 bye\r\n", Encoding.ASCII.GetString(records[2].Data));
+    }
+
+    private static (long Start, List<(byte Type, long DelayMicroseconds, byte[] Data)> Records) ReadCapture(byte[] capture)
+    {
+        using var reader = new BinaryReader(new MemoryStream(capture));
+        Assert.Equal("SMTPCAP1", Encoding.ASCII.GetString(reader.ReadBytes(8)));
+        long start = reader.ReadInt64();
+
+        var records = new List<(byte, long, byte[])>();
+        while (reader.BaseStream.Position < reader.BaseStream.Length)
+        {
+            byte type = reader.ReadByte();
+            long delay = reader.Read7BitEncodedInt64();
+            byte[] data = reader.ReadBytes(reader.Read7BitEncodedInt());
+            records.Add((type, delay, data));
+        }
+
+        return (start, records);
+    }
+}
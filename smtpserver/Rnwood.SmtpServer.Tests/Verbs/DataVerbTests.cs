@@ -3,6 +3,7 @@
 // Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
 // </copyright>
 
+using System.Collections.Generic;
 using System.IO;
 using System.Text;
 using System.Threading.Tasks;
@@ -193,6 +194,38 @@ public class DataVerbTests
         mocks.Connection.Verify(c => c.CommitMessage());
     }
 
+    /// <summary>
+    ///     The data observer returned by the server options receives each unescaped line followed by completion.
+    /// </summary>
+    /// <returns>A <see cref="Task{T}" /> representing the async operation</returns>
+    [Fact]
+    public async Task Data_WithDataObserver_ObserverReceivesLines()
+    {
+        TestMocks mocks = new TestMocks();
+
+        MemoryMessageBuilder messageBuilder = new MemoryMessageBuilder();
+        mocks.Connection.SetupGet(c => c.CurrentMessage).Returns(messageBuilder);
+        mocks.ServerOptions.Setup(b => b.GetMaximumMessageSize(It.IsAny<IConnection>())).ReturnsAsync((long?)null);
+
+        List<string> observedLines = new List<string>();
+        Mock<IMessageDataObserver> observer = new Mock<IMessageDataObserver>();
+        observer.Setup(o => o.OnDataLine(It.IsAny<byte[]>()))
+            .Callback<byte[]>(line => observedLines.Add(Encoding.ASCII.GetString(line)));
+        mocks.ServerOptions.Setup(b => b.OnMessageDataStarting(It.IsAny<IConnection>())).ReturnsAsync(observer.Object);
+
+        string[] messageData = { "A", "..", "B", "." };
+        int messageLine = 0;
+        mocks.Connection.Setup(c => c.ReadLineBytes())
+            .Returns(() => Task.FromResult(Encoding.ASCII.GetBytes(messageData[messageLine++])));
+
+        DataVerb verb = new DataVerb();
+        await verb.Process(mocks.Connection.Object, new SmtpCommand("DATA"));
+
+        Assert.Equal(new[] { "A", ".", "B" }, observedLines);
+        observer.Verify(o => o.OnDataCompleted(), Times.Once);
+        mocks.VerifyWriteResponse(StandardSmtpResponseCode.OK);
+    }
+
     /// <summary>
     ///     RFC 5321 Section 4.1.1.9 - Test DATA without recipients (implementation behavior)
     /// </summary>
@@ -0,0 +1,24 @@
+// <copyright file="IMessageDataObserver.cs" company="Rnwood.SmtpServer project contributors">
+// Copyright (c) Rnwood.SmtpServer project contributors. All rights reserved.
+// Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
+// </copyright>
+
+namespace Rnwood.SmtpServer;
+
+/// <summary>
+///     Receives the lines of a message as they arrive during the DATA command, before the message is complete.
+/// </summary>
+public interface IMessageDataObserver
+{
+    /// <summary>
+    ///     Called for each line of message data, after removal of dot stuffing and without the line terminator.
+    ///     The array must not be retained after the call returns.
+    /// </summary>
+    /// <param name="line">The line.</param>
+    void OnDataLine(byte[] line);
+
+    /// <summary>
+    ///     Called when the terminating dot has been received and no more lines will follow.
+    /// </summary>
+    void OnDataCompleted();
+}
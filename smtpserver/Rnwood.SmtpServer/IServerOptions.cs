@@ -5,6 +5,7 @@
 
 using System;
 using System.Collections.Generic;
+using System.IO;
 using System.Net;
 using System.Net.Security;
 using System.Security.Authentication;
@@ -102,6 +103,16 @@ public interface IServerOptions
     /// <returns>Gets the TLS cipher suites to be allowed</returns>
     Task<TlsCipherSuite[]> GetTlsCipherSuites(IConnection connection);
 
+    /// <summary>
+    ///     Gets the stream to which the raw traffic of a new connection should be captured using
+    ///     <see cref="TrafficCaptureWriter" />, or null if it should not be captured.
+    /// </summary>
+    /// <param name="connectionChannel">The connectionChannel<see cref="IConnectionChannel" />.</param>
+    /// <returns>A <see cref="Task{T}" /> representing the async operation. The result may be null.</returns>
+    /// <remarks>The default implementation returns null, so existing implementations are unaffected.</remarks>
+    Task<Stream> GetTrafficCaptureStream(IConnectionChannel connectionChannel) =>
+        Task.FromResult<Stream>(null);
+
     /// <summary>
     ///     Determines whether the specified auth mechanism should be enabled for the specified connection.
     /// </summary>
@@ -156,6 +167,16 @@ public interface IServerOptions
     /// <returns>A <see cref="Task{T}" /> representing the async operation.</returns>
     Task OnMessageCompleted(IConnection connection);
 
+    /// <summary>
+    ///     Called when the DATA command is about to start receiving message data and may return an observer which will
+    ///     be passed each line of the message as it arrives.
+    /// </summary>
+    /// <param name="connection">The connection<see cref="IConnection" />.</param>
+    /// <returns>A <see cref="Task{T}" /> representing the async operation. The result may be null.</returns>
+    /// <remarks>The default implementation returns null, so existing implementations are unaffected.</remarks>
+    Task<IMessageDataObserver> OnMessageDataStarting(IConnection connection) =>
+        Task.FromResult<IMessageDataObserver>(null);
+
     /// <summary>
     ///     Called when a new message is received by the server.
     /// </summary>
@@ -0,0 +1,26 @@
+// <copyright file="MessageDataStartingEventArgs.cs" company="Rnwood.SmtpServer project contributors">
+// Copyright (c) Rnwood.SmtpServer project contributors. All rights reserved.
+// Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
+// </copyright>
+
+namespace Rnwood.SmtpServer;
+
+/// <summary>
+///     Defines the <see cref="MessageDataStartingEventArgs" />.
+/// </summary>
+public class MessageDataStartingEventArgs : ConnectionEventArgs
+{
+    /// <summary>
+    ///     Initializes a new instance of the <see cref="MessageDataStartingEventArgs" /> class.
+    /// </summary>
+    /// <param name="connection">The connection<see cref="IConnection" />.</param>
+    public MessageDataStartingEventArgs(IConnection connection)
+        : base(connection)
+    {
+    }
+
+    /// <summary>
+    ///     Gets or sets the observer which will receive the message data as it arrives, or null if none is required.
+    /// </summary>
+    public IMessageDataObserver DataObserver { get; set; }
+}
@@ -5,6 +5,7 @@
 
 using System;
 using System.Collections.Generic;
+using System.IO;
 using System.Linq;
 using System.Net;
 using System.Net.Security;
@@ -30,8 +31,8 @@ public class ServerOptions : IServerOptions
     private readonly bool requireAuthentication;
     private readonly string[] nonSecureAuthMechanismIds;
     private readonly string[] secureAuthMechanismIds;
-    private readonly X509Certificate implcitTlsCertificate;
-    private readonly X509Certificate startTlsCertificate;
+    private Task<X509Certificate> implcitTlsCertificate;
+    private Task<X509Certificate> startTlsCertificate;
     private readonly SslProtocols sslProtocols;
     private readonly TlsCipherSuite[] tlsCipherSuites;
     private readonly long? maxMessageSize;
@@ -76,8 +77,8 @@ public class ServerOptions : IServerOptions
     {
         DomainName = domainName;
         PortNumber = portNumber;
-        this.implcitTlsCertificate = implcitTlsCertificate;
-        this.startTlsCertificate = startTlsCertificate;
+        this.implcitTlsCertificate = implcitTlsCertificate != null ? Task.FromResult(implcitTlsCertificate) : null;
+        this.startTlsCertificate = startTlsCertificate != null ? Task.FromResult(startTlsCertificate) : null;
         this.allowRemoteConnections = allowRemoteConnections;
         this.enableIpV6 = enableIpV6;
         this.requireAuthentication = requireAuthentication;
@@ -89,7 +90,17 @@ public class ServerOptions : IServerOptions
         this.bindAddress = bindAddress;
     }
 
-
+    /// <summary>
+    ///     Sets the TLS certificates from tasks which may not have completed yet, so the server can start listening
+    ///     while the certificates are still being loaded or generated. TLS handshakes wait for the certificate.
+    /// </summary>
+    /// <param name="implicitTlsCertificate">The TLS certificate to use for implicit TLS, or null.</param>
+    /// <param name="startTlsCertificate">The TLS certificate to use for STARTTLS, or null.</param>
+    internal void SetTlsCertificates(Task<X509Certificate> implicitTlsCertificate, Task<X509Certificate> startTlsCertificate)
+    {
+        this.implcitTlsCertificate = implicitTlsCertificate;
+        this.startTlsCertificate = startTlsCertificate;
+    }
 
     /// <inheritdoc />
     public virtual string DomainName { get; }
@@ -124,6 +135,11 @@ public class ServerOptions : IServerOptions
     /// <inheritdoc />
     public virtual Encoding FallbackEncoding => Encoding.GetEncoding("iso-8859-1");
 
+    /// <summary>
+    ///     Gets the directory to which the traffic of each connection is captured, or null if traffic is not captured.
+    /// </summary>
+    public virtual string TrafficCaptureDirectory { get; internal set; }
+
 
     /// <inheritdoc />
     public virtual Task<IEnumerable<IExtension>> GetExtensions(IConnectionChannel connectionChannel)
@@ -158,9 +174,23 @@ public class ServerOptions : IServerOptions
     public virtual Task<TimeSpan> GetSendTimeout(IConnectionChannel connectionChannel) =>
         Task.FromResult(new TimeSpan(0, 0, 30));
 
+    /// <inheritdoc />
+    public virtual Task<Stream> GetTrafficCaptureStream(IConnectionChannel connectionChannel)
+    {
+        if (string.IsNullOrEmpty(TrafficCaptureDirectory))
+        {
+            return Task.FromResult<Stream>(null);
+        }
+
+        Directory.CreateDirectory(TrafficCaptureDirectory);
+        string fileName = $"{DateTime.Now:yyyyMMdd-HHmmss-fff}-{Guid.NewGuid():N}.smtpcap";
+        return Task.FromResult<Stream>(new FileStream(Path.Combine(TrafficCaptureDirectory, fileName), FileMode.CreateNew,
+            FileAccess.Write, FileShare.Read));
+    }
+
     /// <inheritdoc />
     public virtual Task<X509Certificate> GetSSLCertificate(IConnection connection) =>
-        Task.FromResult(implcitTlsCertificate ?? startTlsCertificate);
+        implcitTlsCertificate ?? startTlsCertificate ?? Task.FromResult<X509Certificate>(null);
 
     /// <inheritdoc />
     public virtual Task<bool> IsAuthMechanismEnabled(IConnection connection, IAuthMechanism authMechanism)
@@ -199,6 +229,21 @@ public class ServerOptions : IServerOptions
     public virtual Task OnMessageCompleted(IConnection connection) =>
         MessageCompletedEventHandler?.Invoke(this, new ConnectionEventArgs(connection)) ?? Task.CompletedTask;
 
+    /// <inheritdoc />
+    public virtual async Task<IMessageDataObserver> OnMessageDataStarting(IConnection connection)
+    {
+        AsyncEventHandler<MessageDataStartingEventArgs> handlers = MessageDataStartingEventHandler;
+
+        if (handlers == null)
+        {
+            return null;
+        }
+
+        MessageDataStartingEventArgs args = new MessageDataStartingEventArgs(connection);
+        await handlers(this, args).ConfigureAwait(false);
+        return args.DataObserver;
+    }
+
     /// <inheritdoc />
     public virtual Task OnMessageReceived(IConnection connection, IMessage message) =>
         MessageReceivedEventHandler?.Invoke(this, new MessageEventArgs(message)) ?? Task.CompletedTask;
@@ -285,6 +330,12 @@ public class ServerOptions : IServerOptions
     /// </summary>
     public event AsyncEventHandler<ConnectionEventArgs> MessageCompletedEventHandler;
 
+    /// <summary>
+    ///     Occurs when the server is about to receive the data of a message. Handlers may set
+    ///     <see cref="MessageDataStartingEventArgs.DataObserver" /> to observe the data as it arrives.
+    /// </summary>
+    public event AsyncEventHandler<MessageDataStartingEventArgs> MessageDataStartingEventHandler;
+
     /// <summary>
     ///     Occurs when a message is received and committed.
     /// </summary>
@@ -8,6 +8,7 @@ using System.Net;
 using System.Net.Security;
 using System.Security.Authentication;
 using System.Security.Cryptography.X509Certificates;
+using System.Threading.Tasks;
 
 namespace Rnwood.SmtpServer;
 
@@ -23,12 +24,13 @@ public class ServerOptionsBuilder
     private bool requireAuthentication = false;
     private string[] nonSecureAuthMechanismIds = Array.Empty<string>();
     private string[] secureAuthMechanismIds = Array.Empty<string>();
-    private X509Certificate implicitTlsCertificate = null;
-    private X509Certificate startTlsCertificate = null;
+    private Task<X509Certificate> implicitTlsCertificate = null;
+    private Task<X509Certificate> startTlsCertificate = null;
     private SslProtocols sslProtocols = SslProtocols.None;
     private TlsCipherSuite[] tlsCipherSuites = null;
     private long? maxMessageSize = null;
     private IPAddress bindAddress = null;
+    private string trafficCaptureDirectory = null;
 
     /// <summary>
     ///     Sets whether remote connections to the server are allowed.
@@ -113,6 +115,18 @@ public class ServerOptionsBuilder
     /// <param name="certificate">The certificate.</param>
     /// <returns>The builder instance for method chaining.</returns>
     public ServerOptionsBuilder WithImplicitTlsCertificate(X509Certificate certificate)
+    {
+        this.implicitTlsCertificate = certificate != null ? Task.FromResult(certificate) : null;
+        return this;
+    }
+
+    /// <summary>
+    ///     Sets the TLS certificate to use for implicit TLS from a task which may still be running. The server can be
+    ///     started before the task completes and TLS handshakes wait for it.
+    /// </summary>
+    /// <param name="certificate">The task providing the certificate, or null to disable implicit TLS.</param>
+    /// <returns>The builder instance for method chaining.</returns>
+    public ServerOptionsBuilder WithDeferredImplicitTlsCertificate(Task<X509Certificate> certificate)
     {
         this.implicitTlsCertificate = certificate;
         return this;
@@ -124,6 +138,18 @@ public class ServerOptionsBuilder
     /// <param name="certificate">The certificate.</param>
     /// <returns>The builder instance for method chaining.</returns>
     public ServerOptionsBuilder WithStartTlsCertificate(X509Certificate certificate)
+    {
+        this.startTlsCertificate = certificate != null ? Task.FromResult(certificate) : null;
+        return this;
+    }
+
+    /// <summary>
+    ///     Sets the TLS certificate to use for STARTTLS from a task which may still be running. STARTTLS is
+    ///     advertised straight away and the command waits for the task to complete.
+    /// </summary>
+    /// <param name="certificate">The task providing the certificate, or null to disable STARTTLS.</param>
+    /// <returns>The builder instance for method chaining.</returns>
+    public ServerOptionsBuilder WithDeferredStartTlsCertificate(Task<X509Certificate> certificate)
     {
         this.startTlsCertificate = certificate;
         return this;
@@ -173,13 +199,24 @@ public class ServerOptionsBuilder
         return this;
     }
 
+    /// <summary>
+    ///     Sets the directory to which the raw traffic of each connection is captured, one file per connection.
+    /// </summary>
+    /// <param name="directory">The directory, or null to disable capturing.</param>
+    /// <returns>The builder instance for method chaining.</returns>
+    public ServerOptionsBuilder WithTrafficCaptureDirectory(string directory)
+    {
+        this.trafficCaptureDirectory = directory;
+        return this;
+    }
+
     /// <summary>
     ///     Builds the <see cref="ServerOptions" /> instance with the configured settings.
     /// </summary>
     /// <returns>A new <see cref="ServerOptions" /> instance.</returns>
     public ServerOptions Build()
     {
-        return new ServerOptions(
+        var options = new ServerOptions(
             allowRemoteConnections,
             enableIpV6,
             domainName,
@@ -187,12 +224,15 @@ public class ServerOptionsBuilder
             requireAuthentication,
             nonSecureAuthMechanismIds,
             secureAuthMechanismIds,
-            implicitTlsCertificate,
-            startTlsCertificate,
+            null,
+            null,
             sslProtocols,
             tlsCipherSuites,
             maxMessageSize,
             bindAddress
         );
+        options.SetTlsCertificates(implicitTlsCertificate, startTlsCertificate);
+        options.TrafficCaptureDirectory = trafficCaptureDirectory;
+        return options;
     }
 }
@@ -6,6 +6,7 @@
 using System;
 using System.Collections;
 using System.Collections.Generic;
+using System.IO;
 using System.Linq;
 using System.Net;
 using System.Net.Sockets;
@@ -392,6 +393,7 @@ public class SmtpServer : ISmtpServer
             connectionChannel.ReceiveTimeout =
                 await Options.GetReceiveTimeout(connectionChannel).ConfigureAwait(false);
             connectionChannel.SendTimeout = await Options.GetSendTimeout(connectionChannel).ConfigureAwait(false);
+            await StartTrafficCapture(connectionChannel).ConfigureAwait(false);
 
             Connection connection =
                 await Connection.Create(this, connectionChannel, CreateVerbMap()).ConfigureAwait(false);
@@ -408,6 +410,24 @@ public class SmtpServer : ISmtpServer
         }
     }
 
+    private async Task StartTrafficCapture(TcpClientConnectionChannel connectionChannel)
+    {
+        try
+        {
+            Stream captureStream = await Options.GetTrafficCaptureStream(connectionChannel).ConfigureAwait(false);
+            if (captureStream != null)
+            {
+                connectionChannel.StartTrafficCapture(new TrafficCaptureWriter(captureStream, DateTime.Now));
+            }
+        }
+#pragma warning disable CA1031 // Do not catch general exception types
+        catch (Exception e)
+        {
+            logger.LogWarning(e, "Failed to start traffic capture for connection from {0}", connectionChannel.ClientIPAddress);
+        }
+#pragma warning restore CA1031 // Do not catch general exception types
+    }
+
     private async Task Core()
     {
         logger.LogDebug("Core task running");
@@ -28,6 +28,8 @@ public class TcpClientConnectionChannel : IConnectionChannel
 
     private Stream stream;
 
+    private TrafficCaptureWriter trafficCapture;
+
     private SmtpStreamWriter writer;
 
     /// <summary>
@@ -92,6 +94,18 @@ public class TcpClientConnectionChannel : IConnectionChannel
     public async Task ApplyStreamFilter(Func<Stream, Task<Stream>> filter)
     {
         stream = await filter(stream).ConfigureAwait(false);
+        trafficCapture?.WriteTlsStarted();
+        SetupReaderAndWriter();
+    }
+
+    /// <summary>
+    ///     Starts recording the data sent and received on this channel to <paramref name="capture" />. Must be called
+    ///     before any data is read. The capture is disposed when the channel is closed.
+    /// </summary>
+    /// <param name="capture">The capture.</param>
+    public void StartTrafficCapture(TrafficCaptureWriter capture)
+    {
+        trafficCapture = capture;
         SetupReaderAndWriter();
     }
 
@@ -107,6 +121,7 @@ public class TcpClientConnectionChannel : IConnectionChannel
         {
             IsConnected = false;
             tcpClient.Dispose();
+            trafficCapture?.Dispose();
 
             foreach (Delegate handler in ClosedEventHandler?.GetInvocationList() ?? Enumerable.Empty<Delegate>())
             {
@@ -220,6 +235,7 @@ public class TcpClientConnectionChannel : IConnectionChannel
                 reader.Dispose();
                 stream.Dispose();
                 tcpClient.Dispose();
+                trafficCapture?.Dispose();
             }
 
             disposedValue = true;
@@ -233,13 +249,16 @@ public class TcpClientConnectionChannel : IConnectionChannel
             reader.Dispose();
         }
 
-        reader = new SmtpStreamReader(stream, fallbackEncoding, true);
+        // Stream filters such as TLS are applied to the unwrapped stream, so the capture records decrypted data.
+        Stream readWriteStream = trafficCapture != null ? new TrafficCaptureStream(stream, trafficCapture) : stream;
+
+        reader = new SmtpStreamReader(readWriteStream, fallbackEncoding, true);
 
         if (writer != null)
         {
             writer.Dispose();
         }
 
-        writer = new SmtpStreamWriter(stream, true) { AutoFlush = true };
+        writer = new SmtpStreamWriter(readWriteStream, true) { AutoFlush = true };
     }
 }
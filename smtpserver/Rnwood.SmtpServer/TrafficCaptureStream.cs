@@ -0,0 +1,108 @@
+﻿// <copyright file="TrafficCaptureStream.cs" company="Rnwood.SmtpServer project contributors">
+// Copyright (c) Rnwood.SmtpServer project contributors. All rights reserved.
+// Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
+// </copyright>
+
+using System;
+using System.IO;
+using System.Threading;
+using System.Threading.Tasks;
+
+namespace Rnwood.SmtpServer;
+
+/// <summary>
+///     Defines the <see cref="TrafficCaptureStream" /> which passes reads and writes through to an inner stream and
+///     records them to a <see cref="TrafficCaptureWriter" />. The inner stream is not disposed with this stream.
+/// </summary>
+internal class TrafficCaptureStream : Stream
+{
+    private readonly Stream inner;
+    private readonly TrafficCaptureWriter capture;
+
+    /// <summary>
+    ///     Initializes a new instance of the <see cref="TrafficCaptureStream" /> class.
+    /// </summary>
+    /// <param name="inner">The stream to read from and write to.</param>
+    /// <param name="capture">The capture to record the traffic to.</param>
+    public TrafficCaptureStream(Stream inner, TrafficCaptureWriter capture)
+    {
+        this.inner = inner;
+        this.capture = capture;
+    }
+
+    /// <inheritdoc />
+    public override bool CanRead => inner.CanRead;
+
+    /// <inheritdoc />
+    public override bool CanSeek => false;
+
+    /// <inheritdoc />
+    public override bool CanWrite => inner.CanWrite;
+
+    /// <inheritdoc />
+    public override long Length => throw new NotSupportedException();
+
+    /// <inheritdoc />
+    public override long Position
+    {
+        get => throw new NotSupportedException();
+        set => throw new NotSupportedException();
+    }
+
+    /// <inheritdoc />
+    public override void Flush() => inner.Flush();
+
+    /// <inheritdoc />
+    public override Task FlushAsync(CancellationToken cancellationToken) => inner.FlushAsync(cancellationToken);
+
+    /// <inheritdoc />
+    public override int Read(byte[] buffer, int offset, int count)
+    {
+        int read = inner.Read(buffer, offset, count);
+        capture.WriteClientData(buffer.AsSpan(offset, read));
+        return read;
+    }
+
+    /// <inheritdoc />
+    public override async Task<int> ReadAsync(byte[] buffer, int offset, int count, CancellationToken cancellationToken)
+    {
+        int read = await inner.ReadAsync(buffer, offset, count, cancellationToken).ConfigureAwait(false);
+        capture.WriteClientData(buffer.AsSpan(offset, read));
+        return read;
+    }
+
+    /// <inheritdoc />
+    public override async ValueTask<int> ReadAsync(Memory<byte> buffer, CancellationToken cancellationToken = default)
+    {
+        int read = await inner.ReadAsync(buffer, cancellationToken).ConfigureAwait(false);
+        capture.WriteClientData(buffer.Span.Slice(0, read));
+        return read;
+    }
+
+    /// <inheritdoc />
+    public override void Write(byte[] buffer, int offset, int count)
+    {
+        capture.WriteServerData(buffer.AsSpan(offset, count));
+        inner.Write(buffer, offset, count);
+    }
+
+    /// <inheritdoc />
+    public override Task WriteAsync(byte[] buffer, int offset, int count, CancellationToken cancellationToken)
+    {
+        capture.WriteServerData(buffer.AsSpan(offset, count));
+        return inner.WriteAsync(buffer, offset, count, cancellationToken);
+    }
+
+    /// <inheritdoc />
+    public override ValueTask WriteAsync(ReadOnlyMemory<byte> buffer, CancellationToken cancellationToken = default)
+    {
+        capture.WriteServerData(buffer.Span);
+        return inner.WriteAsync(buffer, cancellationToken);
+    }
+
+    /// <inheritdoc />
+    public override long Seek(long offset, SeekOrigin origin) => throw new NotSupportedException();
+
+    /// <inheritdoc />
+    public override void SetLength(long value) => throw new NotSupportedException();
+}
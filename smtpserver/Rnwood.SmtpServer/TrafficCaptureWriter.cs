@@ -0,0 +1,146 @@
+﻿// <copyright file="TrafficCaptureWriter.cs" company="Rnwood.SmtpServer project contributors">
+// Copyright (c) Rnwood.SmtpServer project contributors. All rights reserved.
+// Licensed under the BSD license. See LICENSE.md file in the project root for full license information.
+// </copyright>
+
+using System;
+using System.Diagnostics;
+using System.IO;
+using System.Text;
+using Microsoft.Extensions.Logging;
+
+namespace Rnwood.SmtpServer;
+
+/// <summary>
+///     Writes the raw traffic of a connection, with timing, to a compact capture which can be replayed later.
+/// </summary>
+/// <remarks>
+///     A capture starts with the ASCII header <c>SMTPCAP1</c> followed by the session start time as a 64-bit
+///     little-endian count of milliseconds since the Unix epoch. Each record which follows is a type byte
+///     (<c>C</c> for data received from the client, <c>S</c> for data sent by the server, <c>T</c> when TLS starts),
+///     the microseconds since the previous record and the payload length, both 7-bit encoded integers,
+///     then the payload. An empty <c>C</c> record marks the client closing the connection. Data sent inside TLS is
+///     recorded after decryption.
+/// </remarks>
+public class TrafficCaptureWriter : IDisposable
+{
+    /// <summary>
+    ///     The type byte of a record holding data received from the client.
+    /// </summary>
+    public const byte ClientDataRecord = (byte)'C';
+
+    /// <summary>
+    ///     The type byte of a record holding data sent by the server.
+    /// </summary>
+    public const byte ServerDataRecord = (byte)'S';
+
+    /// <summary>
+    ///     The type byte of a record marking that TLS was negotiated. It has no payload.
+    /// </summary>
+    public const byte TlsStartedRecord = (byte)'T';
+
+    private static readonly byte[] Header = Encoding.ASCII.GetBytes("SMTPCAP1");
+
+    private readonly ILogger logger = Logging.Factory.CreateLogger<TrafficCaptureWriter>();
+    private readonly object syncRoot = new object();
+    private readonly Stopwatch stopwatch = Stopwatch.StartNew();
+    private readonly BinaryWriter writer;
+    private long lastRecordMicroseconds;
+    private bool closed;
+
+    /// <summary>
+    ///     Initializes a new instance of the <see cref="TrafficCaptureWriter" /> class.
+    /// </summary>
+    /// <param name="output">The stream the capture is written to. It is disposed with the writer.</param>
+    /// <param name="startDate">The time the session started.</param>
+    public TrafficCaptureWriter(Stream output, DateTime startDate)
+    {
+        writer = new BinaryWriter(output, Encoding.ASCII, false);
+        writer.Write(Header);
+        writer.Write(new DateTimeOffset(startDate).ToUnixTimeMilliseconds());
+    }
+
+    /// <summary>
+    ///     Records data received from the client.
+    /// </summary>
+    /// <param name="data">The data.</param>
+    public void WriteClientData(ReadOnlySpan<byte> data) => WriteRecord(ClientDataRecord, data);
+
+    /// <summary>
+    ///     Records data sent by the server.
+    /// </summary>
+    /// <param name="data">The data.</param>
+    public void WriteServerData(ReadOnlySpan<byte> data) => WriteRecord(ServerDataRecord, data);
+
+    /// <summary>
+    ///     Records that TLS was negotiated. Data recorded afterwards is the decrypted traffic.
+    /// </summary>
+    public void WriteTlsStarted() => WriteRecord(TlsStartedRecord, ReadOnlySpan<byte>.Empty);
+
+    /// <summary>
+    ///     Flushes and closes the capture.
+    /// </summary>
+    public void Dispose()
+    {
+        Dispose(true);
+        GC.SuppressFinalize(this);
+    }
+
+    /// <summary>
+    ///     Releases unmanaged and - optionally - managed resources.
+    /// </summary>
+    /// <param name="disposing">
+    ///     <c>true</c> to release both managed and unmanaged resources; <c>false</c> to release only
+    ///     unmanaged resources.
+    /// </param>
+    protected virtual void Dispose(bool disposing)
+    {
+        if (disposing)
+        {
+            lock (syncRoot)
+            {
+                if (!closed)
+                {
+                    closed = true;
+                    try
+                    {
+                        writer.Dispose();
+                    }
+                    catch (IOException e)
+                    {
+                        logger.LogWarning(e, "Failed to close traffic capture");
+                    }
+                }
+            }
+        }
+    }
+
+    private void WriteRecord(byte type, ReadOnlySpan<byte> data)
+    {
+        lock (syncRoot)
+        {
+            if (closed)
+            {
+                return;
+            }
+
+            long now = stopwatch.Elapsed.Ticks / TimeSpan.TicksPerMicrosecond;
+
+            try
+            {
+                writer.Write(type);
+                writer.Write7BitEncodedInt64(now - lastRecordMicroseconds);
+                writer.Write7BitEncodedInt(data.Length);
+                writer.Write(data);
+                lastRecordMicroseconds = now;
+            }
+            catch (IOException e)
+            {
+                // A failing capture must not affect the session, so capturing stops instead.
+                logger.LogWarning(e, "Failed to write traffic capture. Capturing stopped for this session");
+                closed = true;
+                writer.BaseStream.Dispose();
+            }
+        }
+    }
+}
@@ -37,6 +37,8 @@ public class DataVerb : IVerb
             "End message with period")).ConfigureAwait(false);
 
         long messageSize = 0;
+        IMessageDataObserver dataObserver =
+            await connection.Server.Options.OnMessageDataStarting(connection).ConfigureAwait(false);
 
         using (Stream messageStream = await connection.CurrentMessage.WriteData().ConfigureAwait(false))
         {
@@ -65,6 +67,7 @@ public class DataVerb : IVerb
 
                     messageSize += data.Length;
                     messageStream.Write(data, 0, data.Length);
+                    dataObserver?.OnDataLine(data);
                 }
                 else
                 {
@@ -76,6 +79,9 @@ public class DataVerb : IVerb
 
             await messageStream.FlushAsync().ConfigureAwait(false);
         }
+
+        dataObserver?.OnDataCompleted();
+
         long? maxMessageSize =
             await connection.Server.Options.GetMaximumMessageSize(connection).ConfigureAwait(false);
 